@@ -1,4 +1,4 @@
-import React, { useState, useEffect } from 'react';
+import React, { useState, useEffect, useRef } from 'react';
 import {
   FileCode,
   Upload,
@@ -28,6 +28,7 @@ import {
   Loader2
 } from 'lucide-react';
 import { aiAPI, GradingResult, RequirementAnalysis } from '../services/api';
+import type { SubmissionsResponse } from '../services/api';
 
 // ============================================
 // TYPE DEFINITIONS
@@ -766,7 +767,14 @@ const defaultAssignments: LabAssignment[] = [
 // ============================================
 // MAIN AI LAB COMPONENT
 // ============================================
-const AILab: React.FC = () => {
+interface AILabProps {
+  // Saved submissions from the dashboard request; null while it loads
+  submissions: SubmissionsResponse | null;
+  // Ask the dashboard to refetch after a new submission is saved
+  onSubmissionsChange: () => void;
+}
+
+const AILab: React.FC<AILabProps> = ({ submissions, onSubmissionsChange }) => {
   const [selectedLab, setSelectedLab] = useState<LabAssignment | null>(null);
   const [isUploading, setIsUploading] = useState(false);
   const [isSubmitting, setIsSubmitting] = useState(false);
@@ -776,23 +784,47 @@ const AILab: React.FC = () => {
   const [isLoadingSubmissions, setIsLoadingSubmissions] = useState(true);
   const [assignments, setAssignments] = useState<LabAssignment[]>(defaultAssignments);
   const [showSubmittedCode, setShowSubmittedCode] = useState(false);
+  const gradeKeyRef = useRef<string | null>(null);
+  const [catalog, setCatalog] = useState<LabAssignment[] | null>(null);
 
-  // Fetch saved submissions on component mount
+  // Fetch the lab catalog on component mount
   useEffect(() => {
-    const loadSavedSubmissions = async () => {
-      setIsLoadingSubmissions(true);
+    const loadCatalog = async () => {
+      const labsResponse = await aiAPI.getLabs();
+
+      // The server's catalog is what gets graded; fall back to the bundled copy
+      setCatalog(labsResponse.success && labsResponse.labs?.length
+        ? labsResponse.labs.map(lab => ({
+            id: lab.id,
+            title: lab.title,
+            category: lab.category as LabAssignment['category'],
+            description: lab.description,
+            requirements: lab.requirements,
+            status: 'Pending' as const,
+          }))
+        : defaultAssignments);
+    };
+
+    loadCatalog();
+  }, []);
+
+  // Merge saved submissions into the catalog once both have loaded
+  useEffect(() => {
+    if (!catalog || !submissions) return;
+
+    const mergeSavedSubmissions = () => {
       try {
-        const response = await aiAPI.getUserSubmissions();
+        setAssignments(catalog);
 
-        if (response.success && response.submissions && response.submissions.length > 0) {
+        if (submissions.success && submissions.submissions && submissions.submissions.length > 0) {
           // Create a map of lab_id to submission data
           const submissionMap = new Map<string, any>();
-          response.submissions.forEach(sub => {
+          submissions.submissions.forEach(sub => {
             submissionMap.set(sub.lab_id, sub);
           });
 
-          // Merge submissions with default assignments
-          const updatedAssignments = defaultAssignments.map(assignment => {
+          // Merge submissions with the assignments
+          const updatedAssignments = catalog.map(assignment => {
             const labId = `lab_${assignment.id}`;
             const submission = submissionMap.get(labId);
 
@@ -827,8 +859,8 @@ const AILab: React.FC = () => {
       }
     };
 
-    loadSavedSubmissions();
-  }, []);
+    mergeSavedSubmissions();
+  }, [catalog, submissions]);
 
   const handleUpload = async (e: React.ChangeEvent<HTMLInputElement>) => {
     if (!selectedLab || !e.target.files?.length) return;
@@ -867,6 +899,8 @@ const AILab: React.FC = () => {
   const handleSubmitForGrading = async () => {
     if (!selectedLab || !extractedFile) return;
 
+    // One key per submission: a double-click or retry while it runs is merged server-side
+    if (!gradeKeyRef.current) gradeKeyRef.current = crypto.randomUUID();
     setIsSubmitting(true);
 
     // Prepare cells info for API
@@ -881,20 +915,16 @@ const AILab: React.FC = () => {
     // Generate unique lab_id for database storage
     const labId = `lab_${selectedLab.id}`;
 
-    // Call AI grading API with lab_id and file_name
+    // Call AI grading API with lab_id and file_name (the server looks up the lab)
     const response = await aiAPI.gradeSubmission(
       labId,
-      {
-        title: selectedLab.title,
-        category: selectedLab.category,
-        description: selectedLab.description,
-        requirements: selectedLab.requirements
-      },
       extractedFile.rawContent,
       extractedFile.fileName,
-      cellsInfo
+      cellsInfo,
+      gradeKeyRef.current
     );
 
+    gradeKeyRef.current = null;
     setIsSubmitting(false);
     setShowPreview(false);
 
@@ -913,6 +943,7 @@ const AILab: React.FC = () => {
 
       setAssignments(prev => prev.map(a => a.id === selectedLab.id ? completedLab : a));
       setSelectedLab(completedLab);
+      onSubmissionsChange();
     } else {
       // Handle error - show with mock grading as fallback
       const completedLab: LabAssignment = {
@@ -13,6 +13,7 @@ import {
   RotateCcw
 } from 'lucide-react';
 import { assessmentAPI } from '../services/api';
+import type { AssessmentResultsResponse } from '../services/api';
 
 // ============================================
 // ASSESSMENT DATA
@@ -105,7 +106,14 @@ interface AssessmentProgress {
 // ============================================
 // MAIN COMPONENT
 // ============================================
-const Assessments: React.FC = () => {
+interface AssessmentsProps {
+  // Saved results from the dashboard request; null while it loads
+  results: AssessmentResultsResponse | null;
+  // Ask the dashboard to refetch after a result is saved
+  onResultsChange: () => void;
+}
+
+const Assessments: React.FC<AssessmentsProps> = ({ results, onResultsChange }) => {
   // State
   const [assessmentProgress, setAssessmentProgress] = useState<Record<number, AssessmentProgress>>({});
   const [isLoading, setIsLoading] = useState(true);
@@ -118,17 +126,16 @@ const Assessments: React.FC = () => {
   const [quizCompleted, setQuizCompleted] = useState(false);
   const [quizScore, setQuizScore] = useState(0);
 
-  // Fetch saved results on mount
+  // Apply saved results once the dashboard has loaded them
   useEffect(() => {
-    const loadSavedResults = async () => {
-      setIsLoading(true);
-      try {
-        const response = await assessmentAPI.getAssessmentResults();
+    if (!results) return;
 
-        if (response.success && response.results.length > 0) {
+    const loadSavedResults = () => {
+      try {
+        if (results.success && results.results && results.results.length > 0) {
           const progressMap: Record<number, AssessmentProgress> = {};
 
-          response.results.forEach(result => {
+          results.results.forEach(result => {
             progressMap[result.assessment_id] = {
               status: 'Completed',
               score: result.score,
@@ -139,7 +146,7 @@ const Assessments: React.FC = () => {
           setAssessmentProgress(progressMap);
 
           // Calculate average score
-          const scores = response.results.map(r => r.score);
+          const scores = results.results.map(r => r.score);
           const avg = Math.round(scores.reduce((a, b) => a + b, 0) / scores.length);
           setAverageScore(avg);
         }
@@ -151,7 +158,7 @@ const Assessments: React.FC = () => {
     };
 
     loadSavedResults();
-  }, []);
+  }, [results]);
 
   // Get effective status considering unlock logic
   const getEffectiveStatus = (id: number): AssessmentProgress => {
@@ -245,6 +252,7 @@ const Assessments: React.FC = () => {
         correct_answers: correct,
         passing_score: assessment.passingScore
       });
+      onResultsChange();
     } catch (error) {
       console.error('Error saving assessment result:', error);
     }
@@ -1,4 +1,4 @@
-import React, { useState, useEffect, useMemo } from 'react';
+import React, { useState, useEffect, useMemo, useCallback } from 'react';
 import {
   LayoutDashboard,
   BookOpen,
@@ -40,7 +40,8 @@ import {
   ClipboardCheck,
   Loader2
 } from 'lucide-react';
-import { chatAPI } from '../services/api';
+import { chatAPI, dashboardAPI } from '../services/api';
+import type { DashboardResponse } from '../services/api';
 
 import Curriculum from './Curriculum';
 import Projects from './Projects';
@@ -219,6 +220,8 @@ interface DashboardProps {
 
 const Dashboard: React.FC<DashboardProps> = ({ onLogout, username }) => {
   const [activeTab, setActiveTab] = useState('overview');
+  // Saved submissions, assessment results and exam history, fetched in one request (null while loading)
+  const [progress, setProgress] = useState<DashboardResponse['results'] | null>(null);
   const [activeVideo, setActiveVideo] = useState<string | null>(null);
   const [isProfileOpen, setIsProfileOpen] = useState(false);
   const [isNotificationsOpen, setIsNotificationsOpen] = useState(false);
@@ -244,6 +247,15 @@ const Dashboard: React.FC<DashboardProps> = ({ onLogout, username }) => {
   const [aiCorrectionResults, setAiCorrectionResults] = useState<Record<number, { loading: boolean; result: string | null; isCorrect: boolean | null }>>({});
   const [isSubmittingAll, setIsSubmittingAll] = useState(false);
 
+  const loadProgress = useCallback(async () => {
+    const res = await dashboardAPI.getDashboard(['submissions', 'assessment_results', 'exam_history']);
+    setProgress(res.results || {});
+  }, []);
+
+  useEffect(() => {
+    loadProgress();
+  }, [loadProgress]);
+
   // Per-question timer: resets when user views a new question
   useEffect(() => {
     let interval: any;
@@ -1265,16 +1277,25 @@ const Dashboard: React.FC<DashboardProps> = ({ onLogout, username }) => {
                 <Curriculum weeks={courseData.weeks} setActiveVideo={setActiveVideo!} />
               )}
               {activeTab === 'ailab' && (
-                <AILab />
+                <AILab
+                  submissions={progress && (progress.submissions ?? { success: false, submissions: [] })}
+                  onSubmissionsChange={loadProgress}
+                />
               )}
               {activeTab === 'projects' && (
                 <Projects projects={courseData.projects} selectedProject={selectedProject} setSelectedProject={setSelectedProject} />
               )}
               {activeTab === 'assessments' && (
-                <Assessments />
+                <Assessments
+                  results={progress && (progress.assessment_results ?? { success: false, results: [] })}
+                  onResultsChange={loadProgress}
+                />
               )}
               {activeTab === 'exammode' && (
-                <ExamMode />
+                <ExamMode
+                  examHistory={progress && (progress.exam_history ?? { success: false, exams: [] })}
+                  onHistoryChange={loadProgress}
+                />
               )}
               {activeTab === 'orcaai' && (
                 <OrcaAIPage />
@@ -20,7 +20,7 @@ import {
   ArrowLeft,
 } from 'lucide-react';
 import { examAPI } from '../services/api';
-import type { ExamQuestion, ExamResultItem, ExamHistoryItem, ExamDetailExam } from '../services/api';
+import type { ExamQuestion, ExamResultItem, ExamDetailExam, ExamHistoryResponse } from '../services/api';
 
 // ============================================
 // TYPES
@@ -28,10 +28,20 @@ import type { ExamQuestion, ExamResultItem, ExamHistoryItem, ExamDetailExam } fr
 type Screen = 'setup' | 'loading' | 'exam' | 'results' | 'history-detail';
 type Difficulty = 'easy' | 'medium' | 'hard';
 
+// Autosave once answers have stopped changing for this long
+const AUTOSAVE_DEBOUNCE_MS = 2000;
+
 // ============================================
 // MAIN COMPONENT
 // ============================================
-const ExamMode: React.FC = () => {
+interface ExamModeProps {
+  // Completed exams from the dashboard request; null while it loads
+  examHistory: ExamHistoryResponse | null;
+  // Ask the dashboard to refetch after an exam is submitted
+  onHistoryChange: () => void;
+}
+
+const ExamMode: React.FC<ExamModeProps> = ({ examHistory, onHistoryChange }) => {
   // Screen state
   const [screen, setScreen] = useState<Screen>('setup');
 
@@ -46,6 +56,7 @@ const ExamMode: React.FC = () => {
   const [currentQ, setCurrentQ] = useState(0);
   const [timeLeft, setTimeLeft] = useState(0);
   const timerRef = useRef<ReturnType<typeof setInterval> | null>(null);
+  const generateKeyRef = useRef<string | null>(null);
 
   // Results state
   const [results, setResults] = useState<ExamResultItem[]>([]);
@@ -55,20 +66,15 @@ const ExamMode: React.FC = () => {
   const [showConfirm, setShowConfirm] = useState(false);
 
   // History state
-  const [history, setHistory] = useState<ExamHistoryItem[]>([]);
+  const history = examHistory?.exams ?? [];
+  const loadingHistory = examHistory === null;
   const [selectedExam, setSelectedExam] = useState<ExamDetailExam | null>(null);
-  const [loadingHistory, setLoadingHistory] = useState(false);
   const [loadingDetail, setLoadingDetail] = useState(false);
 
   // Loading screen state
   const [loadingStep, setLoadingStep] = useState(0);
   const [tipIndex, setTipIndex] = useState(0);
 
-  // Fetch history on mount
-  useEffect(() => {
-    fetchHistory();
-  }, []);
-
   // Timer countdown
   useEffect(() => {
     if (screen === 'exam' && timeLeft > 0) {
@@ -117,19 +123,15 @@ const ExamMode: React.FC = () => {
     setIsSubmitting(false);
   }, [examId, answers]);
 
-  const fetchHistory = async () => {
-    setLoadingHistory(true);
-    const res = await examAPI.getHistory();
-    if (res.success) setHistory(res.exams || []);
-    setLoadingHistory(false);
-  };
-
   // ============================================
   // ACTIONS
   // ============================================
   const startExam = async () => {
+    // One key per start: a double-click or retry while it runs gets the same exam
+    if (!generateKeyRef.current) generateKeyRef.current = crypto.randomUUID();
     setScreen('loading');
-    const res = await examAPI.generateExam(difficulty, duration);
+    const res = await examAPI.generateExam(difficulty, duration, generateKeyRef.current);
+    generateKeyRef.current = null;
     if (res.success && res.questions && res.exam_id) {
       setExamId(res.exam_id);
       setQuestions(res.questions);
@@ -147,6 +149,13 @@ const ExamMode: React.FC = () => {
     setAnswers(prev => ({ ...prev, [String(questionId)]: optionIdx }));
   };
 
+  // Autosave answers so a crashed tab doesn't lose the exam; a burst of clicks is one save
+  useEffect(() => {
+    if (screen !== 'exam' || examId === null || Object.keys(answers).length === 0) return;
+    const timer = setTimeout(() => examAPI.autosaveExam(examId, answers), AUTOSAVE_DEBOUNCE_MS);
+    return () => clearTimeout(timer);
+  }, [screen, examId, answers]);
+
   const finishExam = async () => {
     if (!examId) return;
     setShowConfirm(false);
@@ -159,7 +168,7 @@ const ExamMode: React.FC = () => {
       setScore(res.score ?? 0);
       setCorrectCount(res.correct_count ?? 0);
       setScreen('results');
-      fetchHistory();
+      onHistoryChange();
     } else {
       alert(res.message || 'Failed to submit exam.');
     }
@@ -187,7 +196,7 @@ const ExamMode: React.FC = () => {
     setCurrentQ(0);
     setSelectedExam(null);
     if (timerRef.current) clearInterval(timerRef.current);
-    fetchHistory();
+    onHistoryChange();
   };
 
   // ============================================
@@ -78,6 +78,7 @@ const OrcaAI: React.FC = () => {
   const [messages, setMessages] = useState<ChatMessage[]>([]);
   const [inputValue, setInputValue] = useState('');
   const [isLoading, setIsLoading] = useState(false);
+  const [conversationId, setConversationId] = useState<number | null>(null);
   const messagesContainerRef = useRef<HTMLDivElement>(null);
   const inputRef = useRef<HTMLInputElement>(null);
 
@@ -117,7 +118,8 @@ const OrcaAI: React.FC = () => {
     setIsLoading(true);
 
     try {
-      const response = await chatAPI.sendMessage(userMessage.content, messages);
+      const response = await chatAPI.sendMessage(userMessage.content, messages, conversationId);
+      if (response.conversation_id) setConversationId(response.conversation_id);
 
       const assistantMessage: ChatMessage = {
         role: 'assistant',
@@ -145,6 +147,7 @@ const OrcaAI: React.FC = () => {
 
   const clearChat = () => {
     setMessages([]);
+    setConversationId(null);
   };
 
   const toggleExpand = () => {
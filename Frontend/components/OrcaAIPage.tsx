@@ -102,8 +102,14 @@ const OrcaAIPage: React.FC = () => {
   const [messages, setMessages] = useState<ChatMessage[]>([]);
   const [inputValue, setInputValue] = useState('');
   const [isLoading, setIsLoading] = useState(false);
+  const [conversationId, setConversationId] = useState<number | null>(null);
+  // Id of the oldest loaded message while older ones remain on the server
+  const [nextBefore, setNextBefore] = useState<number | null>(null);
+  const [isLoadingOlder, setIsLoadingOlder] = useState(false);
   const messagesContainerRef = useRef<HTMLDivElement>(null);
   const inputRef = useRef<HTMLTextAreaElement>(null);
+  // Scroll height before older messages were prepended, to keep the view in place
+  const prependedFromHeight = useRef<number | null>(null);
 
   // Scroll to bottom of messages container only
   const scrollToBottom = useCallback(() => {
@@ -115,9 +121,50 @@ const OrcaAIPage: React.FC = () => {
 
   // Auto-scroll to bottom when new messages arrive
   useEffect(() => {
+    const container = messagesContainerRef.current;
+    if (container && prependedFromHeight.current !== null) {
+      container.scrollTop += container.scrollHeight - prependedFromHeight.current;
+      prependedFromHeight.current = null;
+      return;
+    }
     scrollToBottom();
   }, [messages, scrollToBottom]);
 
+  // Resume the most recent conversation
+  useEffect(() => {
+    let cancelled = false;
+    (async () => {
+      const list = await chatAPI.getConversations(undefined, 1);
+      const latest = list.success ? list.conversations[0] : undefined;
+      if (!latest) return;
+      const page = await chatAPI.getMessages(latest.id);
+      if (cancelled || !page.success) return;
+      setConversationId(latest.id);
+      setMessages(page.messages);
+      setNextBefore(page.next_before);
+    })();
+    return () => { cancelled = true; };
+  }, []);
+
+  const loadOlderMessages = async () => {
+    if (conversationId === null || nextBefore === null || isLoadingOlder) return;
+    setIsLoadingOlder(true);
+    try {
+      const page = await chatAPI.getMessages(conversationId, nextBefore);
+      if (page.success) {
+        prependedFromHeight.current = messagesContainerRef.current?.scrollHeight ?? null;
+        setMessages(prev => [...page.messages, ...prev]);
+        setNextBefore(page.next_before);
+      }
+    } finally {
+      setIsLoadingOlder(false);
+    }
+  };
+
+  const handleScroll = (e: React.UIEvent<HTMLDivElement>) => {
+    if (e.currentTarget.scrollTop < 80) loadOlderMessages();
+  };
+
   const handleSend = async () => {
     if (!inputValue.trim() || isLoading) return;
 
@@ -131,7 +178,8 @@ const OrcaAIPage: React.FC = () => {
     setIsLoading(true);
 
     try {
-      const response = await chatAPI.sendMessage(userMessage.content, messages);
+      const response = await chatAPI.sendMessage(userMessage.content, messages, conversationId);
+      if (response.conversation_id) setConversationId(response.conversation_id);
 
       const assistantMessage: ChatMessage = {
         role: 'assistant',
@@ -157,8 +205,11 @@ const OrcaAIPage: React.FC = () => {
     }
   };
 
+  // Start a new conversation; earlier ones stay saved on the server
   const clearChat = () => {
     setMessages([]);
+    setConversationId(null);
+    setNextBefore(null);
   };
 
   const quickPrompts = [
@@ -200,6 +251,7 @@ const OrcaAIPage: React.FC = () => {
         {/* Messages Area */}
         <div
           ref={messagesContainerRef}
+          onScroll={handleScroll}
           className="flex-1 overflow-y-auto p-3 md:p-5 space-y-4"
           style={{ overscrollBehavior: 'contain' }}
         >
@@ -235,6 +287,9 @@ const OrcaAIPage: React.FC = () => {
             </div>
           ) : (
             <>
+              {isLoadingOlder && (
+                <div className="text-center text-[11px] text-slate-400">Loading earlier messages...</div>
+              )}
               {messages.map((message, index) => (
                 <div
                   key={index}
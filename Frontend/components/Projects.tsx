@@ -20,7 +20,8 @@ import {
   Download,
   FileJson,
   Code,
-  Sparkles
+  Sparkles,
+  FileArchive
 } from 'lucide-react';
 import { projectAPI } from '../services/api';
 
@@ -531,11 +532,13 @@ const Projects: React.FC<{
   setSelectedProject: (project: Project) => void;
 }> = ({ projects, selectedProject, setSelectedProject }) => {
   const [uploadedFiles, setUploadedFiles] = useState<ExtractedFile[]>([]);
+  const [zipFile, setZipFile] = useState<File | null>(null);
   const [isEvaluating, setIsEvaluating] = useState(false);
   const [evalResult, setEvalResult] = useState<EvalResult | null>(null);
   const [evalError, setEvalError] = useState<string | null>(null);
   const [previewFile, setPreviewFile] = useState<ExtractedFile | null>(null);
   const fileInputRef = useRef<HTMLInputElement>(null);
+  const evalKeyRef = useRef<string | null>(null);
 
   const handleFileSelect = async (e: React.ChangeEvent<HTMLInputElement>) => {
     const files = e.target.files;
@@ -545,20 +548,31 @@ const Projects: React.FC<{
     for (let i = 0; i < files.length; i++) {
       const file = files[i];
       const ext = file.name.split('.').pop()?.toLowerCase();
+      if (ext === 'zip') {
+        // Uploaded as-is; the server extracts the source files
+        setZipFile(file);
+        continue;
+      }
       if (ext !== 'py' && ext !== 'ipynb') continue;
       const content = await file.text();
+      // Path within the project when a folder was picked, else the file name
+      const path = file.webkitRelativePath || file.name;
       try {
         if (ext === 'ipynb') {
-          newFiles.push(extractIpynbFile(file.name, content, file.size));
+          newFiles.push(extractIpynbFile(path, content, file.size));
         } else {
-          newFiles.push(extractPyFile(file.name, content, file.size));
+          newFiles.push(extractPyFile(path, content, file.size));
         }
       } catch {
         // Skip invalid files
       }
     }
 
-    setUploadedFiles(prev => [...prev, ...newFiles]);
+    // Re-selecting a file replaces it; the server keys stored reviews by path
+    setUploadedFiles(prev => [
+      ...prev.filter(f => !newFiles.some(n => n.fileName === f.fileName)),
+      ...newFiles,
+    ]);
     setEvalResult(null);
     setEvalError(null);
     if (fileInputRef.current) fileInputRef.current.value = '';
@@ -572,8 +586,10 @@ const Projects: React.FC<{
   };
 
   const handleEvaluate = async () => {
-    if (!selectedProject || uploadedFiles.length === 0) return;
+    if (!selectedProject || (uploadedFiles.length === 0 && !zipFile)) return;
 
+    // One key per evaluation: a double-click or retry while it runs is merged server-side
+    if (!evalKeyRef.current) evalKeyRef.current = crypto.randomUUID();
     setIsEvaluating(true);
     setEvalResult(null);
     setEvalError(null);
@@ -584,15 +600,16 @@ const Projects: React.FC<{
         content: extractForEval(f).slice(0, 15000),
       }));
 
-      const response = await projectAPI.evaluateProject(
-        {
-          title: selectedProject.title,
-          description: selectedProject.desc,
-          tech_stack: selectedProject.techStack,
-          steps: selectedProject.steps,
-        },
-        filesForEval
-      );
+      const projectInfo = {
+        title: selectedProject.title,
+        description: selectedProject.desc,
+        tech_stack: selectedProject.techStack,
+        steps: selectedProject.steps,
+      };
+
+      const response = zipFile
+        ? await projectAPI.evaluateProjectZip(projectInfo, zipFile, String(selectedProject.id), evalKeyRef.current)
+        : await projectAPI.evaluateProject(projectInfo, filesForEval, String(selectedProject.id), evalKeyRef.current);
 
       if (response.success && response.result) {
         setEvalResult(response.result);
@@ -602,6 +619,7 @@ const Projects: React.FC<{
     } catch (err: any) {
       setEvalError(err?.message || 'Failed to connect to evaluation service. Please ensure the backend server is running.');
     } finally {
+      evalKeyRef.current = null;
       setIsEvaluating(false);
       setPreviewFile(null);
     }
@@ -609,6 +627,7 @@ const Projects: React.FC<{
 
   const resetUpload = () => {
     setUploadedFiles([]);
+    setZipFile(null);
     setEvalResult(null);
     setEvalError(null);
     setPreviewFile(null);
@@ -754,7 +773,7 @@ const Projects: React.FC<{
                                 ref={fileInputRef}
                                 type="file"
                                 multiple
-                                accept=".py,.ipynb"
+                                accept=".py,.ipynb,.zip"
                                 onChange={handleFileSelect}
                                 className="hidden"
                               />
@@ -762,12 +781,28 @@ const Projects: React.FC<{
                                 <FileCode size={20} className="text-slate-400 group-hover:text-[#00A0E3] transition-colors" />
                               </div>
                               <p className="text-xs font-bold text-slate-600">Click to upload files</p>
-                              <p className="text-[10px] text-slate-400 mt-0.5">.py and .ipynb files supported</p>
+                              <p className="text-[10px] text-slate-400 mt-0.5">.py and .ipynb files, or a .zip of the project</p>
                             </div>
 
                             {/* Uploaded Files List */}
-                            {uploadedFiles.length > 0 && (
+                            {(uploadedFiles.length > 0 || zipFile) && (
                               <div className="mt-3 space-y-2">
+                                {zipFile && (
+                                  <div className="flex items-center justify-between p-2.5 bg-slate-50 border border-slate-200 rounded-xl">
+                                    <div className="flex items-center gap-2 min-w-0 flex-1">
+                                      <FileArchive size={14} className="text-emerald-500 flex-shrink-0" />
+                                      <span className="text-xs font-medium text-slate-700 truncate">{zipFile.name}</span>
+                                      <span className="text-[10px] text-slate-400 flex-shrink-0">{formatSize(zipFile.size)}</span>
+                                    </div>
+                                    <button
+                                      onClick={() => { setZipFile(null); setEvalResult(null); setEvalError(null); }}
+                                      className="p-1.5 hover:bg-slate-200 rounded-lg text-slate-400 hover:text-red-500 transition-colors flex-shrink-0 ml-2"
+                                      title="Remove archive"
+                                    >
+                                      <X size={12} />
+                                    </button>
+                                  </div>
+                                )}
                                 {uploadedFiles.map((file) => (
                                   <div key={file.fileName} className="flex items-center justify-between p-2.5 bg-slate-50 border border-slate-200 rounded-xl">
                                     <div className="flex items-center gap-2 min-w-0 flex-1">
@@ -818,7 +853,9 @@ const Projects: React.FC<{
                                     </>
                                   ) : (
                                     <>
-                                      <Upload size={14} /> Evaluate {uploadedFiles.length} file{uploadedFiles.length > 1 ? 's' : ''}
+                                      <Upload size={14} /> {zipFile
+                                        ? `Evaluate ${zipFile.name}`
+                                        : `Evaluate ${uploadedFiles.length} file${uploadedFiles.length > 1 ? 's' : ''}`}
                                     </>
                                   )}
                                 </button>
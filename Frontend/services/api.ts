@@ -74,6 +74,15 @@ async function apiRequest<T>(
   }
 }
 
+/**
+ * Headers with an Idempotency-Key when the caller has one. Callers keep one
+ * key per user action (reused by retries and double-clicks of that action);
+ * without a key the server coalesces identical in-flight requests by body.
+ */
+function idempotencyHeaders(idempotencyKey?: string, headers: Record<string, string> = {}): Record<string, string> {
+  return idempotencyKey ? { ...headers, 'Idempotency-Key': idempotencyKey } : headers;
+}
+
 /**
  * Authentication API functions
  */
@@ -87,6 +96,17 @@ interface LabInfo {
   requirements: string[];
 }
 
+interface CatalogLab extends LabInfo {
+  id: number;
+  lab_id: string;
+  version: string;
+}
+
+interface LabsResponse {
+  success: boolean;
+  labs: CatalogLab[];
+}
+
 interface CellInfo {
   index: number;
   type: string;
@@ -227,23 +247,20 @@ export const aiAPI = {
    */
   gradeSubmission: async (
     labId: string,
-    labInfo: LabInfo,
     codeContent: string,
     fileName?: string,
-    cellsInfo?: CellInfo[]
+    cellsInfo?: CellInfo[],
+    idempotencyKey?: string
   ): Promise<GradingResponse> => {
     const url = `${API_BASE_URL}/ai/grade/`;
 
     try {
       const response = await fetch(url, {
         method: 'POST',
-        headers: {
-          'Content-Type': 'application/json',
-        },
+        headers: idempotencyHeaders(idempotencyKey, { 'Content-Type': 'application/json' }),
         credentials: 'include',
         body: JSON.stringify({
           lab_id: labId,
-          lab_info: labInfo,
           code_content: codeContent,
           file_name: fileName || '',
           cells_info: cellsInfo || null,
@@ -262,6 +279,29 @@ export const aiAPI = {
     }
   },
 
+  /**
+   * Get the lab catalog used for grading
+   */
+  getLabs: async (): Promise<LabsResponse> => {
+    const url = `${API_BASE_URL}/ai/labs/`;
+
+    try {
+      const response = await fetch(url, {
+        method: 'GET',
+        credentials: 'include',
+      });
+
+      const data = await response.json();
+      return data;
+    } catch (error) {
+      console.error('Get Labs Error:', error);
+      return {
+        success: false,
+        labs: [],
+      };
+    }
+  },
+
   /**
    * Get all submissions for the current user
    */
@@ -409,6 +449,7 @@ export const assessmentAPI = {
 // ============================================
 
 interface ChatMessage {
+  id?: number;
   role: 'user' | 'assistant';
   content: string;
 }
@@ -417,26 +458,54 @@ interface ChatResponse {
   success: boolean;
   message: string;
   response: string | null;
+  conversation_id?: number | null;
+}
+
+interface ChatConversation {
+  id: number;
+  title: string;
+  created_at: string;
+  updated_at: string;
+}
+
+interface ChatConversationsResponse {
+  success: boolean;
+  conversations: ChatConversation[];
+  next_cursor: string | null;
+}
+
+interface ChatMessagesResponse {
+  success: boolean;
+  message?: string;
+  conversation?: { id: number; title: string; updated_at: string };
+  messages: ChatMessage[];
+  next_before: number | null;
 }
 
 export const chatAPI = {
   /**
    * Send a message to OrcaAI
    */
-  sendMessage: async (message: string, history: ChatMessage[]): Promise<ChatResponse> => {
+  sendMessage: async (
+    message: string,
+    history: ChatMessage[],
+    conversationId: number | null = null
+  ): Promise<ChatResponse> => {
     const url = `${API_BASE_URL}/ai/chat/`;
 
     try {
+      // With a conversation_id the server reads the history itself
       const response = await fetch(url, {
         method: 'POST',
         headers: {
           'Content-Type': 'application/json',
         },
         credentials: 'include',
-        body: JSON.stringify({
-          message,
-          history,
-        }),
+        body: JSON.stringify(
+          conversationId !== null
+            ? { message, conversation_id: conversationId }
+            : { message, history: history.map(({ role, content }) => ({ role, content })) }
+        ),
       });
 
       const data = await response.json();
@@ -450,6 +519,40 @@ export const chatAPI = {
       };
     }
   },
+
+  /**
+   * Saved conversations, most recently active first.
+   * Pass next_cursor from the previous page as `before` for the next one.
+   */
+  getConversations: async (before?: string, limit: number = 20): Promise<ChatConversationsResponse> => {
+    const params = new URLSearchParams({ limit: String(limit) });
+    if (before) params.set('before', before);
+    const url = `${API_BASE_URL}/ai/chat/conversations/?${params}`;
+    try {
+      const response = await fetch(url, { method: 'GET', credentials: 'include' });
+      return response.json();
+    } catch (error) {
+      console.error('Chat Conversations Error:', error);
+      return { success: false, conversations: [], next_cursor: null };
+    }
+  },
+
+  /**
+   * Latest page of a conversation's messages, or the page before message id `before`
+   * (use next_before from the previous page when scrolling up)
+   */
+  getMessages: async (conversationId: number, before?: number, limit: number = 30): Promise<ChatMessagesResponse> => {
+    const params = new URLSearchParams({ limit: String(limit) });
+    if (before !== undefined) params.set('before', String(before));
+    const url = `${API_BASE_URL}/ai/chat/conversations/${conversationId}/messages/?${params}`;
+    try {
+      const response = await fetch(url, { method: 'GET', credentials: 'include' });
+      return response.json();
+    } catch (error) {
+      console.error('Chat Messages Error:', error);
+      return { success: false, messages: [], next_before: null };
+    }
+  },
 };
 
 // ============================================
@@ -531,12 +634,16 @@ interface ExamDetailResponse {
 }
 
 export const examAPI = {
-  generateExam: async (difficulty: string, durationMinutes: number): Promise<ExamGenerateResponse> => {
+  generateExam: async (
+    difficulty: string,
+    durationMinutes: number,
+    idempotencyKey?: string
+  ): Promise<ExamGenerateResponse> => {
     const url = `${API_BASE_URL}/ai/exam/generate/`;
     try {
       const response = await fetch(url, {
         method: 'POST',
-        headers: { 'Content-Type': 'application/json' },
+        headers: idempotencyHeaders(idempotencyKey, { 'Content-Type': 'application/json' }),
         credentials: 'include',
         body: JSON.stringify({ difficulty, duration_minutes: durationMinutes }),
       });
@@ -563,6 +670,22 @@ export const examAPI = {
     }
   },
 
+  autosaveExam: async (examId: number, answers: Record<string, number | null>): Promise<{ success: boolean; message?: string }> => {
+    const url = `${API_BASE_URL}/ai/exam/autosave/`;
+    try {
+      const response = await fetch(url, {
+        method: 'POST',
+        headers: { 'Content-Type': 'application/json' },
+        credentials: 'include',
+        body: JSON.stringify({ exam_id: examId, answers }),
+      });
+      return response.json();
+    } catch (error) {
+      console.error('Exam Autosave Error:', error);
+      return { success: false, message: 'Failed to autosave answers' };
+    }
+  },
+
   getHistory: async (): Promise<ExamHistoryResponse> => {
     const url = `${API_BASE_URL}/ai/exam/history/`;
     try {
@@ -606,20 +729,51 @@ interface ProjectEvalResponse {
   success: boolean;
   message: string;
   result: ProjectEvalResult | null;
+  submission_id?: number | null;
+  reused_files?: string[];
+  skipped_files?: { file_name: string; reason: string }[];
+}
+
+interface ProjectSubmissionData {
+  id: number;
+  project_id: string;
+  project_title: string;
+  overall_score: number;
+  code_quality: number;
+  completeness: number;
+  technical_implementation: number;
+  files: string[];
+  result: ProjectEvalResult;
+  submitted_at: string;
+  updated_at: string;
+}
+
+interface ProjectSubmissionsResponse {
+  success: boolean;
+  submissions: ProjectSubmissionData[];
+}
+
+interface SingleProjectSubmissionResponse {
+  success: boolean;
+  submission: ProjectSubmissionData | null;
+  message?: string;
 }
 
 export const projectAPI = {
   evaluateProject: async (
     projectInfo: { title: string; description: string; tech_stack: string[]; steps: string[] },
-    filesContent: { file_name: string; content: string }[]
+    filesContent: { file_name: string; content: string }[],
+    projectId?: string,
+    idempotencyKey?: string
   ): Promise<ProjectEvalResponse> => {
     const url = `${API_BASE_URL}/ai/project/evaluate/`;
     try {
       const response = await fetch(url, {
         method: 'POST',
-        headers: { 'Content-Type': 'application/json' },
+        headers: idempotencyHeaders(idempotencyKey, { 'Content-Type': 'application/json' }),
         credentials: 'include',
         body: JSON.stringify({
+          project_id: projectId,
           project_info: projectInfo,
           files_content: filesContent,
         }),
@@ -630,6 +784,99 @@ export const projectAPI = {
       return { success: false, message: 'Failed to evaluate project', result: null };
     }
   },
+
+  /**
+   * Evaluate a zipped project; the server keeps only source files
+   * (no venv/, data files or binaries) and lists the rest in skipped_files
+   */
+  evaluateProjectZip: async (
+    projectInfo: { title: string; description: string; tech_stack: string[]; steps: string[] },
+    zipFile: File,
+    projectId?: string,
+    idempotencyKey?: string
+  ): Promise<ProjectEvalResponse> => {
+    const url = `${API_BASE_URL}/ai/project/evaluate/`;
+    const form = new FormData();
+    form.append('project_info', JSON.stringify(projectInfo));
+    if (projectId) form.append('project_id', projectId);
+    form.append('file', zipFile);
+    try {
+      // No Content-Type header: the browser sets the multipart boundary
+      const response = await fetch(url, {
+        method: 'POST',
+        headers: idempotencyHeaders(idempotencyKey),
+        credentials: 'include',
+        body: form,
+      });
+      return response.json();
+    } catch (error) {
+      console.error('Project Evaluation Error:', error);
+      return { success: false, message: 'Failed to evaluate project', result: null };
+    }
+  },
+
+  /**
+   * Get all saved project evaluations for the current user
+   */
+  getSubmissions: async (): Promise<ProjectSubmissionsResponse> => {
+    const url = `${API_BASE_URL}/ai/project/submissions/`;
+    try {
+      const response = await fetch(url, { method: 'GET', credentials: 'include' });
+      return response.json();
+    } catch (error) {
+      console.error('Project Submissions Error:', error);
+      return { success: false, submissions: [] };
+    }
+  },
+
+  /**
+   * Get the saved evaluation of one project
+   */
+  getSubmission: async (projectId: string): Promise<SingleProjectSubmissionResponse> => {
+    const url = `${API_BASE_URL}/ai/project/submissions/${encodeURIComponent(projectId)}/`;
+    try {
+      const response = await fetch(url, { method: 'GET', credentials: 'include' });
+      return response.json();
+    } catch (error) {
+      console.error('Project Submission Error:', error);
+      return { success: false, submission: null, message: 'Failed to fetch project evaluation' };
+    }
+  },
+};
+
+// ============================================
+// DASHBOARD API (batched reads)
+// ============================================
+
+type DashboardResource = 'auth' | 'submissions' | 'assessment_results' | 'exam_history';
+
+interface DashboardResponse {
+  success: boolean;
+  message?: string;
+  results: {
+    auth?: { authenticated: boolean; user: User | null };
+    submissions?: SubmissionsResponse;
+    assessment_results?: AssessmentResultsResponse;
+    exam_history?: ExamHistoryResponse;
+  };
+}
+
+export const dashboardAPI = {
+  /**
+   * Fetch several read resources in one request (all of them by default).
+   * Each entry has the same shape as its standalone endpoint's response.
+   */
+  getDashboard: async (include?: DashboardResource[]): Promise<DashboardResponse> => {
+    const query = include && include.length ? `?include=${include.join(',')}` : '';
+    const url = `${API_BASE_URL}/ai/dashboard/${query}`;
+    try {
+      const response = await fetch(url, { method: 'GET', credentials: 'include' });
+      return response.json();
+    } catch (error) {
+      console.error('Dashboard Error:', error);
+      return { success: false, message: 'Failed to load dashboard', results: {} };
+    }
+  },
 };
 
 export type {
@@ -638,6 +885,8 @@ export type {
   SignupData,
   ApiResponse,
   LabInfo,
+  CatalogLab,
+  LabsResponse,
   CellInfo,
   GradingResult,
   GradingResponse,
@@ -651,6 +900,9 @@ export type {
   AssessmentResultsResponse,
   ChatMessage,
   ChatResponse,
+  ChatConversation,
+  ChatConversationsResponse,
+  ChatMessagesResponse,
   ExamQuestion,
   ExamGenerateResponse,
   ExamResultItem,
@@ -660,5 +912,10 @@ export type {
   ExamDetailExam,
   ExamDetailResponse,
   ProjectEvalResult,
-  ProjectEvalResponse
+  ProjectEvalResponse,
+  ProjectSubmissionData,
+  ProjectSubmissionsResponse,
+  SingleProjectSubmissionResponse,
+  DashboardResource,
+  DashboardResponse
 };
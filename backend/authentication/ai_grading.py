@@ -4,64 +4,180 @@ Analyzes code submissions against lab requirements
 """
 
 import os
+import asyncio
+import hashlib
 import json
-import re
+import time
+from asgiref.sync import sync_to_async
 from google import genai
 from google.genai import types
 
+from . import llm_cassette, llm_usage, model_router, retrieval, structured_output
+from .labs import lab_prompt_header
+from .model_router import Route
+from .structured_output import Bool, Enum, Int, List, Object, Str, StructuredOutputError
+
 # Get API key from environment or use default
 GEMINI_API_KEY = os.environ.get("GEMINI_API_KEY", "")
+# Model of calls no settings.LLM_ROUTES rule matches (see model_router.py)
 MODEL_NAME = "gemini-2.5-flash"
+DEFAULT_ROUTE = Route("default", MODEL_NAME)
+
+# "gemini" for the real API, "fake" for the latency-injecting stub in fake_llm.py
+LLM_BACKEND = os.environ.get("LLM_BACKEND", "gemini")
+
+_client = None
+
+
+def get_client() -> genai.Client:
+    """Shared Gemini client (reuses its HTTP connection pool across calls)"""
+    global _client
+    if _client is None:
+        _client = genai.Client(api_key=GEMINI_API_KEY)
+    return _client
+
 
+def choose_route(feature: str, contents: list, config: types.GenerateContentConfig,
+                 difficulty: str = None) -> Route:
+    """The model_router route for a call, from its features and the caller's tier"""
+    prompt_tokens = model_router.estimate_tokens(config.system_instruction or '') + sum(
+        model_router.estimate_tokens(part.text or '')
+        for content in contents for part in (content.parts or [])
+    )
+    return model_router.route(feature, prompt_tokens, DEFAULT_ROUTE, difficulty, llm_usage.current_tier())
 
-def create_grading_prompt(lab_info: dict, code_content: str, cells_info: list = None) -> str:
+
+async def _agenerate_content(feature: str, model: str, contents: list, config: types.GenerateContentConfig):
+    if LLM_BACKEND == "fake":
+        from . import fake_llm
+        return await fake_llm.agenerate_content(feature, contents, config)
+    return await get_client().aio.models.generate_content(
+        model=model,
+        contents=contents,
+        config=config,
+    )
+
+
+async def agenerate(feature: str, contents: list, config: types.GenerateContentConfig,
+                    route: Route = None, difficulty: str = None):
     """
-    Create a comprehensive prompt for AI grading with strict evaluation
+    Call generate_content on the routed model and record token usage,
+    latency and route in the ledger. Uses the google-genai aio client, so
+    an in-flight call holds no worker thread. With LLM_CASSETTE set, calls
+    are recorded to or replayed from disk (llm_cassette.py).
+
+    Args:
+        feature: Ledger feature name ('grade', 'chat', 'exam', 'project')
+        contents: Request contents
+        config: Generation config
+        route: Model route; chosen by model_router when omitted
+        difficulty: Exam difficulty (a routing feature)
+
+    Returns:
+        The google-genai response
     """
+    route = route or choose_route(feature, contents, config, difficulty)
+    start = time.perf_counter()
+    response = None
+    try:
+        if llm_cassette.MODE == "replay":
+            response = await llm_cassette.areplay(route.model, contents, config)
+        else:
+            response = await _agenerate_content(feature, route.model, contents, config)
+            if llm_cassette.MODE == "record":
+                await llm_cassette.arecord(feature, route.model, contents, config, response,
+                                           time.perf_counter() - start)
+        return response
+    finally:
+        await sync_to_async(llm_usage.record)(
+            feature,
+            route.model,
+            getattr(response, 'usage_metadata', None),
+            time.perf_counter() - start,
+            response is not None,
+            route.name,
+        )
 
-    prompt = f"""You are a STRICT AI code grader. Evaluate the student's submission against the lab requirements.
 
-## CRITICAL RULE - WRONG SUBMISSION = ZERO SCORE
-If the submitted code is for a DIFFERENT project/task than what was assigned:
-- Set overall_score to 0
-- Set code_quality, accuracy, efficiency all to 0
-- Mark ALL requirements as "not_met"
-- Clearly state in feedback that wrong code was submitted
+# Follow-up calls for required fields still invalid after a structured call
+STRUCTURED_REPAIR_ATTEMPTS = int(os.environ.get("STRUCTURED_REPAIR_ATTEMPTS", 1))
 
-## LAB ASSIGNMENT
 
-**Title:** {lab_info.get('title', 'Unknown')}
-**Category:** {lab_info.get('category', 'Unknown')}
-**Description:** {lab_info.get('description', 'No description')}
+def _repair_contents(contents: list, value: dict, prompt: str) -> list:
+    """The original turn, the output validated so far and the repair prompt"""
+    return contents + [
+        types.Content(role="model", parts=[types.Part.from_text(text=json.dumps(value, ensure_ascii=False))]),
+        types.Content(role="user", parts=[types.Part.from_text(text=prompt)]),
+    ]
 
-**Requirements:**
-"""
 
-    requirements = lab_info.get('requirements', [])
-    for i, req in enumerate(requirements, 1):
-        prompt += f"{i}. {req}\n"
+def _structured_result(value: dict, errors: list) -> dict:
+    invalid = structured_output.invalid_required(errors)
+    if invalid:
+        raise StructuredOutputError(
+            "Invalid AI response: " + '; '.join(str(e) for e in invalid[:5]), invalid,
+        )
+    return value
 
-    prompt += f"""
 
-## STUDENT'S CODE
+def _escalation(route: Route, e: StructuredOutputError):
+    escalated = route.escalated()
+    if escalated is not None:
+        print(f"Model route {route.name}: invalid output from {route.model} ({e}), "
+              f"retrying on {escalated.model}")
+    return escalated
 
-```python
-{code_content[:8000]}
-```
-"""
 
-    if cells_info and len(cells_info) > 0:
-        prompt += "\n## NOTEBOOK CELLS & OUTPUTS\n"
-        for cell in cells_info[:15]:  # Limit cells
-            cell_type = cell.get('type', 'unknown')
-            source = cell.get('source', '')[:1000]
-            prompt += f"\n[{cell_type.upper()}]\n```\n{source}\n```\n"
-            for output in cell.get('outputs', [])[:2]:
-                for content in output.get('content', [])[:1]:
-                    if content.get('type') in ['stream', 'text']:
-                        prompt += f"Output: {content.get('text', '')[:300]}\n"
+async def agenerate_structured(feature: str, contents: list, config: types.GenerateContentConfig,
+                               spec: Object, difficulty: str = None) -> dict:
+    """
+    agenerate() for a call with a response_schema: validates the output
+    against spec and asks again for the required fields that are invalid
+    (never the whole output), at most STRUCTURED_REPAIR_ATTEMPTS times.
+    Output that stays invalid is generated again on the route's
+    escalate_to model, if it has one.
 
-    prompt += """
+    Returns:
+        The validated output
+
+    Raises:
+        StructuredOutputError: unusable JSON, or required fields still invalid
+    """
+    route = choose_route(feature, contents, config, difficulty)
+    try:
+        return await _agenerate_structured(feature, contents, config, spec, route)
+    except StructuredOutputError as e:
+        escalated = _escalation(route, e)
+        if escalated is None:
+            raise
+        return await _agenerate_structured(feature, contents, config, spec, escalated)
+
+
+async def _agenerate_structured(feature: str, contents: list, config: types.GenerateContentConfig,
+                                spec: Object, route: Route) -> dict:
+    response = await agenerate(feature, contents, config, route)
+    value, errors = structured_output.parse(response.text, spec)
+    for _ in range(STRUCTURED_REPAIR_ATTEMPTS):
+        repair = structured_output.repair_request(spec, value, errors)
+        if repair is None:
+            break
+        repair_spec, prompt = repair
+        print(f"Structured output ({feature}) repair call for: {', '.join(repair_spec.fields)}")
+        repair_config = config.model_copy(update={'response_schema': repair_spec.schema()})
+        response = await agenerate(feature, _repair_contents(contents, value, prompt), repair_config, route)
+        value, errors = structured_output.merge(spec, value, errors, repair_spec, response.text)
+    return _structured_result(value, errors)
+
+
+# Static part of every grading prompt, sent as system_instruction
+GRADING_SYSTEM_INSTRUCTION = """You are a STRICT AI code grader. Evaluate the student's submission against the lab requirements.
+
+## CRITICAL RULE - WRONG SUBMISSION = ZERO SCORE
+If the submitted code is for a DIFFERENT project/task than what was assigned:
+- Set overall_score to 0
+- Set code_quality, accuracy, efficiency all to 0
+- Mark ALL requirements as "not_met"
+- Clearly state in feedback that wrong code was submitted
 
 ## EVALUATION CRITERIA
 
@@ -100,13 +216,133 @@ If the submitted code is for a DIFFERENT project/task than what was assigned:
 - No lengthy paragraphs
 - If wrong code submitted: overall_score = 0, explain briefly why
 
-Return ONLY valid JSON, no markdown formatting.
-"""
+Return ONLY valid JSON, no markdown formatting."""
+
+GRADING_OUTPUT = Object({
+    "is_relevant": Bool(default=True),
+    "relevance_issue": Str(default=None, nullable=True),
+    "overall_score": Int(0, 100, required=True),
+    "code_quality": Int(0, 100, required=True),
+    "accuracy": Int(0, 100, required=True),
+    "efficiency": Int(0, 100, required=True),
+    "requirements_analysis": List(Object({
+        "requirement": Str(required=True),
+        "status": Enum(("met", "partial", "not_met"), default="not_met", required=True),
+        "explanation": Str(),
+    }), max_items=6),
+    "strengths": List(Str(), max_items=3),
+    "areas_for_improvement": List(Str(), max_items=3),
+    "detailed_feedback": Str(default="Submission evaluated."),
+    "code_suggestions": List(Str(), max_items=3),
+    "learning_resources": List(Str(), max_items=3),
+})
+
+
+def create_grading_prompt(lab_info: dict, code_content: str, cells_info: list = None,
+                          header: str = None) -> str:
+    """
+    Create the per-submission part of the grading prompt (the rubric is
+    GRADING_SYSTEM_INSTRUCTION)
+
+    Args:
+        header: Pre-rendered LAB ASSIGNMENT section (Lab.prompt_header);
+            rendered from lab_info when omitted
+    """
+    parts = [header or lab_prompt_header(lab_info)]
+
+    parts.append(f"""
 
-    return prompt
+## STUDENT'S CODE
 
+```python
+{code_content[:8000]}
+```
+""")
 
-def grade_submission(lab_info: dict, code_content: str, cells_info: list = None) -> dict:
+    if cells_info and len(cells_info) > 0:
+        parts.append("\n## NOTEBOOK CELLS & OUTPUTS\n")
+        for cell in cells_info[:15]:  # Limit cells
+            cell_type = cell.get('type', 'unknown')
+            source = cell.get('source', '')[:1000]
+            parts.append(f"\n[{cell_type.upper()}]\n```\n{source}\n```\n")
+            for output in cell.get('outputs', [])[:2]:
+                for content in output.get('content', [])[:1]:
+                    if content.get('type') in ['stream', 'text']:
+                        parts.append(f"Output: {content.get('text', '')[:300]}\n")
+
+    return ''.join(parts)
+
+
+def build_grading_request(lab_info: dict, code_content: str, cells_info: list = None, header: str = None):
+    """
+    Build the contents and config of a grading call
+
+    Returns:
+        Tuple of (contents, generate_content_config)
+    """
+    # Create the grading prompt
+    prompt = create_grading_prompt(lab_info, code_content, cells_info, header)
+
+    # Create content for API
+    contents = [
+        types.Content(
+            role="user",
+            parts=[
+                types.Part.from_text(text=prompt),
+            ],
+        ),
+    ]
+
+    # Configure generation
+    generate_content_config = types.GenerateContentConfig(
+        system_instruction=GRADING_SYSTEM_INSTRUCTION,
+        response_mime_type="application/json",
+        response_schema=GRADING_OUTPUT.schema(),
+        thinking_config=types.ThinkingConfig(
+            thinking_budget=-1,
+        ),
+    )
+
+    return contents, generate_content_config
+
+
+def grading_result(output: dict) -> dict:
+    """
+    The grading result from a validated GRADING_OUTPUT
+    """
+    result = {"success": True, **output}
+
+    # If not relevant, force score to 0
+    if not output["is_relevant"] or output["relevance_issue"]:
+        result["overall_score"] = 0
+        result["code_quality"] = 0
+        result["accuracy"] = 0
+        result["efficiency"] = 0
+
+    return result
+
+
+def grading_error(e: Exception) -> dict:
+    """Grading result returned when the call or parsing fails"""
+    # Return error response
+    return {
+        "success": False,
+        "error": str(e),
+        "is_relevant": False,
+        "overall_score": 0,
+        "code_quality": 0,
+        "accuracy": 0,
+        "efficiency": 0,
+        "requirements_analysis": [],
+        "strengths": [],
+        "areas_for_improvement": ["Error during analysis"],
+        "detailed_feedback": f"Analysis error: {str(e)[:100]}",
+        "code_suggestions": [],
+        "learning_resources": [],
+    }
+
+
+async def agrade_submission(lab_info: dict, code_content: str, cells_info: list = None, header: str = None) -> dict:
     """
     Grade a code submission using Gemini AI
 
@@ -114,104 +350,18 @@ def grade_submission(lab_info: dict, code_content: str, cells_info: list = None)
         lab_info: Dictionary containing lab title, description, requirements, category
         code_content: The raw code content from the submission
         cells_info: Optional list of notebook cells with their outputs
+        header: Optional pre-rendered LAB ASSIGNMENT section (Lab.prompt_header)
 
     Returns:
         Dictionary containing grading results
     """
-
     try:
-        # Initialize Gemini client
-        client = genai.Client(api_key=GEMINI_API_KEY)
-
-        # Create the grading prompt
-        prompt = create_grading_prompt(lab_info, code_content, cells_info)
-
-        # Create content for API
-        contents = [
-            types.Content(
-                role="user",
-                parts=[
-                    types.Part.from_text(text=prompt),
-                ],
-            ),
-        ]
-
-        # Configure generation
-        generate_content_config = types.GenerateContentConfig(
-            response_mime_type="application/json",
-            thinking_config=types.ThinkingConfig(
-                thinking_budget=-1,
-            ),
-        )
-
-        # Generate response
-        response = client.models.generate_content(
-            model=MODEL_NAME,
-            contents=contents,
-            config=generate_content_config,
-        )
-
-        # Parse the JSON response
-        response_text = response.text
-
-        # Try to extract JSON from response
-        try:
-            result = json.loads(response_text)
-        except json.JSONDecodeError:
-            # Try to find JSON in the response
-            json_match = re.search(r'\{[\s\S]*\}', response_text)
-            if json_match:
-                result = json.loads(json_match.group())
-            else:
-                raise ValueError("Could not parse JSON from response")
-
-        # Check if submission is relevant
-        is_relevant = result.get("is_relevant", True)
-        relevance_issue = result.get("relevance_issue", None)
-
-        # If not relevant, force score to 0
-        if not is_relevant or relevance_issue:
-            result["overall_score"] = 0
-            result["code_quality"] = 0
-            result["accuracy"] = 0
-            result["efficiency"] = 0
-
-        # Validate and sanitize the result
-        validated_result = {
-            "success": True,
-            "is_relevant": is_relevant,
-            "relevance_issue": relevance_issue,
-            "overall_score": min(100, max(0, int(result.get("overall_score", 0)))),
-            "code_quality": min(100, max(0, int(result.get("code_quality", 0)))),
-            "accuracy": min(100, max(0, int(result.get("accuracy", 0)))),
-            "efficiency": min(100, max(0, int(result.get("efficiency", 0)))),
-            "requirements_analysis": result.get("requirements_analysis", [])[:6],
-            "strengths": result.get("strengths", [])[:3],
-            "areas_for_improvement": result.get("areas_for_improvement", [])[:3],
-            "detailed_feedback": result.get("detailed_feedback", "Submission evaluated."),
-            "code_suggestions": result.get("code_suggestions", [])[:3],
-            "learning_resources": result.get("learning_resources", [])[:3],
-        }
-
-        return validated_result
+        contents, generate_content_config = build_grading_request(lab_info, code_content, cells_info, header)
+        output = await agenerate_structured("grade", contents, generate_content_config, GRADING_OUTPUT)
+        return grading_result(output)
 
     except Exception as e:
-        # Return error response
-        return {
-            "success": False,
-            "error": str(e),
-            "is_relevant": False,
-            "overall_score": 0,
-            "code_quality": 0,
-            "accuracy": 0,
-            "efficiency": 0,
-            "requirements_analysis": [],
-            "strengths": [],
-            "areas_for_improvement": ["Error during analysis"],
-            "detailed_feedback": f"Analysis error: {str(e)[:100]}",
-            "code_suggestions": [],
-            "learning_resources": [],
-        }
+        return grading_error(e)
 
 
 # ============================================
@@ -234,75 +384,76 @@ Guidelines:
 - When explaining code, use markdown code blocks
 - Be encouraging and supportive
 - If asked about topics outside AI/ML/programming, politely redirect to relevant topics
+- When course material is included with a question, base your answer on it and name the module or lab it comes from
 - Never provide harmful content or help with cheating
 
 You have a friendly, professional tone with a touch of enthusiasm for AI!"""
 
 
-def chat_with_orca(messages: list, user_message: str) -> dict:
+def build_chat_request(messages: list, user_message: str):
     """
-    Chat with OrcaAI using Gemini
-
-    Args:
-        messages: List of previous messages in the conversation
-        user_message: The current user message
+    Build the contents and config of an OrcaAI chat call
 
     Returns:
-        Dictionary containing the AI response
+        Tuple of (contents, generate_content_config)
     """
+    # Build conversation contents (the persona is the system_instruction)
+    contents = []
 
-    try:
-        # Initialize Gemini client
-        client = genai.Client(api_key=GEMINI_API_KEY)
-
-        # Build conversation contents
-        contents = []
-
-        # Add system instruction as first user message context
-        system_context = types.Content(
-            role="user",
-            parts=[types.Part.from_text(text=f"[System Instructions - Follow these guidelines]\n{ORCA_SYSTEM_PROMPT}\n\n[End of System Instructions]")],
-        )
-        contents.append(system_context)
-
-        # Add acknowledgment from model
-        ack = types.Content(
-            role="model",
-            parts=[types.Part.from_text(text="I understand. I am OrcaAI, your AI learning assistant. I'll help you with AI, ML, and programming questions!")],
-        )
-        contents.append(ack)
-
-        # Add conversation history (limit to last 10 messages to avoid token limits)
-        for msg in messages[-10:]:
-            role = "user" if msg.get("role") == "user" else "model"
-            contents.append(
-                types.Content(
-                    role=role,
-                    parts=[types.Part.from_text(text=msg.get("content", ""))],
-                )
-            )
-
-        # Add current user message
+    # Add conversation history (limit to last 10 messages to avoid token limits)
+    for msg in messages[-10:]:
+        role = "user" if msg.get("role") == "user" else "model"
         contents.append(
             types.Content(
-                role="user",
-                parts=[types.Part.from_text(text=user_message)],
+                role=role,
+                parts=[types.Part.from_text(text=msg.get("content", ""))],
             )
         )
 
-        # Configure generation (no JSON format for chat)
-        generate_content_config = types.GenerateContentConfig(
-            temperature=0.7,
-            top_p=0.9,
-            max_output_tokens=1024,
+    # Add current user message, grounded in the most relevant course chunks
+    course_material = retrieval.context_for(user_message)
+    if course_material:
+        user_message = f"[Course material]\n{course_material}\n[End of course material]\n\n{user_message}"
+    contents.append(
+        types.Content(
+            role="user",
+            parts=[types.Part.from_text(text=user_message)],
         )
+    )
 
-        # Generate response
-        response = client.models.generate_content(
-            model=MODEL_NAME,
-            contents=contents,
-            config=generate_content_config,
-        )
+    # Configure generation (no JSON format for chat)
+    generate_content_config = types.GenerateContentConfig(
+        system_instruction=ORCA_SYSTEM_PROMPT,
+        temperature=0.7,
+        top_p=0.9,
+        max_output_tokens=1024,
+    )
+
+    return contents, generate_content_config
+
+
+def chat_error(e: Exception) -> dict:
+    return {
+        "success": False,
+        "error": str(e),
+        "response": "I apologize, but I'm having trouble processing your request right now. Please try again in a moment.",
+    }
+
+
+async def achat_with_orca(messages: list, user_message: str) -> dict:
+    """
+    Chat with OrcaAI using Gemini
+
+    Args:
+        messages: List of previous messages in the conversation
+        user_message: The current user message
+
+    Returns:
+        Dictionary containing the AI response
+    """
+    try:
+        contents, generate_content_config = build_chat_request(messages, user_message)
+        response = await agenerate("chat", contents, generate_content_config)
 
         return {
             "success": True,
@@ -310,11 +461,7 @@ def chat_with_orca(messages: list, user_message: str) -> dict:
         }
 
     except Exception as e:
-        return {
-            "success": False,
-            "error": str(e),
-            "response": "I apologize, but I'm having trouble processing your request right now. Please try again in a moment.",
-        }
+        return chat_error(e)
 
 
 # ============================================
@@ -361,30 +508,8 @@ Module 5: Deployment & Responsible AI
 """
 
 
-def generate_exam_questions(difficulty: str, num_questions: int) -> dict:
-    """
-    Generate exam questions using Gemini AI based on curriculum topics.
-
-    Args:
-        difficulty: 'easy', 'medium', or 'hard'
-        num_questions: Number of questions to generate
-
-    Returns:
-        Dictionary with list of questions including correct answers
-    """
-    try:
-        client = genai.Client(api_key=GEMINI_API_KEY)
-
-        difficulty_guide = {
-            'easy': "Basic definitions, recall, and foundational concepts. Straightforward questions.",
-            'medium': "Application-based, comparisons, scenario analysis. Tests understanding beyond recall.",
-            'hard': "Advanced scenarios, architecture decisions, edge cases, deep technical reasoning.",
-        }
-
-        prompt = f"""Generate exactly {num_questions} unique multiple-choice questions for an Applied AI exam.
-
-DIFFICULTY: {difficulty.upper()}
-GUIDELINES: {difficulty_guide.get(difficulty, difficulty_guide['medium'])}
+# Static part of every exam generation prompt, sent as system_instruction
+EXAM_SYSTEM_INSTRUCTION = f"""You write multiple-choice questions for an Applied AI exam.
 
 CURRICULUM:
 {CURRICULUM_TOPICS}
@@ -413,99 +538,133 @@ RETURN FORMAT (strict JSON only, no markdown):
 
 IMPORTANT:
 - correct_answer is 0-based index (0=A, 1=B, 2=C, 3=D)
-- Generate EXACTLY {num_questions} questions
+- Generate EXACTLY the number of questions requested
 - Return ONLY valid JSON
 - Make distractors plausible but clearly wrong to experts"""
 
-        contents = [
-            types.Content(
-                role="user",
-                parts=[types.Part.from_text(text=prompt)],
-            ),
-        ]
-
-        generate_content_config = types.GenerateContentConfig(
-            response_mime_type="application/json",
-            temperature=0.8,
-            top_p=0.95,
-        )
+EXAM_DIFFICULTY_GUIDE = {
+    'easy': "Basic definitions, recall, and foundational concepts. Straightforward questions.",
+    'medium': "Application-based, comparisons, scenario analysis. Tests understanding beyond recall.",
+    'hard': "Advanced scenarios, architecture decisions, edge cases, deep technical reasoning.",
+}
 
-        response = client.models.generate_content(
-            model=MODEL_NAME,
-            contents=contents,
-            config=generate_content_config,
-        )
 
-        response_text = response.text
-        try:
-            result = json.loads(response_text)
-        except json.JSONDecodeError:
-            json_match = re.search(r'\{[\s\S]*\}', response_text)
-            if json_match:
-                result = json.loads(json_match.group())
-            else:
-                raise ValueError("Could not parse JSON from AI response")
-
-        questions = result.get('questions', [])
-
-        validated = []
-        for i, q in enumerate(questions[:num_questions]):
-            validated.append({
-                'id': i + 1,
-                'question': q.get('question', ''),
-                'options': q.get('options', [])[:4],
-                'correct_answer': min(max(int(q.get('correct_answer', 0)), 0), 3),
-                'explanation': q.get('explanation', ''),
-                'topic': q.get('topic', 'General'),
-            })
-
-        return {'success': True, 'questions': validated}
+def exam_output(num_questions: int) -> Object:
+    """Output of an exam generation call for num_questions questions"""
+    return Object({
+        "questions": List(Object({
+            "question": Str(required=True),
+            "options": List(Str(), min_items=4, max_items=4, required=True),
+            # An out-of-range answer key is a broken question, not clamped
+            "correct_answer": Int(0, 3, clamp=False, required=True),
+            "explanation": Str(),
+            "topic": Str(default="General"),
+        }), min_items=num_questions, max_items=num_questions, required=True),
+    })
 
-    except Exception as e:
-        return {'success': False, 'error': str(e), 'questions': []}
 
+def build_exam_request(difficulty: str, num_questions: int):
+    """
+    Build the contents and config of an exam generation call
+
+    Returns:
+        Tuple of (contents, generate_content_config)
+    """
+    prompt = f"""Generate exactly {num_questions} unique multiple-choice questions for an Applied AI exam.
+
+DIFFICULTY: {difficulty.upper()}
+GUIDELINES: {EXAM_DIFFICULTY_GUIDE.get(difficulty, EXAM_DIFFICULTY_GUIDE['medium'])}"""
+
+    contents = [
+        types.Content(
+            role="user",
+            parts=[types.Part.from_text(text=prompt)],
+        ),
+    ]
+
+    generate_content_config = types.GenerateContentConfig(
+        system_instruction=EXAM_SYSTEM_INSTRUCTION,
+        response_mime_type="application/json",
+        response_schema=exam_output(num_questions).schema(),
+        temperature=0.8,
+        top_p=0.95,
+    )
+
+    return contents, generate_content_config
 
-def evaluate_project_files(project_info: dict, files_content: list) -> dict:
+
+def exam_result(output: dict) -> dict:
+    """
+    The generated questions from a validated exam_output(), numbered from 1
+    """
+    questions = [{'id': i, **q} for i, q in enumerate(output['questions'], 1)]
+    return {'success': True, 'questions': questions}
+
+
+async def agenerate_exam_questions(difficulty: str, num_questions: int) -> dict:
     """
-    Evaluate project files using Gemini AI
+    Generate exam questions using Gemini AI based on curriculum topics.
 
     Args:
-        project_info: Dict with title, description, tech_stack, steps
-        files_content: List of dicts with file_name and content
+        difficulty: 'easy', 'medium', or 'hard'
+        num_questions: Number of questions to generate
 
     Returns:
-        Dictionary with evaluation results
+        Dictionary with list of questions including correct answers
     """
     try:
-        client = genai.Client(api_key=GEMINI_API_KEY)
+        contents, generate_content_config = build_exam_request(difficulty, num_questions)
+        output = await agenerate_structured("exam", contents, generate_content_config,
+                                            exam_output(num_questions), difficulty)
+        return exam_result(output)
+
+    except Exception as e:
+        return {'success': False, 'error': str(e), 'questions': []}
 
-        prompt = f"""You are an AI project evaluator. Evaluate the student's project submission.
 
-## PROJECT ASSIGNMENT
+# Map-reduce project evaluation: files are split into chunks of at most
+# PROJECT_CHUNK_CHARS, each chunk is reviewed by its own call (at most
+# PROJECT_MAP_WORKERS at a time) and a small summary call turns the reviews
+# into the final scores. Projects that fit in one chunk use a single call.
+PROJECT_CHUNK_CHARS = 12000
+PROJECT_MAX_CHUNKS = 32
+PROJECT_MAP_WORKERS = int(os.environ.get("PROJECT_MAP_WORKERS", 8))
+
+
+def project_assignment(project_info: dict) -> str:
+    """Assignment section shared by all project evaluation prompts"""
+    text = f"""## PROJECT ASSIGNMENT
 **Title:** {project_info.get('title', 'Unknown')}
 **Description:** {project_info.get('description', '')}
 **Tech Stack:** {', '.join(project_info.get('tech_stack', []))}
 
 **Expected Steps:**
 """
-        for i, step in enumerate(project_info.get('steps', []), 1):
-            prompt += f"{i}. {step}\n"
+    for i, step in enumerate(project_info.get('steps', []), 1):
+        text += f"{i}. {step}\n"
+    return text
 
-        prompt += "\n## SUBMITTED FILES\n"
-        for f in files_content:
-            content = f.get('content', '')[:12000]
-            prompt += f"\n### File: {f['file_name']}\n```python\n{content}\n```\n"
 
-        prompt += """
-## EVALUATION CRITERIA
+PROJECT_CRITERIA = """## EVALUATION CRITERIA
 1. **Relevance** - Does the code match the project assignment?
 2. **Code Quality** - Structure, readability, best practices
 3. **Completeness** - Are all project steps implemented?
 4. **Technical Implementation** - Correct use of tech stack
 5. **Innovation** - Creative solutions, extra features
+"""
+
+PROJECT_RULES = """RULES:
+- All feedback must be concise (max 15 words per point)
+- Max 3 strengths, 3 improvement areas
+- If code doesn't match project, score = 0
+- Return ONLY valid JSON"""
 
+# Static parts of the project evaluation prompts, sent as system_instruction
+PROJECT_SYSTEM_INSTRUCTION = f"""You are an AI project evaluator. Evaluate the student's project submission.
+
+{PROJECT_CRITERIA}
 ## RESPONSE FORMAT (JSON)
-{
+{{
     "overall_score": 0-100,
     "code_quality": 0-100,
     "completeness": 0-100,
@@ -514,72 +673,449 @@ def evaluate_project_files(project_info: dict, files_content: list) -> dict:
     "areas_for_improvement": ["point 1", "point 2"],
     "detailed_feedback": "Brief 2-3 sentence evaluation",
     "file_reviews": [
-        {"file_name": "name.py", "score": 0-100, "feedback": "Brief feedback"}
+        {{"file_name": "name.py", "score": 0-100, "feedback": "Brief feedback",
+          "summary": "What this file does (max 40 words)",
+          "steps_covered": [numbers of the expected steps implemented in this file]}}
     ]
+}}
+
+{PROJECT_RULES}"""
+
+PROJECT_FILE_SYSTEM_INSTRUCTION = """You are an AI project evaluator reviewing ONE file of a student's project submission.
+
+## RESPONSE FORMAT (JSON)
+{
+    "score": 0-100,
+    "feedback": "Brief feedback on this file",
+    "summary": "What this code does",
+    "steps_covered": [numbers of the expected steps implemented here],
+    "strengths": ["point 1", "point 2"],
+    "issues": ["point 1", "point 2"]
 }
 
 RULES:
-- All feedback must be concise (max 15 words per point)
-- Max 3 strengths, 3 improvement areas
-- If code doesn't match project, score = 0
-- Return ONLY valid JSON
-"""
+- Judge only this file; other files are reviewed separately
+- feedback max 15 words, summary max 40 words, max 2 strengths and 2 issues
+- If the code is unrelated to the project, score = 0
+- Return ONLY valid JSON"""
 
-        contents = [
-            types.Content(
-                role="user",
-                parts=[types.Part.from_text(text=prompt)],
-            ),
-        ]
-
-        generate_content_config = types.GenerateContentConfig(
-            response_mime_type="application/json",
-            thinking_config=types.ThinkingConfig(
-                thinking_budget=-1,
-            ),
-        )
+PROJECT_SUMMARY_SYSTEM_INSTRUCTION = f"""You are an AI project evaluator. Each file of the student's project was reviewed separately; combine the reviews into the final evaluation.
 
-        response = client.models.generate_content(
-            model=MODEL_NAME,
-            contents=contents,
-            config=generate_content_config,
-        )
+{PROJECT_CRITERIA.replace('implemented?', 'implemented across the files?')}
+## RESPONSE FORMAT (JSON)
+{{
+    "overall_score": 0-100,
+    "code_quality": 0-100,
+    "completeness": 0-100,
+    "technical_implementation": 0-100,
+    "strengths": ["point 1", "point 2", "point 3"],
+    "areas_for_improvement": ["point 1", "point 2"],
+    "detailed_feedback": "Brief 2-3 sentence evaluation"
+}}
 
-        response_text = response.text
-        try:
-            result = json.loads(response_text)
-        except json.JSONDecodeError:
-            json_match = re.search(r'\{[\s\S]*\}', response_text)
-            if json_match:
-                result = json.loads(json_match.group())
-            else:
-                raise ValueError("Could not parse JSON from response")
+{PROJECT_RULES}"""
 
-        return {
+
+PROJECT_SCORES = {
+    "overall_score": Int(0, 100, required=True),
+    "code_quality": Int(0, 100, required=True),
+    "completeness": Int(0, 100, required=True),
+    "technical_implementation": Int(0, 100, required=True),
+    "strengths": List(Str(), max_items=3),
+    "areas_for_improvement": List(Str(), max_items=3),
+    "detailed_feedback": Str(default="Submission evaluated."),
+}
+
+PROJECT_OUTPUT = Object({
+    **PROJECT_SCORES,
+    "file_reviews": List(Object({
+        "file_name": Str(required=True),
+        "score": Int(0, 100, required=True),
+        "feedback": Str(),
+        "summary": Str(),
+        "steps_covered": List(Int(1, clamp=False)),
+    })),
+})
+
+PROJECT_SUMMARY_OUTPUT = Object(PROJECT_SCORES)
+
+PROJECT_FILE_OUTPUT = Object({
+    "score": Int(0, 100, required=True),
+    "feedback": Str(),
+    "summary": Str(),
+    "steps_covered": List(Int(1, clamp=False)),
+    "strengths": List(Str(), max_items=2),
+    "issues": List(Str(), max_items=2),
+})
+
+
+def build_project_request(project_info: dict, files_content: list):
+    """
+    Build the contents and config of a project evaluation call
+
+    Returns:
+        Tuple of (contents, generate_content_config)
+    """
+    parts = [project_assignment(project_info), "\n## SUBMITTED FILES\n"]
+    for f in files_content:
+        content = f.get('content', '')[:12000]
+        parts.append(f"\n### File: {f['file_name']}\n```python\n{content}\n```\n")
+
+    contents = [
+        types.Content(
+            role="user",
+            parts=[types.Part.from_text(text=''.join(parts))],
+        ),
+    ]
+
+    generate_content_config = types.GenerateContentConfig(
+        system_instruction=PROJECT_SYSTEM_INSTRUCTION,
+        response_mime_type="application/json",
+        response_schema=PROJECT_OUTPUT.schema(),
+        thinking_config=types.ThinkingConfig(
+            thinking_budget=-1,
+        ),
+    )
+
+    return contents, generate_content_config
+
+
+def project_result(output: dict) -> dict:
+    """
+    The evaluation result from a validated PROJECT_OUTPUT or
+    PROJECT_SUMMARY_OUTPUT (whose file_reviews come from the chunk reviews)
+    """
+    return {"success": True, **output}
+
+
+def project_error(e: Exception) -> dict:
+    return {
+        "success": False,
+        "error": str(e),
+        "overall_score": 0,
+        "code_quality": 0,
+        "completeness": 0,
+        "technical_implementation": 0,
+        "strengths": [],
+        "areas_for_improvement": ["Error during evaluation"],
+        "detailed_feedback": f"Evaluation error: {str(e)[:100]}",
+        "file_reviews": [],
+    }
+
+
+def _split_content(content: str, limit: int) -> list:
+    """Split text into pieces of at most limit chars, on line boundaries where possible"""
+    pieces, current, size = [], [], 0
+    for line in content.splitlines(keepends=True):
+        while len(line) > limit:
+            if current:
+                pieces.append(''.join(current))
+                current, size = [], 0
+            pieces.append(line[:limit])
+            line = line[limit:]
+        if size + len(line) > limit:
+            pieces.append(''.join(current))
+            current, size = [], 0
+        current.append(line)
+        size += len(line)
+    if current or not pieces:
+        pieces.append(''.join(current))
+    return pieces
+
+
+def project_file_hash(f: dict) -> str:
+    """Hash of a submitted file (name and content); its reviews are reused while it is unchanged"""
+    return hashlib.sha256(f"{f.get('file_name', '')}\0{f.get('content', '') or ''}".encode('utf-8')).hexdigest()
+
+
+def chunk_project_files(files_content: list) -> tuple:
+    """
+    Split submitted files into review chunks.
+
+    Returns:
+        Tuple of (chunks, skipped file names). Each chunk is a dict with
+        file_name, hash (of the whole file), part, parts and content; files
+        past PROJECT_MAX_CHUNKS are skipped.
+    """
+    chunks, skipped = [], []
+    for f in files_content:
+        file_name = f.get('file_name', 'unknown')
+        file_hash = project_file_hash(f)
+        pieces = _split_content(f.get('content', '') or '', PROJECT_CHUNK_CHARS)
+        if len(chunks) + len(pieces) > PROJECT_MAX_CHUNKS:
+            skipped.append(file_name)
+            continue
+        for i, piece in enumerate(pieces, 1):
+            chunks.append({'file_name': file_name, 'hash': file_hash, 'part': i, 'parts': len(pieces), 'content': piece})
+    return chunks, skipped
+
+
+def build_project_file_request(project_info: dict, chunk: dict):
+    """
+    Build the contents and config of the review call for one file chunk
+
+    Returns:
+        Tuple of (contents, generate_content_config)
+    """
+    part = f" (part {chunk['part']} of {chunk['parts']})" if chunk['parts'] > 1 else ""
+    prompt = project_assignment(project_info)
+    prompt += f"\n## FILE: {chunk['file_name']}{part}\n```python\n{chunk['content']}\n```\n"
+
+    contents = [
+        types.Content(
+            role="user",
+            parts=[types.Part.from_text(text=prompt)],
+        ),
+    ]
+
+    generate_content_config = types.GenerateContentConfig(
+        system_instruction=PROJECT_FILE_SYSTEM_INSTRUCTION,
+        response_mime_type="application/json",
+        response_schema=PROJECT_FILE_OUTPUT.schema(),
+        thinking_config=types.ThinkingConfig(
+            thinking_budget=-1,
+        ),
+    )
+
+    return contents, generate_content_config
+
+
+def project_file_result(output: dict, chunk: dict) -> dict:
+    """
+    The review of a file chunk from a validated PROJECT_FILE_OUTPUT
+    """
+    return {
+        "success": True,
+        "file_name": chunk['file_name'],
+        "hash": chunk['hash'],
+        "part": chunk['part'],
+        "parts": chunk['parts'],
+        "size": len(chunk['content']),
+        **output,
+    }
+
+
+def project_file_error(e: Exception, chunk: dict) -> dict:
+    return {
+        "success": False,
+        "error": str(e),
+        "file_name": chunk['file_name'],
+        "hash": chunk['hash'],
+        "part": chunk['part'],
+        "parts": chunk['parts'],
+        "size": len(chunk['content']),
+    }
+
+
+async def areview_project_chunk(project_info: dict, chunk: dict) -> dict:
+    """Review one file chunk (map step). Never raises."""
+    try:
+        contents, generate_content_config = build_project_file_request(project_info, chunk)
+        output = await agenerate_structured("project_file", contents, generate_content_config, PROJECT_FILE_OUTPUT)
+        return project_file_result(output, chunk)
+    except Exception as e:
+        return project_file_error(e, chunk)
+
+
+def build_project_summary_request(project_info: dict, reviews: list, skipped: list):
+    """
+    Build the contents and config of the summary (reduce) call from the
+    per-chunk reviews; its size grows with the number of chunks, not the code
+
+    Returns:
+        Tuple of (contents, generate_content_config)
+    """
+    parts = [project_assignment(project_info), "\n## FILE REVIEWS\n"]
+    for review in reviews:
+        part = f" (part {review['part']} of {review['parts']})" if review['parts'] > 1 else ""
+        if not review['success']:
+            parts.append(f"\n### {review['file_name']}{part}\nCould not be reviewed.\n")
+            continue
+        steps = ', '.join(str(s) for s in review['steps_covered']) or 'none'
+        parts.append(f"""
+### {review['file_name']}{part}
+Score: {review['score']}
+Summary: {review['summary']}
+Steps covered: {steps}
+""")
+        # Reviews kept from a single-call evaluation have feedback instead
+        if 'strengths' in review:
+            parts.append(f"Strengths: {'; '.join(review['strengths']) or 'none'}\n"
+                         f"Issues: {'; '.join(review['issues']) or 'none'}\n")
+        else:
+            parts.append(f"Feedback: {review['feedback'] or 'none'}\n")
+
+    if skipped:
+        parts.append(f"\nNot reviewed (size limit reached): {', '.join(skipped)}\n")
+
+    contents = [
+        types.Content(
+            role="user",
+            parts=[types.Part.from_text(text=''.join(parts))],
+        ),
+    ]
+
+    generate_content_config = types.GenerateContentConfig(
+        system_instruction=PROJECT_SUMMARY_SYSTEM_INSTRUCTION,
+        response_mime_type="application/json",
+        response_schema=PROJECT_SUMMARY_OUTPUT.schema(),
+        thinking_config=types.ThinkingConfig(
+            thinking_budget=-1,
+        ),
+    )
+
+    return contents, generate_content_config
+
+
+def merge_file_reviews(reviews: list, skipped: list) -> list:
+    """
+    One file_reviews entry per file: the size-weighted score of its chunks
+    and the feedback of its weakest chunk.
+    """
+    by_file = {}
+    for review in reviews:
+        by_file.setdefault(review['file_name'], []).append(review)
+
+    file_reviews = []
+    for file_name, parts in by_file.items():
+        ok = [r for r in parts if r['success']]
+        if not ok:
+            file_reviews.append({"file_name": file_name, "score": 0, "feedback": "Could not be reviewed"})
+            continue
+        total = sum(r['size'] for r in ok) or 1
+        score = round(sum(r['score'] * r['size'] for r in ok) / total)
+        weakest = min(ok, key=lambda r: r['score'])
+        file_reviews.append({"file_name": file_name, "score": score, "feedback": weakest['feedback']})
+
+    for file_name in skipped:
+        file_reviews.append({"file_name": file_name, "score": 0, "feedback": "Not reviewed: project too large"})
+    return file_reviews
+
+
+def _collect_reviews(chunks: list, known_reviews: dict, fresh: list) -> tuple:
+    """
+    Combine reused reviews of unchanged files with the fresh ones.
+
+    Returns:
+        Tuple of (reviews in file order, {file hash: reviews} of fully reviewed files)
+    """
+    by_hash = {}
+    for chunk in chunks:
+        if chunk['hash'] in known_reviews:
+            by_hash[chunk['hash']] = known_reviews[chunk['hash']]
+        else:
+            by_hash.setdefault(chunk['hash'], [])
+    for review in fresh:
+        by_hash[review['hash']].append(review)
+
+    reviews = [review for file_reviews in by_hash.values() for review in file_reviews]
+    reusable = {h: rs for h, rs in by_hash.items() if all(r['success'] for r in rs)}
+    return reviews, reusable
+
+
+def _fits_single_call(chunks: list, skipped: list, known_reviews: dict) -> bool:
+    """
+    Small projects keep the single-call prompt (one round trip instead of
+    two), unless some files have reviews to reuse: then only the changed
+    files are reviewed and the summary call combines all reviews.
+    """
+    return (
+        not skipped
+        and not any(c['hash'] in known_reviews for c in chunks)
+        and sum(len(c['content']) for c in chunks) <= PROJECT_CHUNK_CHARS
+    )
+
+
+def single_call_reviews(output: dict, chunks: list) -> dict:
+    """
+    Per-file reviews of a single-call evaluation, in the chunk review format
+    of the map step, so the next evaluation can reuse them.
+
+    Returns:
+        {file hash: [review]} for the files the output reviewed
+    """
+    by_name = {chunk['file_name']: chunk for chunk in chunks}
+    reviews = {}
+    for file_review in output.get('file_reviews', []):
+        chunk = by_name.get(file_review['file_name'])
+        if chunk is None or chunk['parts'] != 1:
+            continue
+        reviews[chunk['hash']] = [{
             "success": True,
-            "overall_score": min(100, max(0, int(result.get("overall_score", 0)))),
-            "code_quality": min(100, max(0, int(result.get("code_quality", 0)))),
-            "completeness": min(100, max(0, int(result.get("completeness", 0)))),
-            "technical_implementation": min(100, max(0, int(result.get("technical_implementation", 0)))),
-            "strengths": result.get("strengths", [])[:3],
-            "areas_for_improvement": result.get("areas_for_improvement", [])[:3],
-            "detailed_feedback": result.get("detailed_feedback", "Submission evaluated."),
-            "file_reviews": result.get("file_reviews", []),
-        }
+            "file_name": chunk['file_name'],
+            "hash": chunk['hash'],
+            "part": 1,
+            "parts": 1,
+            "size": len(chunk['content']),
+            "score": file_review['score'],
+            "feedback": file_review['feedback'],
+            "summary": file_review['summary'],
+            "steps_covered": file_review['steps_covered'],
+        }]
+    return reviews
+
+
+async def aevaluate_project_files(project_info: dict, files_content: list, known_reviews: dict = None) -> dict:
+    """
+    Evaluate project files using Gemini AI. Chunk reviews run as concurrent
+    tasks, at most PROJECT_MAP_WORKERS at a time.
+
+    Args:
+        project_info: Dict with title, description, tech_stack, steps
+        files_content: List of dicts with file_name and content
+        known_reviews: {file hash: chunk reviews} from a previous evaluation
+            of the same project; those files are not sent again
+
+    Returns:
+        Dictionary with evaluation results, with "chunk_reviews"
+        ({file hash: chunk reviews}) for the next call.
+    """
+    known_reviews = known_reviews or {}
+    try:
+        chunks, skipped = chunk_project_files(files_content)
+        if _fits_single_call(chunks, skipped, known_reviews):
+            contents, generate_content_config = build_project_request(project_info, files_content)
+            output = await agenerate_structured("project", contents, generate_content_config, PROJECT_OUTPUT)
+            result = project_result(output)
+            result["chunk_reviews"] = single_call_reviews(output, chunks)
+            return result
+
+        semaphore = asyncio.Semaphore(PROJECT_MAP_WORKERS)
+
+        async def review(chunk):
+            async with semaphore:
+                return await areview_project_chunk(project_info, chunk)
+
+        pending = [chunk for chunk in chunks if chunk['hash'] not in known_reviews]
+        fresh = await asyncio.gather(*(review(chunk) for chunk in pending))
+        reviews, reusable = _collect_reviews(chunks, known_reviews, fresh)
+
+        if not any(r['success'] for r in reviews):
+            return project_error(RuntimeError(reviews[0]['error']))
+
+        contents, generate_content_config = build_project_summary_request(project_info, reviews, skipped)
+        output = await agenerate_structured("project", contents, generate_content_config,
+                                            PROJECT_SUMMARY_OUTPUT)
+        result = project_result(output)
+        result["file_reviews"] = merge_file_reviews(reviews, skipped)
+        result["chunk_reviews"] = reusable
+        return result
 
     except Exception as e:
-        return {
-            "success": False,
-            "error": str(e),
-            "overall_score": 0,
-            "code_quality": 0,
-            "completeness": 0,
-            "technical_implementation": 0,
-            "strengths": [],
-            "areas_for_improvement": ["Error during evaluation"],
-            "detailed_feedback": f"Evaluation error: {str(e)[:100]}",
-            "file_reviews": [],
-        }
+        return project_error(e)
+
+
+# Marker stored in the compact result vector for skipped questions
+UNANSWERED = -1
+
+
+def answer_index(value, option_count: int) -> int:
+    """A stored answer as an option index, or UNANSWERED if missing or out of range"""
+    try:
+        value = int(value)
+    except (TypeError, ValueError):
+        return UNANSWERED
+    return value if 0 <= value < option_count else UNANSWERED
 
 
 def grade_exam(questions: list, student_answers: dict) -> dict:
@@ -588,10 +1124,14 @@ def grade_exam(questions: list, student_answers: dict) -> dict:
 
     Args:
         questions: List of questions with correct_answer field
-        student_answers: Dict mapping question_id (str) to selected option index (int)
+        student_answers: Dict mapping question_id (str) to selected option index (int);
+            indexes outside the question's options count as unanswered
 
     Returns:
-        Dictionary with results per question and total score
+        Dictionary with the compact result vector and total score.
+        Each entry of 'results' is [student_answer, is_correct], with
+        student_answer = UNANSWERED (-1) when the question was skipped.
+        Use expand_exam_results() to rebuild the per-question details.
     """
     results = []
     correct_count = 0
@@ -599,29 +1139,14 @@ def grade_exam(questions: list, student_answers: dict) -> dict:
 
     for q in questions:
         qid = str(q['id'])
-        student_ans = student_answers.get(qid)
+        student_ans = answer_index(student_answers.get(qid), len(q['options']))
         correct_ans = q['correct_answer']
-
-        # Handle case where student didn't answer
-        if student_ans is not None:
-            student_ans = int(student_ans)
-            is_correct = student_ans == correct_ans
-        else:
-            is_correct = False
+        is_correct = student_ans == correct_ans
 
         if is_correct:
             correct_count += 1
 
-        results.append({
-            'question_id': q['id'],
-            'question': q['question'],
-            'options': q['options'],
-            'student_answer': student_ans,
-            'correct_answer': correct_ans,
-            'is_correct': is_correct,
-            'explanation': q.get('explanation', ''),
-            'topic': q.get('topic', ''),
-        })
+        results.append([student_ans, int(is_correct)])
 
     score = round((correct_count / total) * 100, 1) if total > 0 else 0
 
@@ -632,3 +1157,34 @@ def grade_exam(questions: list, student_answers: dict) -> dict:
         'correct_count': correct_count,
         'total_questions': total,
     }
+
+
+def expand_exam_results(questions: list, results: list) -> list:
+    """
+    Rebuild full per-question results from a compact result vector.
+
+    Args:
+        questions: List of questions as stored on the exam session
+        results: Compact [student_answer, is_correct] pairs from grade_exam.
+                 Legacy rows that already hold full dicts are returned as-is.
+
+    Returns:
+        List of per-question result dicts (question, options, explanation, ...)
+    """
+    if results and isinstance(results[0], dict):
+        return results
+
+    expanded = []
+    for q, (student_ans, is_correct) in zip(questions, results):
+        expanded.append({
+            'question_id': q['id'],
+            'question': q['question'],
+            'options': q['options'],
+            'student_answer': None if student_ans == UNANSWERED else student_ans,
+            'correct_answer': q['correct_answer'],
+            'is_correct': bool(is_correct),
+            'explanation': q.get('explanation', ''),
+            'topic': q.get('topic', ''),
+        })
+
+    return expanded
@@ -5,3 +5,9 @@ class AuthenticationConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'authentication'
     verbose_name = 'User Authentication'
+
+    def ready(self):
+        from . import signals  # noqa: F401
+        from .idempotency import check_cache_backend
+
+        check_cache_backend()
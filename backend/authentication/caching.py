@@ -0,0 +1,99 @@
+"""
+Read-through caches for hot API responses.
+
+All entries live in the shared Django cache (see CACHES in settings), so
+they are visible to every worker process. Writes invalidate explicitly via
+the model signals in signals.py.
+"""
+
+import hashlib
+import json
+
+from django.core.cache import cache
+
+from .serializers import UserSerializer
+
+USER_TIMEOUT = 300
+PROGRESS_TIMEOUT = 300
+EXAM_DETAIL_TIMEOUT = 3600
+LLM_RESULT_TIMEOUT = 60 * 60 * 24
+
+USER_KEY = 'user:{}'
+PROGRESS_KEY = 'progress:{}:{}'  # kind, user_id
+EXAM_DETAIL_KEY = 'exam_detail:{}'
+LLM_RESULT_KEY = 'llm:{}:{}'  # feature, request hash
+
+# Progress kinds cached per user
+SUBMISSIONS = 'submissions'
+ASSESSMENTS = 'assessments'
+EXAMS = 'exams'
+PROJECTS = 'projects'
+
+
+def get_user_data(user) -> dict:
+    """Serialized user for auth/profile responses"""
+    return cache.get_or_set(USER_KEY.format(user.id), lambda: UserSerializer(user).data, USER_TIMEOUT)
+
+
+def invalidate_user(user_id: int):
+    cache.delete(USER_KEY.format(user_id))
+
+
+def get_progress(kind: str, user_id: int, build) -> list:
+    """Cached per-user progress list; build() is called on a miss"""
+    return cache.get_or_set(PROGRESS_KEY.format(kind, user_id), build, PROGRESS_TIMEOUT)
+
+
+def get_progress_many(user_id: int, builds: dict) -> dict:
+    """
+    get_progress for several kinds in one cache round trip.
+
+    Args:
+        builds: {kind: build()}; build() is called only for missing kinds
+
+    Returns:
+        {kind: list}
+    """
+    keys = {PROGRESS_KEY.format(kind, user_id): kind for kind in builds}
+    found = {keys[key]: value for key, value in cache.get_many(keys).items()}
+
+    missing = {kind: build() for kind, build in builds.items() if kind not in found}
+    if missing:
+        cache.set_many({PROGRESS_KEY.format(kind, user_id): value for kind, value in missing.items()}, PROGRESS_TIMEOUT)
+    return {**found, **missing}
+
+
+def invalidate_progress(kind: str, user_id: int):
+    cache.delete(PROGRESS_KEY.format(kind, user_id))
+
+
+def get_exam_detail(exam_id: int, build) -> dict:
+    """Cached detail payload of a completed exam"""
+    return cache.get_or_set(EXAM_DETAIL_KEY.format(exam_id), build, EXAM_DETAIL_TIMEOUT)
+
+
+def invalidate_exam(exam_id: int, user_id: int):
+    cache.delete_many([EXAM_DETAIL_KEY.format(exam_id), PROGRESS_KEY.format(EXAMS, user_id)])
+
+
+def llm_request_hash(*parts) -> str:
+    """Stable hash of the inputs of an LLM call"""
+    payload = json.dumps(parts, sort_keys=True, default=str, separators=(',', ':'))
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+async def aget_or_call_llm(feature: str, parts: tuple, call) -> dict:
+    """
+    Return a cached LLM result for identical inputs, or await call() and
+    cache it. Only successful results are cached so transient errors are
+    retried.
+    """
+    key = LLM_RESULT_KEY.format(feature, llm_request_hash(*parts))
+    result = await cache.aget(key)
+    if result is not None:
+        return result
+
+    result = await call()
+    if result.get('success'):
+        await cache.aset(key, result, LLM_RESULT_TIMEOUT)
+    return result
@@ -0,0 +1,104 @@
+"""
+Exam answer autosave with coalesced writes.
+
+Each autosave replaces the buffered answer map of an exam session in the
+cache. The buffer is written to ExamSession.student_answers at most once
+every EXAM_AUTOSAVE_FLUSH_SECONDS per session, so a whole class clicking
+through an exam produces a trickle of single-row UPDATEs instead of one
+write per click. submit_exam, reap_exams and the exam detail view read
+the buffer through saved_answers(), so the unflushed tail is not lost on
+submit; if the cache drops the buffer, at most the last interval of
+answers is lost. The per-session flush token is a cache.add(), which is
+atomic on the supported caches (see idempotency.check_cache_backend).
+"""
+
+from django.conf import settings
+from django.core.cache import cache
+
+from .models import ExamSession
+
+BUFFER_KEY = 'exam_autosave:answers:{}'
+FLUSH_LOCK_KEY = 'exam_autosave:flushed:{}'
+META_KEY = 'exam_autosave:meta:{}'
+
+
+def _flush_interval():
+    return getattr(settings, 'EXAM_AUTOSAVE_FLUSH_SECONDS', 15)
+
+
+def get_session_meta(exam_id: int):
+    """
+    Ownership and deadline info needed to accept an autosave.
+    Cached per session so autosaves normally don't read the database.
+
+    Returns:
+        Dict with user_id, expires_at, question_ids, or None if not found / completed
+    """
+    key = META_KEY.format(exam_id)
+    meta = cache.get(key)
+    if meta is not None:
+        return meta
+
+    exam = ExamSession.objects.filter(id=exam_id, is_completed=False).only(
+        'id', 'user_id', 'expires_at', 'duration_minutes', 'questions',
+    ).first()
+    if exam is None:
+        return None
+
+    meta = {
+        'user_id': exam.user_id,
+        'expires_at': exam.expires_at,
+        'question_ids': [str(q['id']) for q in exam.questions],
+    }
+    cache.set(key, meta, timeout=exam.duration_minutes * 60 + ExamSession.SUBMIT_GRACE_SECONDS)
+    return meta
+
+
+def clean_answers(answers: dict, question_ids: list) -> dict:
+    """Keep only known question ids with a valid option index (or None)"""
+    cleaned = {}
+    for qid in question_ids:
+        value = answers.get(qid)
+        if value is None:
+            continue
+        try:
+            value = int(value)
+        except (TypeError, ValueError):
+            continue
+        if 0 <= value <= 3:
+            cleaned[qid] = value
+    return cleaned
+
+
+def buffer_answers(exam_id: int, answers: dict, ttl: int) -> bool:
+    """
+    Store the latest answer map for a session and write it to the database
+    if the session hasn't been written within the flush interval.
+
+    Returns:
+        False if the write found the session already completed
+    """
+    cache.set(BUFFER_KEY.format(exam_id), answers, timeout=ttl)
+
+    # Only one autosave per session and interval wins the flush token
+    if not cache.add(FLUSH_LOCK_KEY.format(exam_id), 1, timeout=_flush_interval()):
+        return True
+
+    return ExamSession.objects.filter(id=exam_id, is_completed=False).update(student_answers=answers) > 0
+
+
+def saved_answers(exam: ExamSession) -> dict:
+    """Latest known answers for a session: the cache buffer if present, else the database"""
+    pending = cache.get(BUFFER_KEY.format(exam.id))
+    if pending is not None:
+        return pending
+    return exam.student_answers
+
+
+def discard(exam_id: int):
+    """Drop the buffer and cached metadata once a session is completed"""
+    cache.delete_many([
+        BUFFER_KEY.format(exam_id),
+        FLUSH_LOCK_KEY.format(exam_id),
+        META_KEY.format(exam_id),
+    ])
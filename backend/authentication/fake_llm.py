@@ -0,0 +1,151 @@
+"""
+Latency-injecting stand-in for Gemini, used for load tests and offline runs.
+
+Enable with LLM_BACKEND=fake. Each call sleeps for LLM_FAKE_LATENCY_MS
+(+/- LLM_FAKE_JITTER_MS) plus LLM_FAKE_PREFILL_US_PER_TOKEN for every
+prompt token, and returns a canned, well-formed response for the calling
+feature, with plausible usage_metadata. LLM_FAKE_INVALID_RATE is the
+fraction of JSON responses with one field broken, to exercise validation
+and repair.
+"""
+
+import asyncio
+import json
+import os
+import random
+import re
+from types import SimpleNamespace
+
+LATENCY_MS = float(os.environ.get("LLM_FAKE_LATENCY_MS", 1500))
+JITTER_MS = float(os.environ.get("LLM_FAKE_JITTER_MS", 500))
+PREFILL_US_PER_TOKEN = float(os.environ.get("LLM_FAKE_PREFILL_US_PER_TOKEN", 50))
+INVALID_RATE = float(os.environ.get("LLM_FAKE_INVALID_RATE", 0))
+
+
+def _prompt_text(contents) -> str:
+    parts = []
+    for content in contents:
+        for part in getattr(content, 'parts', None) or []:
+            parts.append(getattr(part, 'text', '') or '')
+    return '\n'.join(parts)
+
+
+def _grade_response(prompt):
+    return {
+        "is_relevant": True,
+        "relevance_issue": None,
+        "overall_score": random.randint(55, 95),
+        "code_quality": random.randint(50, 95),
+        "accuracy": random.randint(50, 95),
+        "efficiency": random.randint(50, 95),
+        "requirements_analysis": [
+            {"requirement": "Requirement 1", "status": "met", "explanation": "Implemented correctly"},
+        ],
+        "strengths": ["Clear structure"],
+        "areas_for_improvement": ["Add more comments"],
+        "detailed_feedback": "- Solid submission",
+        "code_suggestions": ["Use vectorized operations"],
+        "learning_resources": ["NumPy broadcasting"],
+    }
+
+
+def _exam_response(prompt):
+    match = re.search(r'Generate exactly (\d+)', prompt)
+    count = int(match.group(1)) if match else 10
+    return {"questions": [
+        {
+            "id": i + 1,
+            "question": f"Sample question {i + 1}?",
+            "options": ["Option A", "Option B", "Option C", "Option D"],
+            "correct_answer": random.randint(0, 3),
+            "explanation": "Explanation of the correct answer.",
+            "topic": f"Module {i % 5 + 1}",
+        }
+        for i in range(count)
+    ]}
+
+
+def _project_response(prompt):
+    files = re.findall(r'### File: (.+)', prompt)
+    return {
+        "overall_score": random.randint(55, 95),
+        "code_quality": random.randint(50, 95),
+        "completeness": random.randint(50, 95),
+        "technical_implementation": random.randint(50, 95),
+        "strengths": ["Good modular design"],
+        "areas_for_improvement": ["Add tests"],
+        "detailed_feedback": "Project meets most requirements.",
+        "file_reviews": [
+            {"file_name": name.strip(), "score": 80, "feedback": "Looks good",
+             "summary": "Implements part of the project.", "steps_covered": [1]}
+            for name in files
+        ],
+    }
+
+
+def _project_file_response(prompt):
+    return {
+        "score": random.randint(55, 95),
+        "feedback": "Reasonable implementation of this part",
+        "summary": "Loads the data, trains the model and reports metrics.",
+        "steps_covered": [1, 2],
+        "strengths": ["Readable functions"],
+        "issues": ["Missing error handling"],
+    }
+
+
+def _break_field(payload: dict) -> dict:
+    """Drop or garble one field (in a list item for lists of objects)"""
+    key = random.choice(list(payload))
+    value = payload[key]
+    if isinstance(value, list) and value and isinstance(value[0], dict):
+        _break_field(random.choice(value))
+    elif random.random() < 0.5:
+        del payload[key]
+    else:
+        payload[key] = "n/a"
+    return payload
+
+
+RESPONSES = {
+    'grade': _grade_response,
+    'exam': _exam_response,
+    'project': _project_response,
+    'project_file': _project_file_response,
+}
+
+
+def _latency(prompt_tokens: int) -> float:
+    base = max(0.0, random.uniform(LATENCY_MS - JITTER_MS, LATENCY_MS + JITTER_MS)) / 1000
+    return base + prompt_tokens * PREFILL_US_PER_TOKEN / 1e6
+
+
+async def agenerate_content(feature: str, contents, config=None):
+    """Sleep for the configured latency and return a response-like object"""
+    response = _response(feature, contents, config)
+    await asyncio.sleep(_latency(response.usage_metadata.prompt_token_count))
+    return response
+
+
+def _response(feature: str, contents, config):
+    system_instruction = (config.system_instruction if config is not None else None) or ''
+    prompt = _prompt_text(contents)
+    if feature in RESPONSES:
+        payload = RESPONSES[feature](prompt)
+        if random.random() < INVALID_RATE:
+            payload = _break_field(payload)
+        text = json.dumps(payload)
+    else:
+        text = "This is a stubbed OrcaAI answer. Embeddings map tokens to vectors."
+
+    prompt_tokens = (len(system_instruction) + len(prompt)) // 4
+    output_tokens = len(text) // 4
+    return SimpleNamespace(
+        text=text,
+        usage_metadata=SimpleNamespace(
+            prompt_token_count=prompt_tokens,
+            candidates_token_count=output_tokens,
+            thoughts_token_count=0,
+            total_token_count=prompt_tokens + output_tokens,
+        ),
+    )
@@ -0,0 +1,17 @@
+"""
+Password hasher with a configurable cost.
+
+Uses the same 'pbkdf2_sha256' algorithm as Django's default, so existing
+hashes keep working; PASSWORD_HASH_ITERATIONS sets the cost for new hashes
+and stored hashes are upgraded on the next successful login.
+"""
+
+from django.conf import settings
+from django.contrib.auth.hashers import PBKDF2PasswordHasher
+
+
+class TunablePBKDF2PasswordHasher(PBKDF2PasswordHasher):
+
+    @property
+    def iterations(self):
+        return settings.PASSWORD_HASH_ITERATIONS
@@ -0,0 +1,207 @@
+"""
+Idempotency keys and single-flight coalescing for expensive AI POSTs.
+
+Requests are identified per subject (user, or client IP when anonymous)
+and path by:
+  * the Idempotency-Key header when present: the 2xx response is stored
+    and replayed for IDEMPOTENCY_RESULT_TIMEOUT, so client retries return
+    the original result (and the original ExamSession) without another
+    LLM call, or
+  * a hash of the body otherwise: identical requests that arrive while
+    the first is still running (double-clicks) wait for and share its
+    response. Once it has finished, an identical request runs again.
+
+Only one request per identity runs at a time, across worker processes: a
+cache.add() lock elects the leader and followers poll for its stored
+response. Without a key, the response is stored under the leader's lock
+token, which only requests that saw the lock held know. The lock needs an
+atomic add(), so the cache must be Redis or LocMem (checked at startup).
+
+Only the request holding the lock releases it. On Redis the release is an
+atomic compare-and-delete (a Lua script). On LocMem it is a get() then a
+delete(); in between, the lock could only change hands if it had expired
+(LOCK_TIMEOUT, longer than any LLM call), within a single process.
+"""
+
+import asyncio
+import functools
+import hashlib
+import time
+import uuid
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import ImproperlyConfigured
+from django.http import HttpResponse
+from rest_framework import status
+from rest_framework.response import Response
+
+from .renderers import finalize
+from .throttling import client_ip
+
+RESULT_KEY = 'idempotency:result:{}'
+LOCK_KEY = 'idempotency:lock:{}'
+
+IDEMPOTENCY_RESULT_TIMEOUT = 60 * 60 * 24
+# Followers poll every POLL_INTERVAL, so they pick the response up well within this
+COALESCE_RESULT_TIMEOUT = 30
+# Longer than any LLM call; a crashed leader's lock expires after this
+LOCK_TIMEOUT = 300
+POLL_INTERVAL = 0.1
+
+REPLAYED_HEADER = 'Idempotent-Replayed'
+
+REDIS_BACKEND = 'django.core.cache.backends.redis.RedisCache'
+# Cache backends whose add() is atomic
+ATOMIC_CACHE_BACKENDS = (
+    'django.core.cache.backends.locmem.LocMemCache',
+    REDIS_BACKEND,
+)
+
+# Delete KEYS[1] only if it still holds ARGV[1]
+RELEASE_SCRIPT = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('del', KEYS[1])
+end
+return 0
+"""
+
+
+def check_cache_backend():
+    """Raise ImproperlyConfigured if the default cache cannot hold the locks"""
+    backend = settings.CACHES['default']['BACKEND']
+    if backend not in ATOMIC_CACHE_BACKENDS:
+        raise ImproperlyConfigured(
+            f"Idempotency locks need an atomic cache (Redis or LocMem), not {backend}"
+        )
+
+
+def _subject(request) -> str:
+    if request.user.is_authenticated:
+        return f'user:{request.user.id}'
+    return f'ip:{client_ip(request)}'
+
+
+def _fingerprint(request) -> str:
+    if request.content_type != 'multipart/form-data':
+        return hashlib.sha256(request.body).hexdigest()
+
+    # request.body is unavailable once the upload has been parsed
+    digest = hashlib.sha256()
+    for name, values in sorted(request.POST.lists()):
+        digest.update(f'{name}={values!r}\0'.encode('utf-8'))
+    for name, upload in sorted(request.FILES.items()):
+        digest.update(f'{name}:{upload.name}\0'.encode('utf-8'))
+        for chunk in upload.chunks():
+            digest.update(chunk)
+        upload.seek(0)
+    return digest.hexdigest()
+
+
+def request_identity(request) -> tuple:
+    """
+    Returns:
+        (cache key, body fingerprint, whether an Idempotency-Key was sent)
+    """
+    fingerprint = _fingerprint(request)
+    idempotency_key = request.headers.get('Idempotency-Key', '').strip()
+    token = f'key:{idempotency_key}' if idempotency_key else f'body:{fingerprint}'
+    raw = f'{_subject(request)}|{request.path}|{token}'
+    return hashlib.sha256(raw.encode('utf-8')).hexdigest(), fingerprint, bool(idempotency_key)
+
+
+def _release_redis(lock_key: str, owner: str):
+    key = cache.make_and_validate_key(lock_key)
+    client = cache._cache.get_client(key, write=True)
+    client.eval(RELEASE_SCRIPT, 1, key, cache._cache._serializer.dumps(owner))
+
+
+async def _release(lock_key: str, owner: str):
+    """Delete the lock if this request still holds it (see module docstring)"""
+    if settings.CACHES['default']['BACKEND'] == REDIS_BACKEND:
+        await sync_to_async(_release_redis, thread_sensitive=False)(lock_key, owner)
+    elif await cache.aget(lock_key) == owner:
+        await cache.adelete(lock_key)
+
+
+def _replay(stored: dict) -> HttpResponse:
+    response = HttpResponse(stored['content'], status=stored['status'], content_type=stored['content_type'])
+    response[REPLAYED_HEADER] = 'true'
+    return response
+
+
+def _mismatch() -> Response:
+    return Response({
+        'success': False,
+        'message': 'Idempotency-Key was already used with a different request body',
+    }, status=status.HTTP_422_UNPROCESSABLE_ENTITY)
+
+
+def idempotent(view):
+    """
+    Decorator for async views: run the view at most once per request
+    identity and share its response (see module docstring).
+    """
+    @functools.wraps(view)
+    async def wrapper(request, *args, **kwargs):
+        if request.content_type == 'multipart/form-data':
+            key, fingerprint, has_key = await sync_to_async(request_identity)(request)
+        else:
+            key, fingerprint, has_key = request_identity(request)
+        lock_key = LOCK_KEY.format(key)
+        owner = uuid.uuid4().hex
+        owned = False
+        deadline = time.monotonic() + LOCK_TIMEOUT
+        # Without a key: lock token of the run in flight this request waits for
+        leader = None
+
+        def result_key(token):
+            return RESULT_KEY.format(key if has_key else f'{key}:{token}')
+
+        async def stored_result():
+            if not has_key and leader is None:
+                return None
+            return await cache.aget(result_key(leader))
+
+        while True:
+            stored = await stored_result()
+            if stored is not None:
+                if stored['fingerprint'] != fingerprint:
+                    return _mismatch()
+                return _replay(stored)
+
+            if await cache.aadd(lock_key, owner, LOCK_TIMEOUT):
+                # The previous leader may have finished between the two calls
+                if await stored_result() is None:
+                    owned = True
+                    break
+                await _release(lock_key, owner)
+                continue
+
+            if not has_key:
+                leader = await cache.aget(lock_key) or leader
+
+            if time.monotonic() >= deadline:
+                # Leader vanished without releasing; run it ourselves, without
+                # the lock (it belongs to whoever holds it now)
+                break
+            await asyncio.sleep(POLL_INTERVAL)
+
+        try:
+            # Rendered here so the stored body is the one sent
+            response = finalize(request, await view(request, *args, **kwargs))
+            # Errors (LLM failures, quota) are not stored so a retry runs again
+            if status.is_success(response.status_code) and not response.streaming:
+                await cache.aset(result_key(owner), {
+                    'fingerprint': fingerprint,
+                    'status': response.status_code,
+                    'content_type': response['Content-Type'],
+                    'content': response.content,
+                }, IDEMPOTENCY_RESULT_TIMEOUT if has_key else COALESCE_RESULT_TIMEOUT)
+            return response
+        finally:
+            if owned:
+                await _release(lock_key, owner)
+
+    return wrapper
@@ -0,0 +1,131 @@
+"""
+Server-side lab catalog.
+
+The lab definitions (title, category, description, requirements) are read
+from content/labs.json into memory, so /api/ai/grade/ only needs a lab_id
+and the code: the server uses its own requirements instead of trusting the
+client's. Each Lab carries its pre-rendered "LAB ASSIGNMENT" prompt header
+and a version stamp (hash of the definition) that is part of the grading
+cache key, so editing a lab invalidates its cached grades.
+
+The file is re-checked at most every LABS_CHECK_INTERVAL seconds and the
+catalog reloaded when it changed (no restart needed). A file that fails to
+load keeps the previous catalog. The catalog is loaded at startup
+(wsgi.py/asgi.py); async callers use aget_lab(), which runs a due re-check
+in a thread instead of on the event loop.
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from pathlib import Path
+
+from asgiref.sync import sync_to_async
+
+LABS_FILE = Path(__file__).resolve().parent / 'content' / 'labs.json'
+LABS_CHECK_INTERVAL = float(os.environ.get('LABS_CHECK_INTERVAL', 5))
+
+
+def lab_prompt_header(lab_info: dict) -> str:
+    """The LAB ASSIGNMENT section of the grading prompt"""
+    requirements = ''.join(f"{i}. {req}\n" for i, req in enumerate(lab_info.get('requirements', []), 1))
+    return f"""## LAB ASSIGNMENT
+
+**Title:** {lab_info.get('title', 'Unknown')}
+**Category:** {lab_info.get('category', 'Unknown')}
+**Description:** {lab_info.get('description', 'No description')}
+
+**Requirements:**
+{requirements}"""
+
+
+class Lab:
+    """One lab of the catalog (immutable once loaded)"""
+
+    def __init__(self, definition: dict):
+        self.number = definition['id']
+        self.lab_id = f"lab_{definition['id']}"  # As sent by the frontend
+        self.title = definition['title']
+        self.category = definition['category']
+        self.description = definition['description']
+        self.requirements = tuple(definition['requirements'])
+        self.info = {
+            'title': self.title,
+            'category': self.category,
+            'description': self.description,
+            'requirements': list(self.requirements),
+        }
+        canonical = json.dumps(self.info, sort_keys=True, separators=(',', ':'))
+        self.version = hashlib.sha256(canonical.encode('utf-8')).hexdigest()[:12]
+        self.prompt_header = lab_prompt_header(self.info)
+
+    def to_dict(self) -> dict:
+        return {'id': self.number, 'lab_id': self.lab_id, 'version': self.version, **self.info}
+
+
+def load_labs(path: Path = None) -> dict:
+    """{lab_id: Lab} from a labs.json file (LABS_FILE by default)"""
+    path = path or LABS_FILE
+    labs = [Lab(definition) for definition in json.loads(path.read_text(encoding='utf-8'))]
+    return {lab.lab_id: lab for lab in labs}
+
+
+_labs = None
+_stamp = None
+_checked_at = 0.0
+_lock = threading.Lock()
+
+
+def _file_stamp():
+    try:
+        stat = LABS_FILE.stat()
+        return stat.st_mtime_ns, stat.st_size
+    except OSError:
+        return None
+
+
+def _is_fresh(now: float) -> bool:
+    return _labs is not None and now - _checked_at < LABS_CHECK_INTERVAL
+
+
+def catalog() -> dict:
+    """The current {lab_id: Lab}, reloaded when labs.json changed"""
+    global _labs, _stamp, _checked_at
+
+    now = time.monotonic()
+    if _is_fresh(now):
+        return _labs
+
+    with _lock:
+        if _is_fresh(now):
+            return _labs
+        stamp = _file_stamp()
+        if _labs is None or stamp != _stamp:
+            try:
+                _labs = load_labs()
+            except (OSError, ValueError, KeyError, TypeError) as e:
+                if _labs is None:
+                    raise
+                print(f"Lab catalog reload error (keeping previous catalog): {e}")
+            _stamp = stamp
+        _checked_at = now
+        return _labs
+
+
+def get_lab(lab_id: str):
+    """The Lab for a lab_id, or None if it is not in the catalog"""
+    return catalog().get(lab_id)
+
+
+async def aget_lab(lab_id: str):
+    """Async version of get_lab(): the file check and reload run in a thread"""
+    if _is_fresh(time.monotonic()):
+        return _labs.get(lab_id)
+    return (await sync_to_async(catalog)()).get(lab_id)
+
+
+def all_labs() -> list:
+    """All labs in catalog order"""
+    return list(catalog().values())
@@ -0,0 +1,153 @@
+"""
+Record/replay of LLM calls ("cassettes") for offline, deterministic runs.
+
+LLM_CASSETTE=record wraps the provider (LLM_BACKEND=gemini or fake): each
+generate_content response is written to LLM_CASSETTE_DIR with the time the
+call took. LLM_CASSETTE=replay serves those responses with no network and
+no provider: the call sleeps for the recorded latency times
+LLM_REPLAY_LATENCY_SCALE (0 = no sleep) and returns the recorded response.
+A request that was never recorded raises CassetteMiss.
+
+Requests are keyed by a hash of the normalized request: model, contents and
+generation config. One file holds every response recorded for a key;
+replay cycles through them, so repeated calls (exam generation with
+temperature) see the variety that was recorded.
+
+Usage (from backend/):
+    LLM_CASSETTE=record python benchmarks/bench_ai_paths.py     # with GEMINI_API_KEY
+    LLM_CASSETTE=replay python benchmarks/bench_ai_paths.py
+"""
+
+import asyncio
+import hashlib
+import itertools
+import json
+import os
+import threading
+from pathlib import Path
+
+from google.genai import types
+
+# '', 'record' or 'replay'
+MODE = os.environ.get("LLM_CASSETTE", "")
+CASSETTE_DIR = Path(os.environ.get(
+    "LLM_CASSETTE_DIR", Path(__file__).resolve().parent.parent / 'benchmarks' / 'cassettes',
+))
+LATENCY_SCALE = float(os.environ.get("LLM_REPLAY_LATENCY_SCALE", 1))
+
+# key -> (recorded episodes, replay counter)
+_loaded = {}
+_lock = threading.Lock()
+
+
+class CassetteMiss(LookupError):
+    """Replay mode got a request that was never recorded"""
+
+
+def normalize(model: str, contents: list, config: types.GenerateContentConfig) -> dict:
+    """The parts of a request that determine its response"""
+    return {
+        'model': model,
+        'contents': [
+            {
+                'role': content.role,
+                'parts': [part.model_dump(mode='json', exclude_none=True) for part in content.parts or []],
+            }
+            for content in contents
+        ],
+        'config': config.model_dump(mode='json', exclude_none=True, exclude={'http_options'})
+        if config is not None else {},
+    }
+
+
+def request_key(model: str, contents: list, config: types.GenerateContentConfig) -> tuple:
+    """
+    Returns:
+        Tuple of (hex digest, normalized request)
+    """
+    request = normalize(model, contents, config)
+    canonical = json.dumps(request, sort_keys=True, separators=(',', ':'), ensure_ascii=False)
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest(), request
+
+
+def _path(key: str) -> Path:
+    return CASSETTE_DIR / f'{key}.json'
+
+
+def _as_genai(response) -> types.GenerateContentResponse:
+    """The response as a google-genai object (the fake backend returns a stand-in)"""
+    if isinstance(response, types.GenerateContentResponse):
+        return response
+    usage = getattr(response, 'usage_metadata', None)
+    return types.GenerateContentResponse(
+        candidates=[types.Candidate(content=types.Content(role='model', parts=[types.Part(text=response.text)]))],
+        usage_metadata=types.GenerateContentResponseUsageMetadata(**vars(usage)) if usage is not None else None,
+    )
+
+
+# ============================================
+# RECORD
+# ============================================
+
+def record(feature: str, model: str, contents: list, config: types.GenerateContentConfig,
+           response, latency: float):
+    """Append a response to the cassette of its request. Never raises."""
+    try:
+        key, request = request_key(model, contents, config)
+        episode = {
+            'latency_ms': round(latency * 1000, 1),
+            'response': _as_genai(response).model_dump(mode='json', exclude_none=True,
+                                                       exclude={'sdk_http_response'}),
+        }
+        with _lock:
+            path = _path(key)
+            if path.exists():
+                cassette = json.loads(path.read_text(encoding='utf-8'))
+            else:
+                cassette = {'feature': feature, 'request': request, 'episodes': []}
+            cassette['episodes'].append(episode)
+            CASSETTE_DIR.mkdir(parents=True, exist_ok=True)
+            tmp = path.with_suffix('.tmp')
+            tmp.write_text(json.dumps(cassette, ensure_ascii=False, indent=1), encoding='utf-8')
+            os.replace(tmp, path)
+            _loaded.pop(key, None)
+    except Exception as e:
+        print(f"LLM cassette record error: {e}")
+
+
+async def arecord(feature: str, model: str, contents: list, config: types.GenerateContentConfig,
+                  response, latency: float):
+    """Async version of record() (the file write runs in a thread)"""
+    await asyncio.to_thread(record, feature, model, contents, config, response, latency)
+
+
+# ============================================
+# REPLAY
+# ============================================
+
+def _next_episode(model: str, contents: list, config: types.GenerateContentConfig) -> tuple:
+    """(response, seconds to wait) for a request"""
+    key, _ = request_key(model, contents, config)
+    with _lock:
+        entry = _loaded.get(key)
+        if entry is None:
+            path = _path(key)
+            if not path.exists():
+                raise CassetteMiss(
+                    f"No recorded response for request {key[:12]} (model {model}) in {CASSETTE_DIR}; "
+                    f"record it with LLM_CASSETTE=record"
+                )
+            episodes = json.loads(path.read_text(encoding='utf-8'))['episodes']
+            entry = _loaded[key] = (episodes, itertools.count())
+        episodes, counter = entry
+        episode = episodes[next(counter) % len(episodes)]
+    response = types.GenerateContentResponse.model_validate(episode['response'])
+    return response, episode['latency_ms'] / 1000 * LATENCY_SCALE
+
+
+async def areplay(model: str, contents: list, config: types.GenerateContentConfig) -> types.GenerateContentResponse:
+    """The recorded response, after the recorded (scaled) latency"""
+    response, delay = _next_episode(model, contents, config)
+    if delay > 0:
+        await asyncio.sleep(delay)
+    return response
@@ -0,0 +1,280 @@
+"""
+LLM usage ledger and per-user daily token quotas.
+
+ai_grading reports every generate_content call through record(). Entries
+are queued in memory and written by a background thread with bulk_create,
+so the request path never waits on the ledger insert. A per-subject daily
+token counter in the cache backs quota checks. It expires at the end of
+the day and relies on the atomic incr() of the LocMem and Redis caches.
+A user's counter that is missing (new day, eviction, restart) is rebuilt
+by the writer thread from the ledger plus the entries this process has
+queued but not yet written; until then checks count only the queued
+entries, so neither quota checks nor record() query the ledger inline.
+"""
+
+import atexit
+import contextvars
+import queue
+import threading
+from collections import Counter
+from contextlib import contextmanager
+from datetime import datetime, time as dt_time, timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import close_old_connections
+from django.db.models import Sum
+from django.utils import timezone
+
+FLUSH_BATCH_SIZE = 100
+FLUSH_INTERVAL_SECONDS = 2
+
+DAILY_TOKENS_KEY = 'llm_tokens:{}:{}'  # subject, date
+
+# (user_id, quota subject, tier) of the request currently calling the LLM
+_current = contextvars.ContextVar('llm_usage_subject', default=(None, None, None))
+
+_queue = queue.Queue()
+_writer = None
+_writer_lock = threading.Lock()
+
+# (user_id, date) -> tokens of entries queued or being written, not yet in the ledger
+_pending = Counter()
+_pending_lock = threading.Lock()
+
+# Queued to wake the writer when a counter needs rebuilding
+REBUILD = object()
+# Users whose counter for today the writer should rebuild
+_rebuild = set()
+
+
+def _subject(request) -> str:
+    """Quota subject: the user, or the client IP for anonymous calls"""
+    if request.user.is_authenticated:
+        return f'user:{request.user.id}'
+    return f"ip:{request.META.get('REMOTE_ADDR', '')}"
+
+
+def tier(request) -> str:
+    """'staff', 'user' or 'anonymous' (quotas and model routing)"""
+    if request.user.is_authenticated:
+        return 'staff' if request.user.is_staff else 'user'
+    return 'anonymous'
+
+
+@contextmanager
+def attribute_to(request):
+    """Attribute LLM calls made inside this block to the request's user"""
+    user_id = request.user.id if request.user.is_authenticated else None
+    token = _current.set((user_id, _subject(request), tier(request)))
+    try:
+        yield
+    finally:
+        _current.reset(token)
+
+
+def current_attribution():
+    return _current.get()
+
+
+def current_tier():
+    """Tier of the request the current LLM call is attributed to (None outside a request)"""
+    return _current.get()[2]
+
+
+def _today():
+    return timezone.localdate()
+
+
+def _seconds_to_midnight() -> int:
+    now = timezone.localtime()
+    midnight = timezone.make_aware(datetime.combine(now.date() + timedelta(days=1), dt_time.min))
+    return max(1, int((midnight - now).total_seconds()) + 1)
+
+
+def _user_id(subject: str):
+    return int(subject.split(':', 1)[1]) if subject.startswith('user:') else None
+
+
+def _request_rebuild(user_id: int):
+    with _pending_lock:
+        _rebuild.add(user_id)
+    _queue.put(REBUILD)
+    _ensure_writer()
+
+
+def _rebuild_counters():
+    """Rebuild the requested users' counters for today (writer thread)"""
+    from .models import LLMUsage
+
+    with _pending_lock:
+        user_ids = set(_rebuild)
+        _rebuild.clear()
+    today = _today()
+    start = timezone.make_aware(datetime.combine(today, dt_time.min))
+    for user_id in user_ids:
+        key = DAILY_TOKENS_KEY.format(f'user:{user_id}', today)
+        if cache.get(key) is not None:
+            continue
+        try:
+            # Read before the ledger: an entry written in between is counted
+            # twice rather than missed
+            with _pending_lock:
+                used = _pending[(user_id, today)]
+            used += LLMUsage.objects.filter(
+                user_id=user_id, created_at__gte=start,
+            ).aggregate(total=Sum('total_tokens'))['total'] or 0
+            cache.add(key, used, timeout=_seconds_to_midnight())
+        except Exception as e:
+            print(f"LLM usage counter rebuild error: {e}")
+
+
+def _tokens_used_today(subject: str) -> int:
+    today = _today()
+    used = cache.get(DAILY_TOKENS_KEY.format(subject, today))
+    if used is not None:
+        return used
+    user_id = _user_id(subject)
+    if user_id is None:
+        # Anonymous subjects have no ledger to rebuild from
+        return 0
+    _request_rebuild(user_id)
+    with _pending_lock:
+        return _pending[(user_id, today)]
+
+
+def daily_quota(request) -> int:
+    """Daily token quota for the request's user (0 = unlimited)"""
+    caller = tier(request)
+    if caller == 'staff':
+        return 0
+    return settings.LLM_DAILY_TOKEN_QUOTA[caller]
+
+
+def quota_exceeded(request) -> bool:
+    quota = daily_quota(request)
+    return bool(quota) and _tokens_used_today(_subject(request)) >= quota
+
+
+def usage_summary(request) -> dict:
+    quota = daily_quota(request)
+    used = _tokens_used_today(_subject(request))
+    return {
+        'tokens_used_today': used,
+        'daily_quota': quota or None,
+        'remaining': max(0, quota - used) if quota else None,
+    }
+
+
+def record(feature: str, model: str, usage_metadata, latency: float, success: bool, route: str = ''):
+    """
+    Queue one ledger entry for the current request. Never raises.
+
+    Args:
+        feature: 'grade', 'chat', 'exam' or 'project'
+        usage_metadata: response.usage_metadata from google-genai (or None)
+        latency: Seconds spent in generate_content
+        route: Name of the model_router route that picked the model
+    """
+    from .models import LLMUsage
+
+    user_id, subject, _ = current_attribution()
+
+    def count(name):
+        return (getattr(usage_metadata, name, None) or 0) if usage_metadata is not None else 0
+
+    entry = LLMUsage(
+        user_id=user_id,
+        feature=feature,
+        model=model,
+        route=route,
+        prompt_tokens=count('prompt_token_count'),
+        output_tokens=count('candidates_token_count'),
+        thinking_tokens=count('thoughts_token_count'),
+        cached_tokens=count('cached_content_token_count'),
+        total_tokens=count('total_token_count'),
+        latency_ms=int(latency * 1000),
+        success=success,
+        created_at=timezone.now(),
+    )
+
+    if user_id is not None and entry.total_tokens:
+        with _pending_lock:
+            _pending[(user_id, timezone.localdate(entry.created_at))] += entry.total_tokens
+    if subject and entry.total_tokens:
+        key = DAILY_TOKENS_KEY.format(subject, _today())
+        if _user_id(subject) is None:
+            cache.add(key, 0, timeout=_seconds_to_midnight())
+        try:
+            cache.incr(key, entry.total_tokens)
+        except ValueError:
+            # No counter yet: the rebuild counts this entry, pending or written
+            _request_rebuild(_user_id(subject))
+
+    _queue.put(entry)
+    _ensure_writer()
+
+
+def _ensure_writer():
+    global _writer
+    if _writer is not None and _writer.is_alive():
+        return
+    with _writer_lock:
+        if _writer is None or not _writer.is_alive():
+            _writer = threading.Thread(target=_writer_loop, name='llm-usage-writer', daemon=True)
+            _writer.start()
+
+
+def _drain(block: bool) -> list:
+    """Queued ledger entries (REBUILD markers included)"""
+    batch = []
+    try:
+        batch.append(_queue.get(timeout=FLUSH_INTERVAL_SECONDS) if block else _queue.get_nowait())
+        while len(batch) < FLUSH_BATCH_SIZE:
+            batch.append(_queue.get_nowait())
+    except queue.Empty:
+        pass
+    return batch
+
+
+def _write(batch: list):
+    from .models import LLMUsage
+
+    entries = [entry for entry in batch if entry is not REBUILD]
+    if entries:
+        try:
+            LLMUsage.objects.bulk_create(entries)
+        except Exception as e:
+            print(f"LLM usage ledger write error: {e}")
+        finally:
+            with _pending_lock:
+                for entry in entries:
+                    if entry.user_id is not None and entry.total_tokens:
+                        pending = (entry.user_id, timezone.localdate(entry.created_at))
+                        _pending[pending] -= entry.total_tokens
+                        if _pending[pending] <= 0:
+                            del _pending[pending]
+    if len(entries) < len(batch):
+        # After the write, so this batch is counted once, from the ledger
+        _rebuild_counters()
+
+
+def _writer_loop():
+    while True:
+        batch = _drain(block=True)
+        if batch:
+            close_old_connections()
+            _write(batch)
+            close_old_connections()
+
+
+def flush():
+    """Write all queued entries now (used at exit and by management commands)"""
+    while True:
+        batch = _drain(block=False)
+        if not batch:
+            break
+        _write(batch)
+
+
+atexit.register(flush)
@@ -0,0 +1,223 @@
+"""
+Bulk-provision learner accounts from a CSV file.
+
+Expected columns (header row required):
+    username,email,password[,first_name,last_name]
+
+Rows are validated with the same rules as /api/auth/signup/ (including the
+model field validators: username characters and max_length), uniqueness is
+checked in bulk against the database and within the file, passwords are
+hashed in a process pool across all cores, and users are inserted with
+bulk_create in chunks.
+
+Usage:
+    python manage.py import_users cohort.csv
+    python manage.py import_users cohort.csv --report errors.csv --workers 8
+"""
+
+import csv
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from django.contrib.auth.hashers import make_password
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand, CommandError
+from django.db import IntegrityError, transaction
+
+from authentication.models import User, filter_lower, fold_case
+
+# SQLite allows 999 bound parameters per query
+LOOKUP_CHUNK = 500
+
+# Columns checked with their model field validators, as SignupSerializer does
+MODEL_FIELDS = ('username', 'email', 'first_name', 'last_name')
+
+
+def _init_worker(settings_module):
+    """Configure Django in pool workers (needed where processes are spawned, e.g. Windows)"""
+    import django
+
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', settings_module)
+    django.setup()
+
+
+def _hash_password(password):
+    return make_password(password)
+
+
+def _field_error(row):
+    """First model field validation error of a row (UnicodeUsernameValidator, max_length, email), or None"""
+    for name in MODEL_FIELDS:
+        field = User._meta.get_field(name)
+        try:
+            field.clean(row.get(name, ''), None)
+        except ValidationError as e:
+            return f"{field.verbose_name.capitalize()}: {' '.join(e.messages)}"
+    return None
+
+
+class Command(BaseCommand):
+    help = 'Create users in bulk from a CSV file'
+
+    def add_arguments(self, parser):
+        parser.add_argument('csv_path')
+        parser.add_argument('--workers', type=int, default=os.cpu_count(), help='Password hashing processes')
+        parser.add_argument('--chunk-size', type=int, default=1000, help='Rows per bulk_create')
+        parser.add_argument('--report', help='Write a per-row error report CSV to this path')
+        parser.add_argument('--dry-run', action='store_true', help='Validate only, create nothing')
+
+    def handle(self, *args, **options):
+        start = time.perf_counter()
+        rows = self._read_rows(options['csv_path'])
+        errors = {}  # line number -> message
+
+        valid = self._validate_rows(rows, errors)
+        valid = self._check_existing(valid, errors)
+
+        created = 0
+        if valid and not options['dry_run']:
+            hashes = self._hash_passwords([row['password'] for row in valid], options['workers'])
+            created = self._insert(valid, hashes, options['chunk_size'], errors)
+
+        if options['report']:
+            self._write_report(options['report'], rows, errors)
+
+        for line, message in sorted(errors.items())[:20]:
+            self.stderr.write(f"Line {line}: {message}")
+        if len(errors) > 20:
+            self.stderr.write(f"... and {len(errors) - 20} more errors")
+
+        verb = 'Validated' if options['dry_run'] else 'Created'
+        count = len(valid) if options['dry_run'] else created
+        self.stdout.write(self.style.SUCCESS(
+            f"{verb} {count} users, {len(errors)} rows rejected, in {time.perf_counter() - start:.1f}s."
+        ))
+
+    def _read_rows(self, path):
+        try:
+            with open(path, newline='', encoding='utf-8-sig') as f:
+                reader = csv.DictReader(f)
+                missing = {'username', 'email', 'password'} - set(reader.fieldnames or [])
+                if missing:
+                    raise CommandError(f"CSV is missing columns: {', '.join(sorted(missing))}")
+                # Line numbers count the header as line 1
+                return [
+                    {'line': i, **{k: (v or '').strip() for k, v in row.items() if k}}
+                    for i, row in enumerate(reader, start=2)
+                ]
+        except OSError as e:
+            raise CommandError(f"Cannot read {path}: {e}")
+
+    def _validate_rows(self, rows, errors):
+        """Per-row rules from SignupSerializer plus duplicates within the file"""
+        seen_usernames, seen_emails = {}, {}
+        valid = []
+        for row in rows:
+            username, email, password = row['username'], row['email'].lower(), row['password']
+            row['email'] = email
+
+            if len(username) < 3:
+                errors[row['line']] = "Username must be at least 3 characters long."
+                continue
+            field_error = _field_error(row)
+            if field_error:
+                errors[row['line']] = field_error
+                continue
+            if len(password) < 4:
+                errors[row['line']] = "Password must be at least 4 characters long."
+                continue
+            # Folded like the database's Lower() unique constraints
+            username_key, email_key = fold_case(username), fold_case(email)
+            if username_key in seen_usernames:
+                errors[row['line']] = f"Duplicate username (same as line {seen_usernames[username_key]})."
+                continue
+            if email_key in seen_emails:
+                errors[row['line']] = f"Duplicate email (same as line {seen_emails[email_key]})."
+                continue
+
+            seen_usernames[username_key] = row['line']
+            seen_emails[email_key] = row['line']
+            valid.append(row)
+        return valid
+
+    def _check_existing(self, rows, errors):
+        """Reject rows whose username or email already exists, in a few indexed queries"""
+        usernames = [row['username'] for row in rows]
+        emails = [row['email'] for row in rows]
+
+        # The database lowers both sides; rows are matched back with fold_case()
+        taken_usernames, taken_emails = set(), set()
+        for i in range(0, len(rows), LOOKUP_CHUNK):
+            taken_usernames.update(
+                filter_lower(User.objects, 'username', usernames[i:i + LOOKUP_CHUNK])
+                .values_list('username_lower', flat=True)
+            )
+            taken_emails.update(
+                filter_lower(User.objects, 'email', emails[i:i + LOOKUP_CHUNK])
+                .values_list('email_lower', flat=True)
+            )
+
+        valid = []
+        for row in rows:
+            if fold_case(row['username']) in taken_usernames:
+                errors[row['line']] = "A user with this username already exists."
+            elif fold_case(row['email']) in taken_emails:
+                errors[row['line']] = "A user with this email already exists."
+            else:
+                valid.append(row)
+        return valid
+
+    def _hash_passwords(self, passwords, workers):
+        from django.conf import settings
+
+        if workers <= 1 or len(passwords) < 2:
+            return [make_password(p) for p in passwords]
+
+        chunksize = max(1, len(passwords) // (workers * 4))
+        with ProcessPoolExecutor(
+            max_workers=workers, initializer=_init_worker, initargs=(settings.SETTINGS_MODULE,),
+        ) as pool:
+            return list(pool.map(_hash_password, passwords, chunksize=chunksize))
+
+    def _insert(self, rows, hashes, chunk_size, errors):
+        created = 0
+        for i in range(0, len(rows), chunk_size):
+            chunk = list(zip(rows[i:i + chunk_size], hashes[i:i + chunk_size]))
+            users = [self._build_user(row, password) for row, password in chunk]
+            try:
+                with transaction.atomic():
+                    User.objects.bulk_create(users)
+                created += len(users)
+            except IntegrityError:
+                # A concurrent signup took a name: fall back to row-by-row for this chunk
+                for (row, _), user in zip(chunk, users):
+                    try:
+                        with transaction.atomic():
+                            user.save()
+                        created += 1
+                    except IntegrityError:
+                        errors[row['line']] = "A user with this username or email already exists."
+        return created
+
+    @staticmethod
+    def _build_user(row, password):
+        return User(
+            username=row['username'],
+            email=row['email'],
+            password=password,
+            first_name=row.get('first_name', ''),
+            last_name=row.get('last_name', ''),
+        )
+
+    @staticmethod
+    def _write_report(path, rows, errors):
+        with open(path, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.writer(f)
+            writer.writerow(['line', 'username', 'email', 'status', 'error'])
+            for row in rows:
+                error = errors.get(row['line'], '')
+                writer.writerow([
+                    row['line'], row.get('username', ''), row.get('email', ''),
+                    'error' if error else 'ok', error,
+                ])
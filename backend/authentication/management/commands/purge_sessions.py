@@ -0,0 +1,35 @@
+"""
+Run Django's clearsessions, once or every --loop seconds.
+
+Only database-backed modes (db, cached_db) accumulate expired rows in
+django_session; cache and signed_cookies sessions expire on their own.
+Run from cron, or keep it running with --loop.
+
+Usage:
+    python manage.py purge_sessions
+    python manage.py purge_sessions --loop 3600
+"""
+
+import time
+
+from django.conf import settings
+from django.core.management import call_command
+from django.core.management.base import BaseCommand
+
+
+class Command(BaseCommand):
+    help = 'Remove expired sessions (periodically with --loop)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--loop', type=int, default=0, metavar='SECONDS',
+            help='Keep running and purge every SECONDS seconds',
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            call_command('clearsessions')
+            self.stdout.write(f"Expired sessions purged (mode: {settings.SESSION_MODE}).")
+            if not options['loop']:
+                break
+            time.sleep(options['loop'])
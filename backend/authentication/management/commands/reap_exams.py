@@ -0,0 +1,68 @@
+"""
+Close exam sessions whose server-side deadline has passed.
+
+Sessions with saved answers are auto-submitted and graded; sessions with
+no answers at all are abandoned and deleted so storage stays bounded.
+Run from cron, or keep it running with --loop.
+
+Usage:
+    python manage.py reap_exams
+    python manage.py reap_exams --loop 60
+"""
+
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+
+from authentication import exam_autosave
+from authentication.models import ExamSession
+
+
+class Command(BaseCommand):
+    help = 'Auto-submit or delete expired exam sessions in batches'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500)
+        parser.add_argument(
+            '--loop', type=int, default=0, metavar='SECONDS',
+            help='Keep running and reap every SECONDS seconds',
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            submitted, deleted = self.reap(options['batch_size'])
+            self.stdout.write(f"Auto-submitted {submitted}, deleted {deleted} expired exam sessions.")
+            if not options['loop']:
+                break
+            time.sleep(options['loop'])
+
+    def reap(self, batch_size):
+        cutoff = timezone.now() - timedelta(seconds=ExamSession.SUBMIT_GRACE_SECONDS)
+        submitted = deleted = 0
+
+        while True:
+            # Matches the partial index on open sessions
+            batch = list(
+                ExamSession.objects.filter(is_completed=False, expires_at__lt=cutoff)
+                .order_by('expires_at')[:batch_size]
+            )
+            if not batch:
+                break
+
+            answers = {exam.id: exam_autosave.saved_answers(exam) for exam in batch}
+            abandoned = [exam.id for exam in batch if not answers[exam.id]]
+            with transaction.atomic():
+                for exam in batch:
+                    if answers[exam.id]:
+                        exam.complete(answers[exam.id], auto_submitted=True)
+                        submitted += 1
+                if abandoned:
+                    ExamSession.objects.filter(id__in=abandoned).delete()
+                    deleted += len(abandoned)
+            for exam in batch:
+                exam_autosave.discard(exam.id)
+
+        return submitted, deleted
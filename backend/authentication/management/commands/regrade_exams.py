@@ -0,0 +1,148 @@
+"""
+Bulk regrade of completed exam sessions.
+
+Recomputes score / correct_count for every completed ExamSession from the
+compact answer vector stored in ExamSession.results and the current
+correct_answer of each question. Optionally patches answer keys first.
+
+Usage:
+    python manage.py regrade_exams
+    python manage.py regrade_exams --set 42:3:1 --set 57:10:2
+    python manage.py regrade_exams --user alice --dry-run
+"""
+
+import numpy as np
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from authentication import caching
+from authentication.ai_grading import UNANSWERED, answer_index
+from authentication.models import ExamSession
+
+
+class Command(BaseCommand):
+    help = 'Recompute exam scores from stored answer vectors (vectorized)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--set', action='append', default=[], metavar='EXAM_ID:QUESTION_ID:ANSWER',
+            help='Fix the correct_answer of one question before regrading (repeatable)',
+        )
+        parser.add_argument('--user', help='Only regrade sessions of this username')
+        parser.add_argument('--batch-size', type=int, default=2000)
+        parser.add_argument('--dry-run', action='store_true', help='Report changes without saving')
+
+    def handle(self, *args, **options):
+        fixes = self._parse_fixes(options['set'])
+        batch_size = options['batch_size']
+        dry_run = options['dry_run']
+
+        sessions = ExamSession.objects.filter(is_completed=True).only(
+            'id', 'user_id', 'questions', 'student_answers', 'results', 'score', 'correct_count',
+        ).order_by('id')
+        if options['user']:
+            sessions = sessions.filter(user__username=options['user'])
+
+        scanned = changed = 0
+        batch = []
+        for exam in sessions.iterator(chunk_size=batch_size):
+            batch.append(exam)
+            if len(batch) >= batch_size:
+                changed += self._regrade_batch(batch, fixes, dry_run)
+                scanned += len(batch)
+                batch = []
+        if batch:
+            changed += self._regrade_batch(batch, fixes, dry_run)
+            scanned += len(batch)
+
+        unused = set(fixes) - self._applied
+        if unused:
+            self.stderr.write(f"Fixes not applied (exam or question not found): {sorted(unused)}")
+
+        verb = 'Would update' if dry_run else 'Updated'
+        self.stdout.write(self.style.SUCCESS(f"Scanned {scanned} sessions. {verb} {changed}."))
+
+    def _parse_fixes(self, raw_fixes):
+        """Parse --set values into {(exam_id, question_id): answer}"""
+        self._applied = set()
+        fixes = {}
+        for raw in raw_fixes:
+            try:
+                exam_id, question_id, answer = (int(part) for part in raw.split(':'))
+            except ValueError:
+                raise CommandError(f"Invalid --set value '{raw}', expected EXAM_ID:QUESTION_ID:ANSWER")
+            if not 0 <= answer <= 3:
+                raise CommandError(f"Answer index must be 0-3 in '{raw}'")
+            fixes[(exam_id, question_id)] = answer
+        return fixes
+
+    def _regrade_batch(self, batch, fixes, dry_run):
+        """Regrade one batch of sessions with a single set of array operations"""
+        width = max((len(exam.questions) for exam in batch), default=0)
+        if width == 0:
+            return 0
+
+        # Padding: answers use UNANSWERED, keys use -2 so padding never matches
+        answers = np.full((len(batch), width), UNANSWERED, dtype=np.int8)
+        keys = np.full((len(batch), width), -2, dtype=np.int8)
+        totals = np.zeros(len(batch), dtype=np.int32)
+        keys_changed = np.zeros(len(batch), dtype=bool)
+
+        for row, exam in enumerate(batch):
+            for col, q in enumerate(exam.questions):
+                fix = fixes.get((exam.id, q['id']))
+                if fix is not None:
+                    self._applied.add((exam.id, q['id']))
+                    if q['correct_answer'] != fix:
+                        q['correct_answer'] = fix
+                        keys_changed[row] = True
+                keys[row, col] = q['correct_answer']
+            totals[row] = len(exam.questions)
+
+            stored = self._answer_vector(exam)[:width]
+            answers[row, :len(stored)] = stored
+
+        correct = answers == keys
+        counts = correct.sum(axis=1)
+        scores = np.round(
+            np.divide(counts * 100.0, totals, out=np.zeros(len(batch)), where=totals > 0), 1,
+        )
+
+        to_update = []
+        for row, exam in enumerate(batch):
+            n = totals[row]
+            new_results = np.stack([answers[row, :n], correct[row, :n]], axis=1).astype(int).tolist()
+            new_count = int(counts[row])
+            new_score = float(scores[row])
+            if (keys_changed[row] or new_results != exam.results
+                    or new_count != exam.correct_count or new_score != exam.score):
+                exam.results = new_results
+                exam.correct_count = new_count
+                exam.score = new_score
+                to_update.append(exam)
+
+        if to_update and not dry_run:
+            with transaction.atomic():
+                ExamSession.objects.bulk_update(
+                    to_update, ['questions', 'results', 'correct_count', 'score'],
+                )
+            # bulk_update sends no signals, so invalidate cached payloads here
+            for exam in to_update:
+                caching.invalidate_exam(exam.id, exam.user_id)
+        return len(to_update)
+
+    @staticmethod
+    def _answer_vector(exam):
+        """
+        Student answers for one session, tolerating legacy dict results.
+        Answers outside a question's options become UNANSWERED, which also
+        keeps every value within the int8 answer array.
+        """
+        results = exam.results
+        if results and isinstance(results[0], dict):
+            raw = [r.get('student_answer') for r in results]
+        elif results:
+            raw = [answer for answer, _ in results]
+        else:
+            raw = [exam.student_answers.get(str(q['id'])) for q in exam.questions]
+        return [answer_index(answer, len(q['options'])) for answer, q in zip(raw, exam.questions)]
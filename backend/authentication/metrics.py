@@ -0,0 +1,143 @@
+"""
+Request metrics aggregated across worker processes.
+
+Each process accumulates counters in memory, and a background thread adds
+them into a small SQLite file (METRICS_DB_PATH) with UPSERTs every
+METRICS_FLUSH_SECONDS, so every worker contributes to the same totals and
+no request (or event loop) waits on the file lock. /api/metrics renders
+the file in Prometheus text exposition format.
+"""
+
+import atexit
+import sqlite3
+import threading
+import time
+from collections import defaultdict
+
+from django.conf import settings
+
+# Latency histogram buckets (seconds)
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+HELP = {
+    'http_request_duration_seconds': ('histogram', 'Request latency by route'),
+    'http_requests_total': ('counter', 'Requests by route and status'),
+    'http_request_size_bytes_total': ('counter', 'Request body bytes by route'),
+    'http_response_size_bytes_total': ('counter', 'Response body bytes by route'),
+    'db_queries_total': ('counter', 'Database queries by route'),
+    'db_query_duration_seconds_total': ('counter', 'Database time by route'),
+}
+
+_local = threading.local()
+
+
+def _connect():
+    conn = getattr(_local, 'conn', None)
+    if conn is None:
+        conn = sqlite3.connect(str(settings.METRICS_DB_PATH), timeout=5, isolation_level=None)
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('PRAGMA synchronous=NORMAL')
+        conn.execute(
+            'CREATE TABLE IF NOT EXISTS metrics ('
+            'name TEXT NOT NULL, labels TEXT NOT NULL, value REAL NOT NULL, '
+            'PRIMARY KEY (name, labels))'
+        )
+        _local.conn = conn
+    return conn
+
+
+def _labels(**labels) -> str:
+    """Prometheus label string, e.g. route="api/auth/check/",method="GET" """
+    return ','.join(f'{k}="{str(v)}"' for k, v in labels.items())
+
+
+def _series_order(row):
+    """Sort by name and labels, with histogram buckets in ascending 'le' order"""
+    name, labels, _ = row
+    base, sep, le = labels.partition(',le="')
+    bound = float(le.rstrip('"').replace('+Inf', 'inf')) if sep else 0.0
+    return name, base, bound
+
+
+class Registry:
+    """Per-process counters, flushed to the shared file every METRICS_FLUSH_SECONDS"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._pending = defaultdict(float)
+        self._writer = None
+
+    def observe_request(self, route, method, status_code, duration, request_bytes, response_bytes,
+                        query_count, query_time):
+        base = _labels(route=route, method=method)
+        with self._lock:
+            pending = self._pending
+            for le in LATENCY_BUCKETS:
+                if duration <= le:
+                    pending[('http_request_duration_seconds_bucket', f'{base},le="{le}"')] += 1
+            pending[('http_request_duration_seconds_bucket', f'{base},le="+Inf"')] += 1
+            pending[('http_request_duration_seconds_sum', base)] += duration
+            pending[('http_request_duration_seconds_count', base)] += 1
+            pending[('http_requests_total', f'{base},status="{status_code}"')] += 1
+            pending[('http_request_size_bytes_total', base)] += request_bytes
+            pending[('http_response_size_bytes_total', base)] += response_bytes
+            pending[('db_queries_total', base)] += query_count
+            pending[('db_query_duration_seconds_total', base)] += query_time
+
+            if self._writer is None or not self._writer.is_alive():
+                self._writer = threading.Thread(target=self._writer_loop, name='metrics-writer', daemon=True)
+                self._writer.start()
+
+    def _writer_loop(self):
+        while True:
+            time.sleep(settings.METRICS_FLUSH_SECONDS)
+            self.flush()
+
+    def flush(self):
+        with self._lock:
+            pending, self._pending = self._pending, defaultdict(float)
+        if not pending:
+            return
+        conn = None
+        try:
+            conn = _connect()
+            conn.execute('BEGIN IMMEDIATE')
+            conn.executemany(
+                'INSERT INTO metrics (name, labels, value) VALUES (?, ?, ?) '
+                'ON CONFLICT (name, labels) DO UPDATE SET value = value + excluded.value',
+                [(name, labels, value) for (name, labels), value in pending.items()],
+            )
+            conn.execute('COMMIT')
+        except sqlite3.Error as e:
+            print(f"Metrics flush error: {e}")
+            if conn is not None and conn.in_transaction:
+                conn.execute('ROLLBACK')
+            # Keep the counters for the next flush
+            with self._lock:
+                for series, value in pending.items():
+                    self._pending[series] += value
+
+    def render(self) -> str:
+        """All series from the shared file in Prometheus text format"""
+        self.flush()
+        rows = _connect().execute('SELECT name, labels, value FROM metrics').fetchall()
+        rows.sort(key=_series_order)
+
+        lines = []
+        described = set()
+        for name, labels, value in rows:
+            family = name
+            for suffix in ('_bucket', '_sum', '_count'):
+                if name.endswith(suffix) and name[:-len(suffix)] in HELP:
+                    family = name[:-len(suffix)]
+            if family not in described and family in HELP:
+                metric_type, help_text = HELP[family]
+                lines.append(f'# HELP {family} {help_text}')
+                lines.append(f'# TYPE {family} {metric_type}')
+                described.add(family)
+            lines.append(f'{name}{{{labels}}} {value:g}')
+        return '\n'.join(lines) + '\n'
+
+
+registry = Registry()
+atexit.register(registry.flush)
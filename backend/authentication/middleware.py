@@ -0,0 +1,110 @@
+import contextvars
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import connections
+from django.db.backends.signals import connection_created
+
+from .metrics import registry
+from .views import content_length
+
+# Counter for the request being handled. A contextvar rather than
+# connection.execute_wrapper() so queries an async view runs through
+# sync_to_async (in another thread, on another connection) still count.
+_query_counter = contextvars.ContextVar('metrics_query_counter', default=None)
+
+
+class QueryCounter:
+    """Execute-wrapper hook counting queries and their total time"""
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.count += 1
+            self.duration += time.perf_counter() - start
+
+
+def count_queries(execute, sql, params, many, context):
+    """Installed on every connection; forwards to the active request's counter"""
+    counter = _query_counter.get()
+    if counter is None:
+        return execute(sql, params, many, context)
+    return counter(execute, sql, params, many, context)
+
+
+def install_query_counter(sender=None, connection=None, **kwargs):
+    if count_queries not in connection.execute_wrappers:
+        connection.execute_wrappers.append(count_queries)
+
+
+connection_created.connect(install_query_counter)
+
+
+class MetricsMiddleware:
+    """
+    Record latency, status, DB queries and payload sizes per URL route.
+    Exposed at /api/metrics. Works under WSGI and ASGI.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+        for connection in connections.all(initialized_only=True):
+            install_query_counter(connection=connection)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if not settings.METRICS_ENABLED:
+            return self.get_response(request)
+
+        counter = QueryCounter()
+        token = _query_counter.set(counter)
+        start = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            _query_counter.reset(token)
+        self.observe(request, response, time.perf_counter() - start, counter)
+        return response
+
+    async def __acall__(self, request):
+        if not settings.METRICS_ENABLED:
+            return await self.get_response(request)
+
+        counter = QueryCounter()
+        token = _query_counter.set(counter)
+        start = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            _query_counter.reset(token)
+        self.observe(request, response, time.perf_counter() - start, counter)
+        return response
+
+    def observe(self, request, response, duration, counter):
+        match = getattr(request, 'resolver_match', None)
+        route = match.route if match else 'unmatched'
+        response_bytes = 0 if getattr(response, 'streaming', False) else len(response.content)
+
+        registry.observe_request(
+            route=route,
+            method=request.method,
+            status_code=response.status_code,
+            duration=duration,
+            request_bytes=content_length(request),
+            response_bytes=response_bytes,
+            query_count=counter.count,
+            query_time=counter.duration,
+        )
@@ -0,0 +1,31 @@
+from django.db import migrations
+
+
+def compact_results(apps, schema_editor):
+    """Convert legacy per-question result dicts to [student_answer, is_correct] pairs"""
+    ExamSession = apps.get_model('authentication', 'ExamSession')
+    batch = []
+    for exam in ExamSession.objects.filter(is_completed=True).only('id', 'results').iterator(chunk_size=1000):
+        if not exam.results or not isinstance(exam.results[0], dict):
+            continue
+        exam.results = [
+            [-1 if r.get('student_answer') is None else int(r['student_answer']), int(bool(r.get('is_correct')))]
+            for r in exam.results
+        ]
+        batch.append(exam)
+        if len(batch) >= 1000:
+            ExamSession.objects.bulk_update(batch, ['results'])
+            batch = []
+    if batch:
+        ExamSession.objects.bulk_update(batch, ['results'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('authentication', '0004_examsession'),
+    ]
+
+    operations = [
+        migrations.RunPython(compact_results, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,46 @@
+from datetime import timedelta
+
+from django.db import migrations, models
+
+
+def backfill_expires_at(apps, schema_editor):
+    """Give open legacy sessions a deadline so the reaper can close them"""
+    ExamSession = apps.get_model('authentication', 'ExamSession')
+    batch = []
+    for exam in ExamSession.objects.filter(is_completed=False, expires_at__isnull=True).iterator(chunk_size=1000):
+        exam.expires_at = exam.created_at + timedelta(minutes=exam.duration_minutes)
+        batch.append(exam)
+        if len(batch) >= 1000:
+            ExamSession.objects.bulk_update(batch, ['expires_at'])
+            batch = []
+    if batch:
+        ExamSession.objects.bulk_update(batch, ['expires_at'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('authentication', '0005_compact_exam_results'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='examsession',
+            name='auto_submitted',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.AddField(
+            model_name='examsession',
+            name='expires_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='examsession',
+            index=models.Index(condition=models.Q(('is_completed', False)), fields=['expires_at'], name='exam_open_expiry_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='examsession',
+            index=models.Index(condition=models.Q(('is_completed', True)), fields=['user', '-created_at'], name='exam_completed_history_idx'),
+        ),
+        migrations.RunPython(backfill_expires_at, migrations.RunPython.noop),
+    ]
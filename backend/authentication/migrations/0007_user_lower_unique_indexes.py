@@ -0,0 +1,56 @@
+# Generated by Django 4.2.30 on 2026-10-18 22:58
+
+from django.core.management.base import CommandError
+from django.db import migrations, models
+from django.db.models import Count
+import django.db.models.functions.text
+
+
+def check_case_duplicates(apps, schema_editor):
+    """
+    Stop before the Lower() constraints if usernames or emails differ only
+    by case, listing the conflicting accounts. Which account keeps the
+    value is an operator decision (rename or merge them, then run migrate
+    again), so nothing is changed here.
+    """
+    User = apps.get_model('authentication', 'User')
+    Lower = django.db.models.functions.text.Lower
+    conflicts = []
+
+    for field in ('username', 'email'):
+        duplicates = (
+            User.objects.annotate(key=Lower(field)).values('key')
+            .annotate(n=Count('id')).filter(n__gt=1).values_list('key', flat=True)
+        )
+        for key in duplicates:
+            users = User.objects.annotate(key=Lower(field)).filter(key=key).order_by('id')
+            conflicts.append(f"  {field} {key!r}: " + ', '.join(
+                f"user {u.id} ({getattr(u, field)!r}, joined {u.created_at:%Y-%m-%d})" for u in users
+            ))
+
+    if conflicts:
+        raise CommandError(
+            "Usernames or emails that differ only by case must be resolved before "
+            "the case-insensitive unique constraints can be added:\n"
+            + '\n'.join(conflicts)
+            + "\nRename or merge these accounts, then run migrate again."
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('authentication', '0006_examsession_expiry'),
+    ]
+
+    operations = [
+        migrations.RunPython(check_case_duplicates, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='user',
+            constraint=models.UniqueConstraint(django.db.models.functions.text.Lower('username'), name='users_username_lower_uniq'),
+        ),
+        migrations.AddConstraint(
+            model_name='user',
+            constraint=models.UniqueConstraint(django.db.models.functions.text.Lower('email'), name='users_email_lower_uniq'),
+        ),
+    ]
@@ -0,0 +1,39 @@
+# Generated by Django 4.2.30 on 2026-10-18 23:04
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('authentication', '0007_user_lower_unique_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LLMUsage',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('feature', models.CharField(max_length=50)),
+                ('model', models.CharField(max_length=100)),
+                ('prompt_tokens', models.IntegerField(default=0)),
+                ('output_tokens', models.IntegerField(default=0)),
+                ('thinking_tokens', models.IntegerField(default=0)),
+                ('cached_tokens', models.IntegerField(default=0)),
+                ('total_tokens', models.IntegerField(default=0)),
+                ('latency_ms', models.IntegerField(default=0)),
+                ('success', models.BooleanField(default=True)),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('user', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='llm_usage', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'LLM Usage',
+                'verbose_name_plural': 'LLM Usage',
+                'db_table': 'llm_usage',
+                'indexes': [models.Index(fields=['user', 'created_at'], name='llm_usage_user_day_idx'), models.Index(fields=['created_at', 'feature'], name='llm_usage_day_feature_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,41 @@
+# Generated by Django 4.2.30 on 2026-10-18 23:27
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('authentication', '0008_llmusage'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProjectSubmission',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('project_id', models.CharField(max_length=100)),
+                ('project_title', models.CharField(blank=True, max_length=255)),
+                ('overall_score', models.IntegerField(default=0)),
+                ('code_quality', models.IntegerField(default=0)),
+                ('completeness', models.IntegerField(default=0)),
+                ('technical_implementation', models.IntegerField(default=0)),
+                ('evaluation', models.JSONField(default=dict)),
+                ('project_hash', models.CharField(max_length=64)),
+                ('file_hashes', models.JSONField(default=dict)),
+                ('file_reviews', models.JSONField(default=dict)),
+                ('submitted_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='project_submissions', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Project Submission',
+                'verbose_name_plural': 'Project Submissions',
+                'db_table': 'project_submissions',
+                'ordering': ['-updated_at'],
+                'unique_together': {('user', 'project_id')},
+            },
+        ),
+    ]
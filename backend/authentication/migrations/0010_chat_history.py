@@ -0,0 +1,52 @@
+# Generated by Django 4.2.30 on 2026-10-18 23:32
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('authentication', '0009_projectsubmission'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ChatConversation',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('title', models.CharField(blank=True, max_length=120)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='chat_conversations', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Chat Conversation',
+                'verbose_name_plural': 'Chat Conversations',
+                'db_table': 'chat_conversations',
+                'ordering': ['-updated_at', '-id'],
+            },
+        ),
+        migrations.CreateModel(
+            name='ChatMessage',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('role', models.CharField(choices=[('user', 'User'), ('assistant', 'Assistant')], max_length=10)),
+                ('content', models.TextField()),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('conversation', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='messages', to='authentication.chatconversation')),
+            ],
+            options={
+                'verbose_name': 'Chat Message',
+                'verbose_name_plural': 'Chat Messages',
+                'db_table': 'chat_messages',
+                'ordering': ['id'],
+                'indexes': [models.Index(fields=['conversation', 'id'], name='chat_msg_conversation_idx')],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='chatconversation',
+            index=models.Index(fields=['user', '-updated_at', '-id'], name='chat_conv_user_recent_idx'),
+        ),
+    ]
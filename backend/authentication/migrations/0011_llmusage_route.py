@@ -0,0 +1,18 @@
+# Generated by Django 4.2.30 on 2026-10-18 23:53
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('authentication', '0010_chat_history'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='llmusage',
+            name='route',
+            field=models.CharField(blank=True, default='', max_length=100),
+        ),
+    ]
@@ -0,0 +1,97 @@
+"""
+Per-call model selection for the AI features.
+
+Each call is routed on its request features: the feature ('grade', 'chat',
+'exam', 'project', 'project_file'), the estimated prompt tokens, the exam
+difficulty and the caller's tier ('anonymous', 'user', 'staff'). The rules
+are settings.LLM_ROUTES, checked in order; the first rule whose conditions
+all match picks the model. A call matching no rule uses the default route
+(ai_grading.MODEL_NAME).
+
+A rule may name an escalate_to model, used to redo a call whose
+structured output still fails validation (ai_grading.agenerate_structured).
+
+The route name of every call is written to the LLM usage ledger, so the
+staff dashboard reports latency and cost per route.
+"""
+
+from typing import NamedTuple
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+
+CONDITIONS = ('feature', 'difficulty', 'tier', 'min_prompt_tokens', 'max_prompt_tokens')
+RULE_KEYS = {'name', 'model', 'escalate_to', *CONDITIONS}
+
+
+class Route(NamedTuple):
+    name: str
+    model: str
+    escalate_to: str = None
+
+    def escalated(self):
+        """The route to redo a failed call on, or None"""
+        if not self.escalate_to or self.escalate_to == self.model:
+            return None
+        return Route(f"{self.name}/escalated", self.escalate_to)
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (4 characters per token)"""
+    return len(text) // 4
+
+
+def _check(rules: list):
+    for i, rule in enumerate(rules):
+        unknown = set(rule) - RULE_KEYS
+        if unknown:
+            raise ImproperlyConfigured(f"LLM_ROUTES[{i}]: unknown keys {', '.join(sorted(unknown))}")
+        if not rule.get('name') or not rule.get('model'):
+            raise ImproperlyConfigured(f"LLM_ROUTES[{i}]: 'name' and 'model' are required")
+
+
+_checked = None
+
+
+def _rules() -> list:
+    global _checked
+    rules = settings.LLM_ROUTES
+    if rules is not _checked:
+        _check(rules)
+        _checked = rules
+    return rules
+
+
+def _one_of(allowed, value) -> bool:
+    if allowed is None:
+        return True
+    if isinstance(allowed, str):
+        return value == allowed
+    return value in allowed
+
+
+def _matches(rule: dict, feature: str, prompt_tokens: int, difficulty: str, tier: str) -> bool:
+    return (
+        _one_of(rule.get('feature'), feature)
+        and _one_of(rule.get('difficulty'), difficulty)
+        and _one_of(rule.get('tier'), tier)
+        and prompt_tokens >= rule.get('min_prompt_tokens', 0)
+        and ('max_prompt_tokens' not in rule or prompt_tokens <= rule['max_prompt_tokens'])
+    )
+
+
+def route(feature: str, prompt_tokens: int, default: Route, difficulty: str = None, tier: str = None) -> Route:
+    """
+    The route for a call
+
+    Args:
+        feature: Ledger feature name
+        prompt_tokens: Estimated prompt size (system instruction included)
+        default: Route used when no rule matches
+        difficulty: Exam difficulty, for exam calls
+        tier: Caller tier from llm_usage.current_tier()
+    """
+    for rule in _rules():
+        if _matches(rule, feature, prompt_tokens, difficulty, tier):
+            return Route(rule['name'], rule['model'], rule.get('escalate_to'))
+    return default
@@ -1,5 +1,33 @@
+from datetime import timedelta
+
 from django.contrib.auth.models import AbstractUser
-from django.db import models
+from django.db import connection, models
+from django.db.models import Q, Value
+from django.db.models.functions import Lower
+from django.utils import timezone
+
+# str.translate table for SQLite's LOWER(), which only folds ASCII letters
+_ASCII_LOWER = str.maketrans('ABCDEFGHIJKLMNOPQRSTUVWXYZ', 'abcdefghijklmnopqrstuvwxyz')
+
+
+def filter_lower(queryset, field: str, values):
+    """
+    Rows whose field equals one of values ignoring case, compared the way the
+    Lower() unique constraints compare: the database lowers both sides (and
+    uses the constraint's index). The lowered column is annotated as
+    `<field>_lower`.
+    """
+    name = f'{field}_lower'
+    return queryset.annotate(**{name: Lower(field)}).filter(
+        **{f'{name}__in': [Lower(Value(value)) for value in values]}
+    )
+
+
+def fold_case(value: str) -> str:
+    """Python equivalent of the database LOWER() used by the unique constraints"""
+    if connection.vendor == 'sqlite':
+        return value.translate(_ASCII_LOWER)
+    return value.lower()
 
 
 class User(AbstractUser):
@@ -19,6 +47,11 @@ class User(AbstractUser):
         db_table = 'users'
         verbose_name = 'User'
         verbose_name_plural = 'Users'
+        constraints = [
+            # Case-insensitive uniqueness, also used by the signup validators
+            models.UniqueConstraint(Lower('username'), name='users_username_lower_uniq'),
+            models.UniqueConstraint(Lower('email'), name='users_email_lower_uniq'),
+        ]
 
     def __str__(self):
         return self.username
@@ -115,17 +148,184 @@ class ExamSession(models.Model):
     correct_count = models.IntegerField(default=0)
     questions = models.JSONField(default=list)
     student_answers = models.JSONField(default=dict)
-    results = models.JSONField(default=list)
+    results = models.JSONField(default=list)  # [student_answer, is_correct] per question
     is_completed = models.BooleanField(default=False)
+    auto_submitted = models.BooleanField(default=False)  # Closed by the server after the deadline
     created_at = models.DateTimeField(auto_now_add=True)
+    expires_at = models.DateTimeField(null=True, blank=True)  # Server-enforced deadline
     completed_at = models.DateTimeField(null=True, blank=True)
 
+    # Extra time accepted after the deadline to absorb network latency
+    SUBMIT_GRACE_SECONDS = 60
+
     class Meta:
         db_table = 'exam_sessions'
         verbose_name = 'Exam Session'
         verbose_name_plural = 'Exam Sessions'
         ordering = ['-created_at']
+        indexes = [
+            # Reaper scan: only open sessions are indexed
+            models.Index(
+                fields=['expires_at'],
+                condition=Q(is_completed=False),
+                name='exam_open_expiry_idx',
+            ),
+            # Exam history: only completed sessions are indexed
+            models.Index(
+                fields=['user', '-created_at'],
+                condition=Q(is_completed=True),
+                name='exam_completed_history_idx',
+            ),
+        ]
 
     def __str__(self):
         status = f"{self.score:.0f}%" if self.score is not None else "In Progress"
         return f"{self.user.username} - {self.difficulty} ({status})"
+
+    def is_expired(self, now=None):
+        """True once the deadline plus grace period has passed"""
+        if self.expires_at is None:
+            return False
+        now = now or timezone.now()
+        return now > self.expires_at + timedelta(seconds=self.SUBMIT_GRACE_SECONDS)
+
+    def complete(self, answers, auto_submitted=False):
+        """Grade the given answers and mark the session completed"""
+        from .ai_grading import grade_exam
+
+        grading = grade_exam(self.questions, answers)
+
+        self.student_answers = answers
+        self.results = grading.get('results', [])
+        self.score = grading.get('score', 0)
+        self.correct_count = grading.get('correct_count', 0)
+        self.is_completed = True
+        self.auto_submitted = auto_submitted
+        self.completed_at = timezone.now()
+        self.save()
+
+        return grading
+
+
+class ProjectSubmission(models.Model):
+    """
+    AI evaluation of a project submission.
+    Replaces the previous evaluation on resubmit (unique per user + project_id);
+    per-file reviews are kept so unchanged files are not sent to the LLM again.
+    """
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='project_submissions')
+    project_id = models.CharField(max_length=100)
+    project_title = models.CharField(max_length=255, blank=True)
+
+    # Score fields
+    overall_score = models.IntegerField(default=0)
+    code_quality = models.IntegerField(default=0)
+    completeness = models.IntegerField(default=0)
+    technical_implementation = models.IntegerField(default=0)
+
+    # Full evaluation result as JSON (as returned by the evaluate endpoint)
+    evaluation = models.JSONField(default=dict)
+
+    # Reuse bookkeeping: hash of the assignment, file path -> content hash,
+    # and file hash -> chunk reviews (from the map step, or the per-file
+    # reviews of a single-call evaluation)
+    project_hash = models.CharField(max_length=64)
+    file_hashes = models.JSONField(default=dict)
+    file_reviews = models.JSONField(default=dict)
+
+    # Timestamps
+    submitted_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'project_submissions'
+        verbose_name = 'Project Submission'
+        verbose_name_plural = 'Project Submissions'
+        unique_together = ['user', 'project_id']
+        ordering = ['-updated_at']
+
+    def __str__(self):
+        return f"{self.user.username} - {self.project_title} ({self.overall_score}%)"
+
+
+class ChatConversation(models.Model):
+    """
+    An OrcaAI conversation. updated_at moves on every exchange so the
+    conversation list is ordered by last activity.
+    """
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='chat_conversations')
+    title = models.CharField(max_length=120, blank=True)  # First user message, truncated
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'chat_conversations'
+        verbose_name = 'Chat Conversation'
+        verbose_name_plural = 'Chat Conversations'
+        ordering = ['-updated_at', '-id']
+        indexes = [
+            # Conversation list: keyset on (updated_at, id) per user
+            models.Index(fields=['user', '-updated_at', '-id'], name='chat_conv_user_recent_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.user.username} - {self.title}"
+
+
+class ChatMessage(models.Model):
+    """
+    One message of a ChatConversation. Append-only; ids increase in
+    conversation order, so pages are keyset reads on (conversation, id).
+    """
+    ROLE_CHOICES = [
+        ('user', 'User'),
+        ('assistant', 'Assistant'),
+    ]
+
+    conversation = models.ForeignKey(ChatConversation, on_delete=models.CASCADE, related_name='messages')
+    role = models.CharField(max_length=10, choices=ROLE_CHOICES)
+    content = models.TextField()
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        db_table = 'chat_messages'
+        verbose_name = 'Chat Message'
+        verbose_name_plural = 'Chat Messages'
+        ordering = ['id']
+        indexes = [
+            models.Index(fields=['conversation', 'id'], name='chat_msg_conversation_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.conversation_id} - {self.role}"
+
+
+class LLMUsage(models.Model):
+    """
+    Append-only ledger of LLM calls: one row per generate_content request.
+    Written in batches by llm_usage.py, never updated.
+    """
+    user = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, related_name='llm_usage')
+    feature = models.CharField(max_length=50)  # grade, chat, exam, project
+    model = models.CharField(max_length=100)
+    route = models.CharField(max_length=100, blank=True, default='')  # model_router route name
+    prompt_tokens = models.IntegerField(default=0)
+    output_tokens = models.IntegerField(default=0)
+    thinking_tokens = models.IntegerField(default=0)
+    cached_tokens = models.IntegerField(default=0)
+    total_tokens = models.IntegerField(default=0)
+    latency_ms = models.IntegerField(default=0)
+    success = models.BooleanField(default=True)
+    created_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        db_table = 'llm_usage'
+        verbose_name = 'LLM Usage'
+        verbose_name_plural = 'LLM Usage'
+        indexes = [
+            models.Index(fields=['user', 'created_at'], name='llm_usage_user_day_idx'),
+            models.Index(fields=['created_at', 'feature'], name='llm_usage_day_feature_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.feature} - {self.model} ({self.total_tokens} tokens)"
@@ -0,0 +1,34 @@
+"""
+Parsers for REST_FRAMEWORK['DEFAULT_PARSER_CLASSES'].
+"""
+
+import orjson
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import BaseParser, JSONParser
+
+try:
+    import msgpack
+except ImportError:  # optional dependency
+    msgpack = None
+
+
+class ORJSONParser(JSONParser):
+    """JSONParser backed by orjson (request bodies must be UTF-8)"""
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        try:
+            return orjson.loads(stream.read())
+        except orjson.JSONDecodeError as exc:
+            raise ParseError(f'JSON parse error - {exc}')
+
+
+class MessagePackParser(BaseParser):
+    """Request bodies sent as Content-Type: application/msgpack"""
+
+    media_type = 'application/msgpack'
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        try:
+            return msgpack.unpackb(stream.read(), raw=False)
+        except Exception as exc:
+            raise ParseError(f'MessagePack parse error - {exc}')
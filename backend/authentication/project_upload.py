@@ -0,0 +1,200 @@
+"""
+Zip project uploads for /api/ai/project/evaluate/.
+
+The archive is read in one pass over its central directory. Members are
+filtered by rule before they are decompressed (vendored/tooling dirs, data
+and binary extensions, declared size), then streamed with a hard cap on the
+bytes actually produced, so a zip bomb cannot expand past the limits
+whatever its headers claim. Only source files come back, in the same
+{file_name, content} shape the JSON upload uses; notebooks are flattened to
+their code cells and outputs like the frontend does.
+"""
+
+import json
+import posixpath
+import zipfile
+
+MAX_ARCHIVE_BYTES = 20 * 1024 * 1024
+# Whole multipart request (archive plus the other form fields), checked
+# against Content-Length before the body is parsed
+MAX_REQUEST_BYTES = MAX_ARCHIVE_BYTES + 256 * 1024
+MAX_ENTRIES = 5000          # members inspected
+MAX_FILES = 100             # source files kept
+MAX_FILE_BYTES = 256 * 1024  # per file, decompressed
+MAX_TOTAL_BYTES = 2 * 1024 * 1024  # all kept files, decompressed
+MAX_RATIO = 200             # decompressed / compressed size of a member
+MAX_SKIPPED_REPORTED = 200
+READ_CHUNK = 64 * 1024
+
+SKIPPED_DIRS = {
+    '__pycache__', '__MACOSX', '.git', '.hg', '.svn', '.idea', '.vscode',
+    'venv', '.venv', 'env', '.env', 'virtualenv', 'site-packages', 'node_modules',
+    '.ipynb_checkpoints', '.pytest_cache', '.mypy_cache', '.ruff_cache', '.tox',
+    'dist', 'build', '.eggs',
+}
+
+SOURCE_EXTENSIONS = {
+    '.py', '.ipynb', '.pyi', '.js', '.jsx', '.ts', '.tsx', '.html', '.css',
+    '.sql', '.sh', '.r', '.java', '.c', '.h', '.cpp', '.hpp', '.go', '.rs',
+    '.md', '.txt', '.toml', '.cfg', '.ini', '.yaml', '.yml', '.json',
+}
+SOURCE_FILENAMES = {'Dockerfile', 'Makefile', 'Procfile'}
+
+
+class UploadError(ValueError):
+    """The archive is unusable as a whole (not a zip, too large)"""
+
+
+def _vendored_dir(file_name: str):
+    """Path of the first skipped directory in file_name ("venv/"), or None"""
+    parts = file_name.split('/')
+    for i, part in enumerate(parts[:-1]):
+        if part in SKIPPED_DIRS or part.endswith('.egg-info'):
+            return '/'.join(parts[:i + 1]) + '/'
+    return None
+
+
+def _skip_reason(info: zipfile.ZipInfo):
+    """Why a member is skipped before reading it, or None to read it"""
+    name = info.filename
+    if info.is_dir():
+        return 'directory'
+    if name.startswith('/') or '..' in name.split('/'):
+        return 'unsafe path'
+    if _vendored_dir(name):
+        return 'vendored or generated directory'
+    base = name.split('/')[-1]
+    if base.startswith('.') and base not in SOURCE_FILENAMES:
+        return 'hidden file'
+    ext = posixpath.splitext(base)[1].lower()
+    if ext not in SOURCE_EXTENSIONS and base not in SOURCE_FILENAMES:
+        return 'not a source file'
+    if info.flag_bits & 0x1:
+        return 'encrypted'
+    if info.file_size > MAX_FILE_BYTES:
+        return 'too large'
+    if info.compress_size and info.file_size / info.compress_size > MAX_RATIO:
+        return 'suspicious compression ratio'
+    return None
+
+
+def _read_capped(archive: zipfile.ZipFile, info: zipfile.ZipInfo, limit: int):
+    """Decompress a member, stopping as soon as it passes limit bytes. None if it did."""
+    data = bytearray()
+    with archive.open(info) as stream:
+        while True:
+            chunk = stream.read(READ_CHUNK)
+            if not chunk:
+                return bytes(data)
+            data += chunk
+            if len(data) > limit:
+                return None
+
+
+def notebook_source(raw: str) -> str:
+    """Code cells of a notebook with their text outputs (as extractForEval in Projects.tsx)"""
+    notebook = json.loads(raw)
+    cells = [c for c in notebook.get('cells', []) if c.get('cell_type') == 'code']
+    blocks = []
+    for i, cell in enumerate(cells, 1):
+        source = cell.get('source', '')
+        text = f"# ── Cell {i} ──────────────────────────\n{''.join(source) if isinstance(source, list) else source}"
+        outputs = []
+        for output in cell.get('outputs', []):
+            if output.get('output_type') == 'stream':
+                body = output.get('text', '')
+                outputs.append(''.join(body) if isinstance(body, list) else body)
+            elif output.get('output_type') in ('execute_result', 'display_data'):
+                body = output.get('data', {}).get('text/plain')
+                if body:
+                    outputs.append(''.join(body) if isinstance(body, list) else body)
+            elif output.get('output_type') == 'error':
+                outputs.append(f"{output.get('ename', '')}: {output.get('evalue', '')}")
+        if outputs:
+            text += '\n\n# Output:\n' + '\n'.join(outputs)
+        blocks.append(text)
+    return '\n\n'.join(blocks)
+
+
+def extract_project_zip(upload) -> tuple:
+    """
+    Extract the source files of an uploaded zip.
+
+    Args:
+        upload: Django UploadedFile (or any seekable binary file object)
+
+    Returns:
+        Tuple of (files_content, skipped) where files_content is a list of
+        {file_name, content} and skipped a list of {file_name, reason}
+
+    Raises:
+        UploadError: not a zip archive, or larger than MAX_ARCHIVE_BYTES
+    """
+    if getattr(upload, 'size', 0) > MAX_ARCHIVE_BYTES:
+        raise UploadError(f'Archive is larger than {MAX_ARCHIVE_BYTES // (1024 * 1024)} MB')
+
+    try:
+        archive = zipfile.ZipFile(upload)
+    except (zipfile.BadZipFile, OSError):
+        raise UploadError('Upload is not a valid zip archive')
+
+    files_content, skipped = [], []
+    skipped_dirs = set()
+    total = 0
+
+    def skip(file_name, reason):
+        if reason == 'vendored or generated directory':
+            # Report each skipped directory once, not every file under it
+            file_name = _vendored_dir(file_name) or file_name
+            if file_name in skipped_dirs:
+                return
+            skipped_dirs.add(file_name)
+        if len(skipped) < MAX_SKIPPED_REPORTED:
+            skipped.append({'file_name': file_name, 'reason': reason})
+
+    with archive:
+        entries = archive.infolist()
+        if len(entries) > MAX_ENTRIES:
+            raise UploadError(f'Archive has more than {MAX_ENTRIES} entries')
+
+        # Strip a single top-level folder ("project/...") from the names
+        names = {info.filename.split('/', 1)[0] for info in entries}
+        prefix = next(iter(names)) + '/' if len(names) == 1 and all('/' in i.filename for i in entries) else ''
+
+        for info in entries:
+            file_name = info.filename[len(prefix):] if prefix else info.filename
+            reason = _skip_reason(info)
+            if reason == 'directory':
+                continue
+            if reason is None and len(files_content) >= MAX_FILES:
+                reason = 'file limit reached'
+            if reason is None and total + info.file_size > MAX_TOTAL_BYTES:
+                reason = 'total size limit reached'
+            if reason is not None:
+                skip(file_name, reason)
+                continue
+
+            data = _read_capped(archive, info, min(MAX_FILE_BYTES, MAX_TOTAL_BYTES - total))
+            if data is None:
+                skip(file_name, 'too large')
+                continue
+            if b'\0' in data[:8192]:
+                skip(file_name, 'binary')
+                continue
+            try:
+                content = data.decode('utf-8')
+            except UnicodeDecodeError:
+                skip(file_name, 'binary')
+                continue
+
+            if file_name.lower().endswith('.ipynb'):
+                try:
+                    content = notebook_source(content)
+                except (ValueError, AttributeError):
+                    skip(file_name, 'invalid notebook')
+                    continue
+
+            total += len(data)
+            files_content.append({'file_name': file_name, 'content': content})
+
+    return files_content, skipped
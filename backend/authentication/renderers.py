@@ -0,0 +1,101 @@
+"""
+Renderers for REST_FRAMEWORK['DEFAULT_RENDERER_CLASSES'].
+
+ORJSONRenderer produces the same JSON as DRF's JSONRenderer (compact,
+unescaped unicode, DRF's datetime/Decimal formatting) at a fraction of the
+cost. MessagePackRenderer is used when the client sends
+`Accept: application/msgpack` and the optional msgpack package is installed.
+
+negotiate() and finalize() apply the same content negotiation to the async
+views, which DRF's APIView does not wrap (views.async_api_view).
+"""
+
+import orjson
+from django.utils.cache import patch_vary_headers
+from rest_framework.renderers import BaseRenderer, BrowsableAPIRenderer, JSONRenderer
+from rest_framework.request import Request
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+
+try:
+    import msgpack
+except ImportError:  # optional dependency
+    msgpack = None
+
+# Datetimes go through DRF's encoder so the wire format stays unchanged
+ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+
+
+class ORJSONRenderer(JSONRenderer):
+    """JSONRenderer backed by orjson"""
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+
+        renderer_context = renderer_context or {}
+        if self.get_indent(accepted_media_type, renderer_context):
+            # orjson only indents by 2; let DRF honour `; indent=N`
+            return super().render(data, accepted_media_type, renderer_context)
+
+        # Unlike JSONRenderer, U+2028/U+2029 are left unescaped: valid JSON, and
+        # scanning large bodies for them cost more than the encoding itself
+        return orjson.dumps(data, default=self.encoder_class().default, option=ORJSON_OPTIONS)
+
+
+class MessagePackRenderer(BaseRenderer):
+    """Binary MessagePack responses for large payloads (submissions, exam details)"""
+
+    media_type = 'application/msgpack'
+    format = 'msgpack'
+    charset = None
+    render_style = 'binary'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        return msgpack.packb(data, default=JSONRenderer.encoder_class().default, use_bin_type=True)
+
+
+# ============================================
+# NEGOTIATION OUTSIDE APIView
+# ============================================
+
+def _renderers() -> list:
+    # The browsable API renders through an APIView instance; these views have none
+    return [
+        renderer() for renderer in api_settings.DEFAULT_RENDERER_CLASSES
+        if not issubclass(renderer, BrowsableAPIRenderer)
+    ]
+
+
+def negotiate(request):
+    """
+    Pick the renderer for a plain Django request from its Accept header (or
+    ?format=), like APIView: the first renderer when nothing matches.
+    Sets request.accepted_renderer and request.accepted_media_type.
+    """
+    renderers = _renderers()
+    try:
+        renderer, media_type = api_settings.DEFAULT_CONTENT_NEGOTIATION_CLASS().select_renderer(
+            Request(request), renderers,
+        )
+    except Exception:
+        renderer, media_type = renderers[0], renderers[0].media_type
+    request.accepted_renderer = renderer
+    request.accepted_media_type = media_type
+    request.vary_accept = len(renderers) > 1
+
+
+def finalize(request, response):
+    """Render a DRF Response with the negotiated renderer; other responses pass through"""
+    if not isinstance(response, Response) or response.is_rendered:
+        return response
+    if not getattr(request, 'accepted_renderer', None):
+        negotiate(request)
+    response.accepted_renderer = request.accepted_renderer
+    response.accepted_media_type = request.accepted_media_type
+    response.renderer_context = {'request': request, 'view': None, 'args': (), 'kwargs': {}}
+    if getattr(request, 'vary_accept', False):
+        patch_vary_headers(response, ['Accept'])
+    return response.render()
@@ -0,0 +1,255 @@
+"""
+Local BM25 retrieval over the course content, used to ground OrcaAI answers.
+
+The corpus is the module outline in CURRICULUM_TOPICS, the module readings
+(content/curriculum.json, one chunk per section) and the lab definitions
+(content/labs.json, one chunk per lab). It is indexed in memory as an
+inverted index in CSR layout:
+
+    indptr[t]:indptr[t + 1]   slice of postings for term id t
+    chunk_ids[slice]          chunks containing the term (int32)
+    weights[slice]            precomputed BM25 weight of the term in each (float32)
+
+so a query is a handful of slice additions into a score vector plus an
+argpartition, with no per-query Python work proportional to the corpus.
+
+The index is built when the WSGI/ASGI application loads (or on first use).
+Content files are re-checked at most every RETRIEVAL_CHECK_INTERVAL
+seconds; when one changed, only the chunks whose text changed are
+re-tokenized and the CSR arrays are rebuilt from the cached term counts.
+"""
+
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from collections import Counter
+from pathlib import Path
+
+import numpy as np
+
+from .labs import LABS_FILE, load_labs
+
+CURRICULUM_FILE = Path(__file__).resolve().parent / 'content' / 'curriculum.json'
+
+RETRIEVAL_TOP_K = int(os.environ.get('RETRIEVAL_TOP_K', 3))
+RETRIEVAL_CHECK_INTERVAL = float(os.environ.get('RETRIEVAL_CHECK_INTERVAL', 5))
+# Longest chunk text injected into a prompt
+RETRIEVAL_CHUNK_CHARS = 1500
+
+# Standard BM25 parameters
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+TOKEN_RE = re.compile(r'[a-z0-9]+(?:[+#][a-z0-9+#]*)?')
+STOPWORDS = frozenset('''
+a an and are as at be but by can do does for from has have how i if in into is it its
+me my of on or so than that the their them then there these they this to was we what
+when where which who why will with you your
+'''.split())
+
+
+def tokenize(text: str) -> list:
+    """Lowercased word tokens without stopwords; a trailing plural 's' is dropped"""
+    tokens = []
+    for token in TOKEN_RE.findall(text.lower()):
+        if token in STOPWORDS:
+            continue
+        if len(token) > 3 and token.endswith('s') and not token.endswith('ss'):
+            token = token[:-1]
+        tokens.append(token)
+    return tokens
+
+
+# ============================================
+# CORPUS
+# ============================================
+
+def curriculum_topic_chunks() -> list:
+    """One chunk per module of CURRICULUM_TOPICS"""
+    from .ai_grading import CURRICULUM_TOPICS
+
+    chunks = []
+    for block in re.split(r'\n(?=Module \d+:)', CURRICULUM_TOPICS.strip()):
+        title = block.split('\n', 1)[0].strip()
+        chunks.append({'source': 'outline', 'title': title, 'text': block.strip()})
+    return chunks
+
+
+def reading_chunks(path: Path = CURRICULUM_FILE) -> list:
+    """One chunk per reading section (plus the module intro)"""
+    chunks = []
+    for module in json.loads(path.read_text(encoding='utf-8')):
+        chunks.append({'source': 'reading', 'title': module['title'], 'text': module['intro']})
+        for section in module['sections']:
+            parts = [section['content']]
+            if section.get('keyPoints'):
+                parts.append('\n'.join(f'- {point}' for point in section['keyPoints']))
+            if section.get('example'):
+                parts.append(section['example'])
+            chunks.append({
+                'source': 'reading',
+                'title': f"{module['title']} / {section['heading']}",
+                'text': '\n'.join(parts),
+            })
+    return chunks
+
+
+def lab_chunks(path: Path = LABS_FILE) -> list:
+    """One chunk per lab: description and requirements"""
+    chunks = []
+    for lab in load_labs(path).values():
+        requirements = '\n'.join(f'- {req}' for req in lab.requirements)
+        chunks.append({
+            'source': 'lab',
+            'title': f"Lab {lab.number}: {lab.title} ({lab.category})",
+            'text': f"{lab.description}\nRequirements:\n{requirements}",
+        })
+    return chunks
+
+
+def load_corpus() -> list:
+    return curriculum_topic_chunks() + reading_chunks() + lab_chunks()
+
+
+def _content_stamp() -> tuple:
+    """Changes whenever a content file is modified"""
+    stamp = []
+    for path in (CURRICULUM_FILE, LABS_FILE):
+        try:
+            stat = path.stat()
+            stamp.append((stat.st_mtime_ns, stat.st_size))
+        except OSError:
+            stamp.append(None)
+    return tuple(stamp)
+
+
+# ============================================
+# INDEX
+# ============================================
+
+class BM25Index:
+    """
+    Immutable BM25 index over a list of chunks. Build with from_chunks();
+    pass the previous index to reuse the term counts of unchanged chunks.
+    """
+
+    def __init__(self, chunks, counts, vocab, indptr, chunk_ids, weights):
+        self.chunks = chunks
+        self.counts = counts      # chunk text hash -> Counter of terms
+        self.vocab = vocab        # term -> row in indptr
+        self.indptr = indptr
+        self.chunk_ids = chunk_ids
+        self.weights = weights
+
+    @classmethod
+    def from_chunks(cls, chunks: list, previous: 'BM25Index' = None) -> 'BM25Index':
+        known = previous.counts if previous is not None else {}
+        counts = {}
+        chunk_counts = []
+        for chunk in chunks:
+            key = hashlib.sha1(f"{chunk['title']}\n{chunk['text']}".encode('utf-8')).hexdigest()
+            if key not in counts:
+                counts[key] = known.get(key) or Counter(tokenize(f"{chunk['title']}\n{chunk['text']}"))
+            chunk_counts.append(counts[key])
+
+        lengths = np.array([sum(c.values()) for c in chunk_counts], dtype=np.float32)
+        avg_length = float(lengths.mean()) if len(lengths) else 0.0
+
+        # Postings grouped by term
+        postings = {}
+        for chunk_id, term_counts in enumerate(chunk_counts):
+            for term, tf in term_counts.items():
+                postings.setdefault(term, []).append((chunk_id, tf))
+
+        vocab = {}
+        indptr = np.zeros(len(postings) + 1, dtype=np.int32)
+        chunk_ids = np.empty(sum(len(p) for p in postings.values()), dtype=np.int32)
+        tfs = np.empty(len(chunk_ids), dtype=np.float32)
+        idf = np.empty(len(chunk_ids), dtype=np.float32)
+        n = len(chunk_counts)
+        pos = 0
+        for row, (term, term_postings) in enumerate(postings.items()):
+            vocab[term] = row
+            end = pos + len(term_postings)
+            chunk_ids[pos:end], tfs[pos:end] = zip(*term_postings)
+            df = len(term_postings)
+            idf[pos:end] = np.log(1 + (n - df + 0.5) / (df + 0.5))
+            indptr[row + 1] = end
+            pos = end
+
+        norm = BM25_K1 * (1 - BM25_B + BM25_B * lengths[chunk_ids] / max(avg_length, 1.0))
+        weights = (idf * tfs * (BM25_K1 + 1) / (tfs + norm)).astype(np.float32)
+        return cls(chunks, counts, vocab, indptr, chunk_ids, weights)
+
+    def search(self, query: str, k: int = RETRIEVAL_TOP_K) -> list:
+        """
+        Top-k chunks for a query.
+
+        Returns:
+            List of (score, chunk) with score > 0, best first
+        """
+        rows = {self.vocab[t] for t in tokenize(query) if t in self.vocab}
+        if not rows or k <= 0:
+            return []
+
+        scores = np.zeros(len(self.chunks), dtype=np.float32)
+        for row in rows:
+            start, end = self.indptr[row], self.indptr[row + 1]
+            # A chunk appears at most once per term, so plain fancy-index add is safe
+            scores[self.chunk_ids[start:end]] += self.weights[start:end]
+
+        k = min(k, len(scores))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [(float(scores[i]), self.chunks[i]) for i in top if scores[i] > 0]
+
+
+_index = None
+_stamp = None
+_checked_at = 0.0
+_lock = threading.Lock()
+
+
+def get_index() -> BM25Index:
+    """
+    The process-wide index, built on first use and rebuilt (reusing the
+    term counts of unchanged chunks) when a content file changes.
+    """
+    global _index, _stamp, _checked_at
+
+    now = time.monotonic()
+    if _index is not None and now - _checked_at < RETRIEVAL_CHECK_INTERVAL:
+        return _index
+
+    with _lock:
+        if _index is not None and now - _checked_at < RETRIEVAL_CHECK_INTERVAL:
+            return _index
+        stamp = _content_stamp()
+        if _index is None or stamp != _stamp:
+            _index = BM25Index.from_chunks(load_corpus(), previous=_index)
+            _stamp = stamp
+        _checked_at = now
+        return _index
+
+
+def search(query: str, k: int = RETRIEVAL_TOP_K) -> list:
+    """Top-k (score, chunk) pairs from the course content"""
+    return get_index().search(query, k)
+
+
+def context_for(query: str, k: int = RETRIEVAL_TOP_K, max_chars: int = RETRIEVAL_CHUNK_CHARS) -> str:
+    """
+    The top-k chunks for a question, formatted for the prompt; empty when
+    nothing matches or the index is unavailable (the chat still answers).
+    """
+    try:
+        results = search(query, k)
+    except Exception as e:
+        print(f"Retrieval error: {e}")
+        return ''
+    return '\n\n'.join(
+        f"### {chunk['title']}\n{chunk['text'][:max_chars]}" for _, chunk in results
+    )
@@ -1,7 +1,7 @@
 from rest_framework import serializers
-from django.contrib.auth import authenticate
 from django.contrib.auth.password_validation import validate_password
-from .models import User
+from django.db.models import Q
+from .models import User, filter_lower
 
 
 class UserSerializer(serializers.ModelSerializer):
@@ -32,7 +32,7 @@ class SignupSerializer(serializers.ModelSerializer):
 
     def validate_username(self, value):
         """Check if username already exists"""
-        if User.objects.filter(username__iexact=value).exists():
+        if filter_lower(User.objects, 'username', [value]).exists():
             raise serializers.ValidationError("A user with this username already exists.")
         if len(value) < 3:
             raise serializers.ValidationError("Username must be at least 3 characters long.")
@@ -40,7 +40,7 @@ class SignupSerializer(serializers.ModelSerializer):
 
     def validate_email(self, value):
         """Check if email already exists"""
-        if User.objects.filter(email__iexact=value).exists():
+        if filter_lower(User.objects, 'email', [value]).exists():
             raise serializers.ValidationError("A user with this email already exists.")
         return value.lower()
 
@@ -72,8 +72,25 @@ class SignupSerializer(serializers.ModelSerializer):
         return user
 
 
+def find_login_user(identifier: str):
+    """
+    The user an identifier (username or email, exact case) refers to, or None.
+    One indexed query for both; a username match wins over an email match.
+    """
+    if not identifier:
+        return None
+    candidates = list(User.objects.filter(Q(username=identifier) | Q(email=identifier))[:2])
+    user = next((u for u in candidates if u.username == identifier), None)
+    if user is None and candidates:
+        user = candidates[0]
+    return user
+
+
 class LoginSerializer(serializers.Serializer):
-    """Serializer for user login - CASE SENSITIVE"""
+    """
+    Serializer for user login - CASE SENSITIVE.
+    Pass context={'user': ...} when the caller already ran find_login_user().
+    """
     username = serializers.CharField(required=True)
     password = serializers.CharField(
         required=True,
@@ -87,17 +104,18 @@ class LoginSerializer(serializers.Serializer):
 
         if username and password:
             # STRICT CASE-SENSITIVE authentication
-            # Username and password must match exactly as registered
-            user = authenticate(username=username, password=password)
-
-            # If failed with username, try with email (also case-sensitive)
-            if not user:
-                try:
-                    # Case-sensitive email lookup (exact match only)
-                    user_obj = User.objects.get(email=username)
-                    user = authenticate(username=user_obj.username, password=password)
-                except User.DoesNotExist:
-                    pass
+            # Username or email must match exactly as registered,
+            # then exactly one hash verification.
+            if 'user' in self.context:
+                user = self.context['user']
+            else:
+                user = find_login_user(username)
+
+            if user is None:
+                # Run the hasher once anyway so unknown accounts take as long as wrong passwords
+                User().set_password(password)
+            elif not user.check_password(password):
+                user = None
 
             if not user:
                 raise serializers.ValidationError(
@@ -0,0 +1,34 @@
+"""
+Cache invalidation on writes.
+"""
+
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from . import caching
+from .models import User, LabSubmission, AssessmentResult, ExamSession, ProjectSubmission
+
+
+@receiver([post_save, post_delete], sender=User)
+def invalidate_user_cache(sender, instance, **kwargs):
+    caching.invalidate_user(instance.id)
+
+
+@receiver([post_save, post_delete], sender=LabSubmission)
+def invalidate_submissions_cache(sender, instance, **kwargs):
+    caching.invalidate_progress(caching.SUBMISSIONS, instance.user_id)
+
+
+@receiver([post_save, post_delete], sender=AssessmentResult)
+def invalidate_assessments_cache(sender, instance, **kwargs):
+    caching.invalidate_progress(caching.ASSESSMENTS, instance.user_id)
+
+
+@receiver([post_save, post_delete], sender=ProjectSubmission)
+def invalidate_projects_cache(sender, instance, **kwargs):
+    caching.invalidate_progress(caching.PROJECTS, instance.user_id)
+
+
+@receiver([post_save, post_delete], sender=ExamSession)
+def invalidate_exam_cache(sender, instance, **kwargs):
+    caching.invalidate_exam(instance.id, instance.user_id)
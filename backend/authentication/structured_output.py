@@ -0,0 +1,375 @@
+"""
+Typed response schemas and the validating parser for the JSON-producing
+AI calls (grading, exam generation, project evaluation).
+
+Each output is declared once with the field types below. The declaration
+gives both the types.Schema sent as response_schema, so Gemini decodes
+straight into that shape, and the validation of what comes back:
+
+- numbers are coerced and clamped to their range (or rejected with
+  clamp=False), lists are truncated to max_items;
+- a missing or unusable field gets its default and a FieldError;
+- list items that do not validate are dropped, each with a FieldError.
+
+Errors on required fields, including lists shorter than min_items, are
+worth a follow-up call: repair_request() builds a prompt and schema
+asking for just those fields (or just the missing list items), and
+merge() folds the answer into the valid rest of the output.
+"""
+
+import json
+import math
+import re
+from typing import NamedTuple
+
+import orjson
+from google.genai import types
+
+
+class FieldError(NamedTuple):
+    path: str
+    message: str
+    required: bool = False
+
+    def __str__(self):
+        return f"{self.path or 'response'}: {self.message}"
+
+
+def _path(path) -> str:
+    """
+    A field path as text ("questions[3].options"). Paths are passed down as
+    nested (parent, key) tuples and only formatted when there is an error.
+    """
+    if not path:
+        return ''
+    parent, key = path
+    parent = _path(parent)
+    if isinstance(key, int):
+        return f"{parent}[{key}]"
+    return f"{parent}.{key}" if parent else key
+
+
+class StructuredOutputError(ValueError):
+    """The response is not usable JSON, or required fields stayed invalid"""
+
+    def __init__(self, message: str, errors: list = ()):
+        super().__init__(message)
+        self.errors = list(errors)
+
+
+# ============================================
+# FIELD TYPES
+# ============================================
+
+class Field:
+    """Base field: subclasses implement schema() and clean()"""
+
+    def __init__(self, default=None, required: bool = False, description: str = None):
+        self.default = default
+        self.required = required
+        self.description = description
+
+    def default_value(self):
+        return self.default
+
+    def schema(self) -> types.Schema:
+        raise NotImplementedError
+
+    def clean(self, value, path: tuple, errors: list):
+        """The validated value; problems are appended to errors"""
+        raise NotImplementedError
+
+    def _invalid(self, path: tuple, message: str, errors: list):
+        errors.append(FieldError(_path(path), message, self.required))
+        return self.default_value()
+
+
+class Int(Field):
+    def __init__(self, minimum: int = None, maximum: int = None, default: int = 0, clamp: bool = True, **kwargs):
+        super().__init__(default, **kwargs)
+        self.minimum = minimum
+        self.maximum = maximum
+        self.clamp = clamp
+
+    def schema(self) -> types.Schema:
+        return types.Schema(type=types.Type.INTEGER, minimum=self.minimum, maximum=self.maximum,
+                            description=self.description)
+
+    def clean(self, value, path, errors):
+        if type(value) is int and self.minimum is not None and self.maximum is not None \
+                and self.minimum <= value <= self.maximum:
+            return value
+        if isinstance(value, bool):
+            return self._invalid(path, f"expected an integer, got {value!r}", errors)
+        if isinstance(value, str):
+            try:
+                value = float(value.strip().rstrip('%'))
+            except ValueError:
+                return self._invalid(path, f"expected an integer, got {value[:40]!r}", errors)
+        if isinstance(value, float):
+            if not math.isfinite(value):
+                return self._invalid(path, f"expected an integer, got {value!r}", errors)
+            value = round(value)
+        if not isinstance(value, int):
+            return self._invalid(path, f"expected an integer, got {type(value).__name__}", errors)
+
+        low = self.minimum if self.minimum is not None else value
+        high = self.maximum if self.maximum is not None else value
+        if low <= value <= high:
+            return value
+        if not self.clamp:
+            return self._invalid(path, f"{value} is out of range {self.minimum}..{self.maximum}", errors)
+        return min(max(value, low), high)
+
+
+class Bool(Field):
+    def __init__(self, default: bool = False, **kwargs):
+        super().__init__(default, **kwargs)
+
+    def schema(self) -> types.Schema:
+        return types.Schema(type=types.Type.BOOLEAN, description=self.description)
+
+    def clean(self, value, path, errors):
+        if isinstance(value, bool):
+            return value
+        if isinstance(value, str) and value.strip().lower() in ('true', 'false'):
+            return value.strip().lower() == 'true'
+        return self._invalid(path, f"expected a boolean, got {value!r:.40}", errors)
+
+
+class Str(Field):
+    def __init__(self, default: str = '', nullable: bool = False, max_length: int = None, **kwargs):
+        super().__init__(default, **kwargs)
+        self.nullable = nullable
+        self.max_length = max_length
+
+    def schema(self) -> types.Schema:
+        return types.Schema(type=types.Type.STRING, nullable=self.nullable or None,
+                            description=self.description)
+
+    def clean(self, value, path, errors):
+        if type(value) is str and not self.nullable:
+            return value[:self.max_length] if self.max_length else value
+        if value is None and self.nullable:
+            return None
+        if isinstance(value, (int, float)) and not isinstance(value, bool):
+            value = str(value)
+        if not isinstance(value, str):
+            return self._invalid(path, f"expected a string, got {type(value).__name__}", errors)
+        # "null" spelled out as text
+        if self.nullable and value.strip().lower() in ('', 'null', 'none'):
+            return None
+        return value[:self.max_length] if self.max_length else value
+
+
+class Enum(Str):
+    def __init__(self, values: tuple, default: str = None, **kwargs):
+        super().__init__(default if default is not None else values[0], **kwargs)
+        self.values = tuple(values)
+
+    def schema(self) -> types.Schema:
+        return types.Schema(type=types.Type.STRING, format='enum', enum=list(self.values),
+                            description=self.description)
+
+    def clean(self, value, path, errors):
+        if isinstance(value, str):
+            normalized = value.strip().lower().replace(' ', '_')
+            if normalized in self.values:
+                return normalized
+        return self._invalid(path, f"expected one of {', '.join(self.values)}, got {value!r:.40}", errors)
+
+
+class List(Field):
+    def __init__(self, item: Field, min_items: int = 0, max_items: int = None, **kwargs):
+        super().__init__(None, **kwargs)
+        self.item = item
+        self.min_items = min_items
+        self.max_items = max_items
+
+    def default_value(self):
+        return []
+
+    def schema(self) -> types.Schema:
+        return types.Schema(type=types.Type.ARRAY, items=self.item.schema(),
+                            min_items=self.min_items or None, max_items=self.max_items,
+                            description=self.description)
+
+    def clean(self, value, path, errors):
+        if not isinstance(value, list):
+            return self._invalid(path, f"expected a list, got {type(value).__name__}", errors)
+
+        items = []
+        keep_partial = isinstance(self.item, Object)
+        for i, raw in enumerate(value):
+            if self.max_items is not None and len(items) >= self.max_items:
+                break
+            mark = len(errors)
+            item = self.item.clean(raw, (path, i), errors)
+            if len(errors) > mark:
+                item_errors = errors[mark:]
+                # Objects keep their valid fields; anything else invalid is dropped
+                if not keep_partial or any(e.required for e in item_errors):
+                    del errors[mark:]
+                    reasons = '; '.join(str(e) for e in item_errors[:3])
+                    errors.append(FieldError(_path((path, i)), f"dropped ({reasons})"))
+                    continue
+            items.append(item)
+
+        if len(items) < self.min_items:
+            errors.append(FieldError(_path(path), f"expected at least {self.min_items} valid items, got {len(items)}",
+                                     self.required))
+        return items
+
+
+class Object(Field):
+    def __init__(self, fields: dict, **kwargs):
+        super().__init__(None, **kwargs)
+        self.fields = fields
+
+    def default_value(self):
+        return {name: field.default_value() for name, field in self.fields.items()}
+
+    def schema(self) -> types.Schema:
+        return types.Schema(
+            type=types.Type.OBJECT,
+            properties={name: field.schema() for name, field in self.fields.items()},
+            required=list(self.fields),
+            property_ordering=list(self.fields),
+            description=self.description,
+        )
+
+    def clean(self, value, path, errors):
+        if not isinstance(value, dict):
+            return self._invalid(path, f"expected an object, got {type(value).__name__}", errors)
+
+        result = {}
+        for name, field in self.fields.items():
+            if name in value:
+                result[name] = field.clean(value[name], (path, name), errors)
+            else:
+                errors.append(FieldError(_path((path, name)), "missing", field.required))
+                result[name] = field.default_value()
+        return result
+
+
+# ============================================
+# PARSING AND REPAIR
+# ============================================
+
+_decoder = json.JSONDecoder()
+
+
+def decode(text: str):
+    """
+    The JSON value of a response. Text around the object (a markdown fence,
+    a sentence) is skipped by decoding from the first '{', in linear time.
+    """
+    if not text:
+        raise StructuredOutputError("Empty response")
+    try:
+        return orjson.loads(text)
+    except orjson.JSONDecodeError:
+        pass
+
+    start = text.find('{')
+    if start < 0:
+        raise StructuredOutputError("No JSON object in response")
+    try:
+        value, _ = _decoder.raw_decode(text, start)
+    except json.JSONDecodeError as e:
+        raise StructuredOutputError(f"Malformed JSON in response: {e.msg} at char {e.pos}") from e
+    return value
+
+
+def parse(text: str, spec: Object) -> tuple:
+    """
+    Decode and validate a response against spec.
+
+    Returns:
+        Tuple of (validated dict, list of FieldError)
+
+    Raises:
+        StructuredOutputError: the response is not a JSON object
+    """
+    value = decode(text)
+    if not isinstance(value, dict):
+        raise StructuredOutputError(f"Expected a JSON object, got {type(value).__name__}")
+    errors = []
+    return spec.clean(value, (), errors), errors
+
+
+def _top(path: str) -> str:
+    return re.match(r'[^.\[]*', path).group()
+
+
+def invalid_required(errors: list) -> list:
+    return [e for e in errors if e.required]
+
+
+def repair_request(spec: Object, value: dict, errors: list):
+    """
+    The follow-up asking only for the required top-level fields that are
+    still invalid; a short list is asked only for its missing items.
+
+    Returns:
+        Tuple of (Object spec of the requested fields, prompt), or None
+        when nothing needs repair
+    """
+    names = []
+    for e in invalid_required(errors):
+        name = _top(e.path)
+        if name in spec.fields and name not in names:
+            names.append(name)
+    if not names:
+        return None
+
+    fields, asks = {}, []
+    for name in names:
+        field = spec.fields[name]
+        missing = field.min_items - len(value[name]) if isinstance(field, List) else 0
+        if missing > 0 and value[name]:
+            fields[name] = List(field.item, min_items=missing, max_items=missing, required=True)
+            asks.append(f'- "{name}": only {missing} NEW item(s), to be added to the valid ones already returned')
+        else:
+            fields[name] = field
+            asks.append(f'- "{name}"')
+
+    problems = '\n'.join(f"- {e}" for e in errors if _top(e.path) in fields)
+    prompt = f"""Some fields of your JSON response are invalid:
+{problems}
+
+Return a JSON object with ONLY these fields, corrected:
+{chr(10).join(asks)}"""
+    return Object(fields), prompt
+
+
+def merge(spec: Object, value: dict, errors: list, repair_spec: Object, text: str) -> tuple:
+    """
+    Fold the response to a repair_request() into the output.
+
+    Returns:
+        Tuple of (validated dict, list of FieldError); unchanged when the
+        repair response is unusable
+    """
+    try:
+        repaired, repair_errors = parse(text, repair_spec)
+    except StructuredOutputError as e:
+        print(f"Structured output repair error: {e}")
+        return value, errors
+
+    merged = dict(value)
+    remaining = [e for e in errors if _top(e.path) not in repair_spec.fields]
+    for name, field in repair_spec.fields.items():
+        original = spec.fields[name]
+        if field is original:
+            merged[name] = repaired[name]
+            remaining.extend(e for e in repair_errors if _top(e.path) == name)
+            continue
+        # Items to append to a short list
+        merged[name] = (value[name] + repaired[name])[:original.max_items]
+        if len(merged[name]) < original.min_items:
+            remaining.append(FieldError(
+                name, f"expected at least {original.min_items} valid items, got {len(merged[name])}",
+                original.required,
+            ))
+    return merged, remaining
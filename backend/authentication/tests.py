@@ -0,0 +1,113 @@
+from datetime import timedelta
+from io import StringIO
+from types import SimpleNamespace
+from unittest import mock
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from . import exam_autosave, llm_usage
+from .models import ExamSession, LLMUsage, User
+
+QUESTIONS = [
+    {'id': i, 'question': f'Q{i}', 'options': ['a', 'b', 'c', 'd'], 'correct_answer': 1}
+    for i in range(1, 5)
+]
+
+
+class ReapExamsTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='student', email='student@example.com', password='pw-123456')
+
+    def expired_session(self, **fields):
+        return ExamSession.objects.create(
+            user=self.user, difficulty='easy', questions=QUESTIONS, total_questions=len(QUESTIONS), duration_minutes=30,
+            expires_at=timezone.now() - timedelta(hours=1), **fields,
+        )
+
+    def reap(self):
+        call_command('reap_exams', stdout=StringIO())
+
+    def test_submits_saved_answers_and_deletes_empty_sessions(self):
+        answered = self.expired_session(student_answers={'1': 1, '2': 0})
+        empty = self.expired_session()
+
+        self.reap()
+
+        answered.refresh_from_db()
+        self.assertTrue(answered.is_completed)
+        self.assertTrue(answered.auto_submitted)
+        self.assertEqual(answered.correct_count, 1)
+        self.assertFalse(ExamSession.objects.filter(id=empty.id).exists())
+
+    @override_settings(EXAM_AUTOSAVE_FLUSH_SECONDS=60)
+    def test_grades_answers_still_buffered_in_the_cache(self):
+        exam = self.expired_session()
+        exam_autosave.buffer_answers(exam.id, {'1': 1}, ttl=3600)
+        # Within the flush interval: buffered only
+        exam_autosave.buffer_answers(exam.id, {'1': 1, '2': 1, '3': 1}, ttl=3600)
+
+        self.reap()
+
+        exam.refresh_from_db()
+        self.assertTrue(exam.is_completed)
+        self.assertEqual(exam.correct_count, 3)
+        self.assertIsNone(cache.get(exam_autosave.BUFFER_KEY.format(exam.id)))
+
+
+@mock.patch.object(llm_usage, '_ensure_writer')
+class LLMUsageCounterTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        llm_usage.flush()
+        self.user = User.objects.create_user(username='student', email='student@example.com', password='pw-123456')
+        self.subject = f'user:{self.user.id}'
+        self.key = llm_usage.DAILY_TOKENS_KEY.format(self.subject, llm_usage._today())
+        LLMUsage.objects.create(user=self.user, feature='chat', model='m', total_tokens=100)
+
+    def tearDown(self):
+        llm_usage.flush()
+
+    def record(self, tokens):
+        token = llm_usage._current.set((self.user.id, self.subject, 'free'))
+        try:
+            llm_usage.record('chat', 'm', SimpleNamespace(total_token_count=tokens), 0.1, True)
+        finally:
+            llm_usage._current.reset(token)
+
+    def test_record_without_a_counter_does_not_query_the_ledger(self, _ensure_writer):
+        with self.assertNumQueries(0):
+            self.record(40)
+            self.assertEqual(llm_usage._tokens_used_today(self.subject), 40)
+
+        llm_usage.flush()
+
+        self.assertEqual(cache.get(self.key), 140)
+        self.record(10)
+        self.assertEqual(llm_usage._tokens_used_today(self.subject), 150)
+
+
+class NumericParameterTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username='staff', email='staff@example.com', password='pw-123456', is_staff=True,
+        )
+        self.client.force_login(self.user)
+
+    def test_non_numeric_days_is_rejected(self):
+        response = self.client.get('/api/ai/usage/dashboard/', {'days': 'week'})
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json()['message'], 'Invalid days')
+
+    def test_non_numeric_duration_is_rejected(self):
+        response = self.client.post(
+            '/api/ai/exam/generate/', {'difficulty': 'easy', 'duration_minutes': 'long'},
+            content_type='application/json',
+        )
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json()['message'], 'Invalid duration_minutes')
@@ -0,0 +1,91 @@
+"""
+Cache-backed login throttling.
+
+Failed login attempts are counted per client IP and per account in fixed
+windows. Once a limit is reached, further attempts are rejected before any
+password hash is computed.
+
+The account counter is keyed on the user the identifier resolves to, so
+attempts by username and by email (in any spelling) count together;
+identifiers that match no user are counted as typed, lowercased. Counters
+rely on the atomic add()/incr() of the LocMem and Redis caches.
+"""
+
+import math
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+
+IP_KEY = 'login_failures:ip:{}'
+ACCOUNT_KEY = 'login_failures:account:{}'
+# Suffix of the key holding the time a window started
+STARTED = ':started'
+
+
+def _limits():
+    return settings.LOGIN_THROTTLE
+
+
+def client_ip(request) -> str:
+    return request.META.get('REMOTE_ADDR', '')
+
+
+def account_key(user, identifier: str) -> str:
+    """Account counter name: the resolved user id, else the identifier as typed"""
+    if user is not None:
+        return f'id:{user.pk}'
+    return f'name:{identifier.lower()}'
+
+
+def _count(key: str) -> int:
+    return cache.get(key, 0)
+
+
+def _increment(key: str, window: int):
+    # add() starts the window; incr() keeps the original expiry
+    if cache.add(key, 1, timeout=window):
+        cache.set(key + STARTED, time.time(), timeout=window)
+        return
+    try:
+        cache.incr(key)
+    except ValueError:
+        # Expired between add() and incr(): start a new window
+        cache.set(key, 1, timeout=window)
+        cache.set(key + STARTED, time.time(), timeout=window)
+
+
+def _remaining(key: str, window: int) -> int:
+    started = cache.get(key + STARTED)
+    if started is None:
+        return window
+    return max(1, math.ceil(started + window - time.time()))
+
+
+def retry_after(ip: str, account: str) -> int:
+    """
+    Seconds the client must wait before retrying, or 0 if not throttled.
+
+    Args:
+        ip: Client IP
+        account: Name from account_key()
+    """
+    limits = _limits()
+    key = IP_KEY.format(ip)
+    if _count(key) >= limits['ip_failures']:
+        return _remaining(key, limits['ip_window'])
+    key = ACCOUNT_KEY.format(account)
+    if _count(key) >= limits['account_failures']:
+        return _remaining(key, limits['account_window'])
+    return 0
+
+
+def record_failure(ip: str, account: str):
+    limits = _limits()
+    _increment(IP_KEY.format(ip), limits['ip_window'])
+    _increment(ACCOUNT_KEY.format(account), limits['account_window'])
+
+
+def reset_account(account: str):
+    key = ACCOUNT_KEY.format(account)
+    cache.delete_many([key, key + STARTED])
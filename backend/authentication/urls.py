@@ -13,6 +13,7 @@ urlpatterns = [
 # AI Grading URLs
 ai_urlpatterns = [
     path('grade/', views.ai_grade_submission, name='ai_grade'),
+    path('labs/', views.get_labs, name='labs'),
     path('submissions/', views.get_user_submissions, name='user_submissions'),
     path('submissions/<str:lab_id>/', views.get_submission_by_lab, name='submission_by_lab'),
     # Assessment URLs
@@ -21,11 +22,21 @@ ai_urlpatterns = [
     path('assessment/results/<int:assessment_id>/', views.get_assessment_result_by_id, name='assessment_result_by_id'),
     # OrcaAI Chat
     path('chat/', views.orca_chat, name='orca_chat'),
+    path('chat/conversations/', views.get_chat_conversations, name='chat_conversations'),
+    path('chat/conversations/<int:conversation_id>/messages/', views.get_chat_messages, name='chat_messages'),
     # Exam Mode
     path('exam/generate/', views.generate_exam, name='generate_exam'),
     path('exam/submit/', views.submit_exam, name='submit_exam'),
+    path('exam/autosave/', views.autosave_exam, name='autosave_exam'),
     path('exam/history/', views.get_exam_history, name='exam_history'),
     path('exam/<int:exam_id>/', views.get_exam_detail, name='exam_detail'),
     # Project Evaluation
     path('project/evaluate/', views.evaluate_project, name='evaluate_project'),
+    path('project/submissions/', views.get_project_submissions, name='project_submissions'),
+    path('project/submissions/<path:project_id>/', views.get_project_submission, name='project_submission'),
+    # LLM Usage
+    path('usage/', views.get_llm_usage, name='llm_usage'),
+    path('usage/dashboard/', views.llm_usage_dashboard, name='llm_usage_dashboard'),
+    # Batched dashboard reads
+    path('dashboard/', views.dashboard_view, name='dashboard'),
 ]
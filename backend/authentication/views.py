@@ -1,11 +1,26 @@
+import functools
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+import orjson
+from asgiref.sync import sync_to_async
+
 from rest_framework import status
 from rest_framework.decorators import api_view, permission_classes
-from rest_framework.permissions import AllowAny, IsAuthenticated
+from rest_framework.permissions import AllowAny, IsAdminUser, IsAuthenticated
 from rest_framework.response import Response
 from django.contrib.auth import login, logout
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.text import slugify
 from django.views.decorators.csrf import csrf_exempt
-from .serializers import SignupSerializer, LoginSerializer, UserSerializer
-from .models import User, LabSubmission, AssessmentResult, ExamSession
+from .serializers import SignupSerializer, LoginSerializer, UserSerializer, find_login_user
+from .models import (
+    User, LabSubmission, AssessmentResult, ExamSession, ProjectSubmission,
+    ChatConversation, ChatMessage,
+)
+from . import caching, exam_autosave, labs, llm_usage, project_upload, renderers, throttling
+from .idempotency import idempotent
 
 
 @csrf_exempt
@@ -69,11 +84,24 @@ def login_view(request):
         "password": "string"
     }
     """
-    serializer = LoginSerializer(data=request.data)
+    ip = throttling.client_ip(request)
+    username = str(request.data.get('username', '')).strip()
+    account = find_login_user(username)
+    throttle_key = throttling.account_key(account, username)
+
+    wait = throttling.retry_after(ip, throttle_key)
+    if wait:
+        return Response({
+            'success': False,
+            'message': 'Too many failed login attempts. Please try again later.',
+        }, status=status.HTTP_429_TOO_MANY_REQUESTS, headers={'Retry-After': str(wait)})
+
+    serializer = LoginSerializer(data=request.data, context={'user': account})
 
     if serializer.is_valid():
         user = serializer.validated_data['user']
         login(request, user)
+        throttling.reset_account(throttle_key)
 
         return Response({
             'success': True,
@@ -81,6 +109,8 @@ def login_view(request):
             'user': UserSerializer(user).data
         }, status=status.HTTP_200_OK)
 
+    throttling.record_failure(ip, throttle_key)
+
     # Format error messages
     errors = serializer.errors
     error_message = 'Invalid credentials. Please try again.'
@@ -127,7 +157,7 @@ def user_profile_view(request):
     """
     return Response({
         'success': True,
-        'user': UserSerializer(request.user).data
+        'user': caching.get_user_data(request.user)
     }, status=status.HTTP_200_OK)
 
 
@@ -142,7 +172,7 @@ def check_auth_view(request):
     if request.user.is_authenticated:
         return Response({
             'authenticated': True,
-            'user': UserSerializer(request.user).data
+            'user': caching.get_user_data(request.user)
         }, status=status.HTTP_200_OK)
 
     return Response({
@@ -165,23 +195,109 @@ def health_check(request):
     }, status=status.HTTP_200_OK)
 
 
-@csrf_exempt
-@api_view(['POST'])
-@permission_classes([AllowAny])
-def ai_grade_submission(request):
+def quota_exceeded_response():
+    """429 returned by AI endpoints once the daily token quota is used up"""
+    return Response({
+        'success': False,
+        'message': 'Daily AI usage limit reached. Please try again tomorrow.',
+    }, status=status.HTTP_429_TOO_MANY_REQUESTS)
+
+
+def content_length(request) -> int:
+    """CONTENT_LENGTH as an int; 0 when missing or malformed"""
+    try:
+        return int(request.META.get('CONTENT_LENGTH') or 0)
+    except ValueError:
+        return 0
+
+
+def async_api_view(methods, login_required=False, max_upload_bytes=None):
+    """
+    Decorator for the native async AI endpoints.
+
+    DRF's @api_view and Django 4.2's @csrf_exempt only wrap sync views, so
+    this covers what they did for those endpoints: method check, CSRF
+    exemption, JSON body as request.data (request.POST for multipart uploads),
+    loading request.user off the event loop (403 when login_required and
+    anonymous, like IsAuthenticated), and rendering the returned Response
+    with the content-negotiated renderer (renderers.negotiate/finalize).
+    Multipart requests whose Content-Length exceeds max_upload_bytes get a
+    413 before the upload is parsed.
+
+    Under ASGI an awaiting view holds no worker thread while Gemini answers.
+    """
+    def decorator(view):
+        @functools.wraps(view)
+        async def wrapper(request, *args, **kwargs):
+            renderers.negotiate(request)
+            return renderers.finalize(request, await handle(request, *args, **kwargs))
+
+        async def handle(request, *args, **kwargs):
+            if request.method not in methods:
+                return Response({
+                    'detail': f'Method "{request.method}" not allowed.'
+                }, status=status.HTTP_405_METHOD_NOT_ALLOWED)
+
+            is_authenticated = await sync_to_async(lambda: request.user.is_authenticated)()
+            if login_required and not is_authenticated:
+                return Response({
+                    'detail': 'Authentication credentials were not provided.'
+                }, status=status.HTTP_403_FORBIDDEN)
+
+            if request.content_type == 'multipart/form-data':
+                if max_upload_bytes is not None and content_length(request) > max_upload_bytes:
+                    return Response({
+                        'success': False,
+                        'message': f'Upload is larger than {max_upload_bytes // (1024 * 1024)} MB',
+                    }, status=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE)
+                # Parsing spools large files to disk; keep it off the event loop
+                await sync_to_async(lambda: request.FILES)()
+                request.data = request.POST
+            else:
+                try:
+                    request.data = orjson.loads(request.body or b'{}')
+                except ValueError:
+                    return Response({'detail': 'JSON parse error'}, status=status.HTTP_400_BAD_REQUEST)
+
+            return await view(request, *args, **kwargs)
+
+        wrapper.csrf_exempt = True
+        return wrapper
+    return decorator
+
+
+def metrics_view(request):
+    """
+    Prometheus metrics for all API routes (plain Django view, text format).
+    Restricted to METRICS_ALLOWED_IPS when that list is non-empty.
+
+    GET /api/metrics
+    """
+    from django.conf import settings
+    from django.http import HttpResponse, HttpResponseForbidden
+    from .metrics import registry
+
+    allowed = settings.METRICS_ALLOWED_IPS
+    if allowed and request.META.get('REMOTE_ADDR') not in allowed:
+        return HttpResponseForbidden('Forbidden')
+
+    return HttpResponse(registry.render(), content_type='text/plain; version=0.0.4; charset=utf-8')
+
+
+@async_api_view(['POST'])
+@idempotent
+async def ai_grade_submission(request):
     """
     AI-powered code grading endpoint.
     Saves results to database if user is authenticated.
+    Retries with the same Idempotency-Key header replay the first response.
+
+    The lab's title, description and requirements come from the server-side
+    catalog (labs.py); a lab_info sent by older clients is ignored.
 
     POST /api/ai/grade/
     {
-        "lab_id": "string",  // Required for saving
-        "lab_info": {
-            "title": "string",
-            "category": "string",
-            "description": "string",
-            "requirements": ["string"]
-        },
+        "lab_id": "string",  // e.g. "lab_3", see GET /api/ai/labs/
         "code_content": "string",
         "file_name": "string",  // Optional
         "cells_info": [  // Optional, for notebooks
@@ -196,43 +312,57 @@ def ai_grade_submission(request):
     """
     try:
         # Import the grading function
-        from .ai_grading import grade_submission
+        from .ai_grading import agrade_submission
 
         # Extract data from request
         data = request.data
         lab_id = data.get('lab_id', '')
-        lab_info = data.get('lab_info', {})
         code_content = data.get('code_content', '')
         file_name = data.get('file_name', '')
         cells_info = data.get('cells_info', None)
 
         # Validate required fields
-        if not lab_info:
+        if not lab_id:
             return Response({
                 'success': False,
-                'message': 'Lab information is required'
+                'message': 'Lab ID is required'
             }, status=status.HTTP_400_BAD_REQUEST)
 
+        lab = await labs.aget_lab(lab_id)
+        if lab is None:
+            return Response({
+                'success': False,
+                'message': 'Unknown lab'
+            }, status=status.HTTP_404_NOT_FOUND)
+
         if not code_content:
             return Response({
                 'success': False,
                 'message': 'Code content is required'
             }, status=status.HTTP_400_BAD_REQUEST)
 
-        # Perform AI grading
-        result = grade_submission(lab_info, code_content, cells_info)
+        if await sync_to_async(llm_usage.quota_exceeded)(request):
+            return quota_exceeded_response()
 
-        # Save to database if user is authenticated and lab_id provided
+        # Perform AI grading (identical resubmissions of the same lab version
+        # reuse the cached result)
+        with llm_usage.attribute_to(request):
+            result = await caching.aget_or_call_llm(
+                'grade', (lab.lab_id, lab.version, code_content, cells_info),
+                lambda: agrade_submission(lab.info, code_content, cells_info, header=lab.prompt_header),
+            )
+
+        # Save to database if user is authenticated
         saved_to_db = False
-        if request.user.is_authenticated and lab_id:
+        if request.user.is_authenticated:
             try:
                 # Update or create submission (replaces on resubmit)
-                submission, created = LabSubmission.objects.update_or_create(
+                submission, created = await LabSubmission.objects.aupdate_or_create(
                     user=request.user,
                     lab_id=lab_id,
                     defaults={
-                        'lab_title': lab_info.get('title', ''),
-                        'lab_category': lab_info.get('category', ''),
+                        'lab_title': lab.title,
+                        'lab_category': lab.category,
                         'overall_score': result.get('overall_score', 0),
                         'code_quality': result.get('code_quality', 0),
                         'accuracy': result.get('accuracy', 0),
@@ -270,14 +400,22 @@ def ai_grade_submission(request):
 
 
 @api_view(['GET'])
-@permission_classes([IsAuthenticated])
-def get_user_submissions(request):
+@permission_classes([AllowAny])
+def get_labs(request):
     """
-    Get all lab submissions for the authenticated user.
+    The lab catalog the grader uses.
 
-    GET /api/ai/submissions/
+    GET /api/ai/labs/
     """
-    submissions = LabSubmission.objects.filter(user=request.user)
+    return Response({
+        'success': True,
+        'labs': [lab.to_dict() for lab in labs.all_labs()]
+    }, status=status.HTTP_200_OK)
+
+
+def submissions_data(user_id):
+    """Lab submissions list for one user (cached as caching.SUBMISSIONS)"""
+    submissions = LabSubmission.objects.filter(user_id=user_id)
     data = []
     for sub in submissions:
         data.append({
@@ -293,6 +431,19 @@ def get_user_submissions(request):
             'submitted_at': sub.submitted_at.isoformat(),
             'grading_result': sub.grading_result,
         })
+    return data
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def get_user_submissions(request):
+    """
+    Get all lab submissions for the authenticated user.
+
+    GET /api/ai/submissions/
+    """
+    user_id = request.user.id
+    data = caching.get_progress(caching.SUBMISSIONS, user_id, lambda: submissions_data(user_id))
 
     return Response({
         'success': True,
@@ -412,6 +563,24 @@ def submit_assessment(request):
         }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 
+def assessment_results_data(user_id):
+    """Assessment results list for one user (cached as caching.ASSESSMENTS)"""
+    results = AssessmentResult.objects.filter(user_id=user_id)
+    data = []
+    for result in results:
+        data.append({
+            'assessment_id': result.assessment_id,
+            'assessment_title': result.assessment_title,
+            'score': result.score,
+            'total_questions': result.total_questions,
+            'correct_answers': result.correct_answers,
+            'passing_score': result.passing_score,
+            'passed': result.passed,
+            'completed_at': result.completed_at.isoformat(),
+        })
+    return data
+
+
 @api_view(['GET'])
 @permission_classes([AllowAny])
 def get_assessment_results(request):
@@ -426,19 +595,8 @@ def get_assessment_results(request):
             'results': []
         }, status=status.HTTP_200_OK)
 
-    results = AssessmentResult.objects.filter(user=request.user)
-    data = []
-    for result in results:
-        data.append({
-            'assessment_id': result.assessment_id,
-            'assessment_title': result.assessment_title,
-            'score': result.score,
-            'total_questions': result.total_questions,
-            'correct_answers': result.correct_answers,
-            'passing_score': result.passing_score,
-            'passed': result.passed,
-            'completed_at': result.completed_at.isoformat(),
-        })
+    user_id = request.user.id
+    data = caching.get_progress(caching.ASSESSMENTS, user_id, lambda: assessment_results_data(user_id))
 
     return Response({
         'success': True,
@@ -481,28 +639,69 @@ def get_assessment_result_by_id(request, assessment_id):
 # ORCA AI CHATBOT ENDPOINT
 # ============================================
 
-@csrf_exempt
-@api_view(['POST'])
-@permission_classes([AllowAny])
-def orca_chat(request):
+# Messages sent to the model as context (as build_chat_request trims to)
+CHAT_CONTEXT_MESSAGES = 10
+CHAT_PAGE_SIZE = 30
+CHAT_MAX_PAGE_SIZE = 100
+CONVERSATION_PAGE_SIZE = 20
+CONVERSATION_MAX_PAGE_SIZE = 50
+
+
+def recent_chat_messages(conversation_id, limit=CHAT_CONTEXT_MESSAGES):
+    """Last `limit` messages of a conversation as model history, oldest first"""
+    rows = (ChatMessage.objects.filter(conversation_id=conversation_id)
+            .order_by('-id').values('role', 'content')[:limit])
+    return list(reversed(rows))
+
+
+@transaction.atomic
+def save_chat_exchange(user, conversation_id, user_message, reply):
+    """
+    Append a user message and OrcaAI's reply, creating the conversation on
+    the first exchange. Both messages are written in one transaction.
+
+    Returns:
+        The conversation id
+    """
+    if conversation_id is None:
+        conversation = ChatConversation.objects.create(user=user, title=user_message[:120])
+        conversation_id = conversation.id
+    else:
+        # Bump updated_at so the conversation moves to the top of the list
+        ChatConversation.objects.filter(id=conversation_id).update(updated_at=timezone.now())
+
+    ChatMessage.objects.bulk_create([
+        ChatMessage(conversation_id=conversation_id, role='user', content=user_message),
+        ChatMessage(conversation_id=conversation_id, role='assistant', content=reply),
+    ])
+    return conversation_id
+
+
+@async_api_view(['POST'])
+async def orca_chat(request):
     """
     OrcaAI chatbot endpoint.
+    For authenticated users the exchange is saved to a ChatConversation and
+    the history is read from it; `history` is only used by anonymous users
+    and for the first message of a new conversation.
 
     POST /api/ai/chat/
     {
         "message": "string",
-        "history": [
+        "conversation_id": number,  // Optional, omit to start a conversation
+        "history": [  // Optional
             {"role": "user", "content": "..."},
             {"role": "assistant", "content": "..."}
         ]
     }
     """
     try:
-        from .ai_grading import chat_with_orca
+        from .ai_grading import achat_with_orca
 
         data = request.data
         user_message = data.get('message', '')
         history = data.get('history', [])
+        conversation_id = data.get('conversation_id')
 
         if not user_message.strip():
             return Response({
@@ -511,14 +710,44 @@ def orca_chat(request):
                 'response': None
             }, status=status.HTTP_400_BAD_REQUEST)
 
+        persist = request.user.is_authenticated
+        if persist and conversation_id is not None:
+            try:
+                conversation_id = int(conversation_id)
+            except (TypeError, ValueError):
+                return Response({
+                    'success': False,
+                    'message': 'Invalid conversation_id',
+                    'response': None
+                }, status=status.HTTP_400_BAD_REQUEST)
+            exists = await ChatConversation.objects.filter(
+                id=conversation_id, user=request.user
+            ).aexists()
+            if not exists:
+                return Response({
+                    'success': False,
+                    'message': 'Conversation not found',
+                    'response': None
+                }, status=status.HTTP_404_NOT_FOUND)
+            history = await sync_to_async(recent_chat_messages)(conversation_id)
+
+        if await sync_to_async(llm_usage.quota_exceeded)(request):
+            return quota_exceeded_response()
+
         # Call OrcaAI
-        result = chat_with_orca(history, user_message)
+        with llm_usage.attribute_to(request):
+            result = await achat_with_orca(history, user_message)
 
         if result.get('success'):
+            if persist:
+                conversation_id = await sync_to_async(save_chat_exchange)(
+                    request.user, conversation_id, user_message, result.get('response', '')
+                )
             return Response({
                 'success': True,
                 'message': 'Response generated',
-                'response': result.get('response', '')
+                'response': result.get('response', ''),
+                'conversation_id': conversation_id if persist else None,
             }, status=status.HTTP_200_OK)
         else:
             return Response({
@@ -535,16 +764,128 @@ def orca_chat(request):
         }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 
+_CURSOR_EPOCH = datetime(1970, 1, 1, tzinfo=dt_timezone.utc)
+
+
+def _conversation_cursor(conversation):
+    """Opaque, URL-safe keyset cursor: "<updated_at in microseconds>_<id>" """
+    micros = (conversation.updated_at - _CURSOR_EPOCH) // timedelta(microseconds=1)
+    return f'{micros}_{conversation.id}'
+
+
+def _page_size(request, default, maximum):
+    try:
+        return min(max(int(request.query_params.get('limit', default)), 1), maximum)
+    except ValueError:
+        return default
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def get_chat_conversations(request):
+    """
+    OrcaAI conversations of the authenticated user, most recently active
+    first. Keyset-paginated: pass the returned next_cursor as `before` to
+    get the next page.
+
+    GET /api/ai/chat/conversations/?limit=20&before=<cursor>
+    """
+    limit = _page_size(request, CONVERSATION_PAGE_SIZE, CONVERSATION_MAX_PAGE_SIZE)
+    conversations = ChatConversation.objects.filter(user=request.user)
+
+    before = request.query_params.get('before')
+    if before:
+        try:
+            micros, last_id = (int(part) for part in before.split('_'))
+            updated_at = _CURSOR_EPOCH + timedelta(microseconds=micros)
+        except (ValueError, OverflowError):
+            return Response({
+                'success': False,
+                'message': 'Invalid cursor'
+            }, status=status.HTTP_400_BAD_REQUEST)
+        conversations = conversations.filter(
+            Q(updated_at__lt=updated_at) | Q(updated_at=updated_at, id__lt=last_id)
+        )
+
+    page = list(conversations.order_by('-updated_at', '-id')[:limit + 1])
+    has_more = len(page) > limit
+    page = page[:limit]
+
+    return Response({
+        'success': True,
+        'conversations': [{
+            'id': conv.id,
+            'title': conv.title,
+            'created_at': conv.created_at.isoformat(),
+            'updated_at': conv.updated_at.isoformat(),
+        } for conv in page],
+        'next_cursor': _conversation_cursor(page[-1]) if has_more else None,
+    }, status=status.HTTP_200_OK)
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def get_chat_messages(request, conversation_id):
+    """
+    Messages of one conversation, oldest first within the page. Without
+    `before` this is the latest page; to load older messages on scroll, pass
+    the id of the oldest message loaded so far (next_before).
+
+    GET /api/ai/chat/conversations/<conversation_id>/messages/?limit=30&before=<message id>
+    """
+    conversation = ChatConversation.objects.filter(id=conversation_id, user=request.user).first()
+    if conversation is None:
+        return Response({
+            'success': False,
+            'message': 'Conversation not found',
+            'messages': []
+        }, status=status.HTTP_404_NOT_FOUND)
+
+    limit = _page_size(request, CHAT_PAGE_SIZE, CHAT_MAX_PAGE_SIZE)
+    messages = ChatMessage.objects.filter(conversation_id=conversation.id)
+
+    before = request.query_params.get('before')
+    if before:
+        try:
+            messages = messages.filter(id__lt=int(before))
+        except ValueError:
+            return Response({
+                'success': False,
+                'message': 'Invalid cursor'
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+    # Newest first on the (conversation, id) index, then flipped for display
+    page = list(messages.order_by('-id').values('id', 'role', 'content', 'created_at')[:limit + 1])
+    has_more = len(page) > limit
+    page = page[:limit][::-1]
+
+    return Response({
+        'success': True,
+        'conversation': {
+            'id': conversation.id,
+            'title': conversation.title,
+            'updated_at': conversation.updated_at.isoformat(),
+        },
+        'messages': [{
+            'id': msg['id'],
+            'role': msg['role'],
+            'content': msg['content'],
+            'created_at': msg['created_at'].isoformat(),
+        } for msg in page],
+        'next_before': page[0]['id'] if has_more else None,
+    }, status=status.HTTP_200_OK)
+
+
 # ============================================
 # EXAM MODE ENDPOINTS
 # ============================================
 
-@csrf_exempt
-@api_view(['POST'])
-@permission_classes([IsAuthenticated])
-def generate_exam(request):
+@async_api_view(['POST'], login_required=True)
+@idempotent
+async def generate_exam(request):
     """
     Generate AI exam questions and create an exam session.
+    Retries with the same Idempotency-Key header return the same session.
 
     POST /api/ai/exam/generate/
     {
@@ -553,11 +894,17 @@ def generate_exam(request):
     }
     """
     try:
-        from .ai_grading import generate_exam_questions
+        from .ai_grading import agenerate_exam_questions
 
         data = request.data
         difficulty = data.get('difficulty', 'medium')
-        duration_minutes = int(data.get('duration_minutes', 30))
+        try:
+            duration_minutes = min(max(int(data.get('duration_minutes', 30)), 5), 180)
+        except (TypeError, ValueError):
+            return Response({
+                'success': False,
+                'message': 'Invalid duration_minutes'
+            }, status=status.HTTP_400_BAD_REQUEST)
 
         if difficulty not in ('easy', 'medium', 'hard'):
             return Response({
@@ -568,7 +915,11 @@ def generate_exam(request):
         question_counts = {'easy': 10, 'medium': 15, 'hard': 20}
         num_questions = question_counts.get(difficulty, 15)
 
-        result = generate_exam_questions(difficulty, num_questions)
+        if await sync_to_async(llm_usage.quota_exceeded)(request):
+            return quota_exceeded_response()
+
+        with llm_usage.attribute_to(request):
+            result = await agenerate_exam_questions(difficulty, num_questions)
 
         if not result.get('success') or not result.get('questions'):
             return Response({
@@ -578,12 +929,13 @@ def generate_exam(request):
 
         questions = result['questions']
 
-        exam = ExamSession.objects.create(
+        exam = await ExamSession.objects.acreate(
             user=request.user,
             difficulty=difficulty,
             duration_minutes=duration_minutes,
             total_questions=len(questions),
             questions=questions,
+            expires_at=timezone.now() + timedelta(minutes=duration_minutes),
         )
 
         # Return questions WITHOUT correct answers or explanations
@@ -603,6 +955,7 @@ def generate_exam(request):
             'total_questions': len(safe_questions),
             'difficulty': difficulty,
             'duration_minutes': duration_minutes,
+            'expires_at': exam.expires_at.isoformat(),
         }, status=status.HTTP_201_CREATED)
 
     except Exception as e:
@@ -626,8 +979,7 @@ def submit_exam(request):
     }
     """
     try:
-        from .ai_grading import grade_exam
-        from django.utils import timezone
+        from .ai_grading import expand_exam_results
 
         data = request.data
         exam_id = data.get('exam_id')
@@ -653,15 +1005,21 @@ def submit_exam(request):
                 'message': 'This exam has already been submitted'
             }, status=status.HTTP_400_BAD_REQUEST)
 
-        grading = grade_exam(exam.questions, answers)
+        if exam.is_expired():
+            # Late submission: close the exam with the answers saved before the deadline
+            exam.complete(exam_autosave.saved_answers(exam), auto_submitted=True)
+            exam_autosave.discard(exam.id)
+            return Response({
+                'success': False,
+                'message': 'Time limit exceeded. The exam was closed with your saved answers.',
+                'score': exam.score,
+                'correct_count': exam.correct_count,
+                'total_questions': exam.total_questions,
+                'results': expand_exam_results(exam.questions, exam.results),
+            }, status=status.HTTP_400_BAD_REQUEST)
 
-        exam.student_answers = answers
-        exam.results = grading.get('results', [])
-        exam.score = grading.get('score', 0)
-        exam.correct_count = grading.get('correct_count', 0)
-        exam.is_completed = True
-        exam.completed_at = timezone.now()
-        exam.save()
+        grading = exam.complete(answers)
+        exam_autosave.discard(exam.id)
 
         return Response({
             'success': True,
@@ -669,7 +1027,7 @@ def submit_exam(request):
             'score': grading['score'],
             'correct_count': grading['correct_count'],
             'total_questions': grading['total_questions'],
-            'results': grading['results'],
+            'results': expand_exam_results(exam.questions, grading['results']),
         }, status=status.HTTP_200_OK)
 
     except Exception as e:
@@ -679,15 +1037,71 @@ def submit_exam(request):
         }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 
-@api_view(['GET'])
+@csrf_exempt
+@api_view(['POST'])
 @permission_classes([IsAuthenticated])
-def get_exam_history(request):
+def autosave_exam(request):
     """
-    Get all completed exam sessions for the authenticated user.
+    Autosave in-progress exam answers. Writes are buffered in the cache and
+    flushed to the database at most every EXAM_AUTOSAVE_FLUSH_SECONDS.
 
-    GET /api/ai/exam/history/
+    POST /api/ai/exam/autosave/
+    {
+        "exam_id": number,
+        "answers": {"1": 2, "2": 0, ...}  // Full current answer map
+    }
     """
-    exams = ExamSession.objects.filter(user=request.user, is_completed=True)
+    exam_id = request.data.get('exam_id')
+    answers = request.data.get('answers', {})
+
+    if not exam_id or not isinstance(answers, dict):
+        return Response({
+            'success': False,
+            'message': 'Exam ID and answers are required'
+        }, status=status.HTTP_400_BAD_REQUEST)
+
+    try:
+        exam_id = int(exam_id)
+    except (TypeError, ValueError):
+        return Response({
+            'success': False,
+            'message': 'Exam ID must be a number'
+        }, status=status.HTTP_400_BAD_REQUEST)
+
+    meta = exam_autosave.get_session_meta(exam_id)
+    if meta is None or meta['user_id'] != request.user.id:
+        return Response({
+            'success': False,
+            'message': 'Exam session not found'
+        }, status=status.HTTP_404_NOT_FOUND)
+
+    now = timezone.now()
+    if meta['expires_at'] and now > meta['expires_at'] + timedelta(seconds=ExamSession.SUBMIT_GRACE_SECONDS):
+        return Response({
+            'success': False,
+            'message': 'Time limit exceeded'
+        }, status=status.HTTP_400_BAD_REQUEST)
+
+    ttl = int((meta['expires_at'] - now).total_seconds()) + 3600 if meta['expires_at'] else 3600
+    if not exam_autosave.buffer_answers(exam_id, exam_autosave.clean_answers(answers, meta['question_ids']), ttl):
+        # Submitted meanwhile
+        exam_autosave.discard(exam_id)
+        return Response({
+            'success': False,
+            'message': 'This exam has already been submitted'
+        }, status=status.HTTP_400_BAD_REQUEST)
+
+    return Response({
+        'success': True,
+    }, status=status.HTTP_200_OK)
+
+
+def exam_history_data(user_id):
+    """Completed exams list for one user (cached as caching.EXAMS)"""
+    # Served by the partial history index; skip the large JSON columns
+    exams = ExamSession.objects.filter(user_id=user_id, is_completed=True).defer(
+        'questions', 'student_answers', 'results',
+    )
     data = []
     for exam in exams:
         data.append({
@@ -697,9 +1111,23 @@ def get_exam_history(request):
             'total_questions': exam.total_questions,
             'score': exam.score,
             'correct_count': exam.correct_count,
+            'auto_submitted': exam.auto_submitted,
             'created_at': exam.created_at.isoformat(),
             'completed_at': exam.completed_at.isoformat() if exam.completed_at else None,
         })
+    return data
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def get_exam_history(request):
+    """
+    Get all completed exam sessions for the authenticated user.
+
+    GET /api/ai/exam/history/
+    """
+    user_id = request.user.id
+    data = caching.get_progress(caching.EXAMS, user_id, lambda: exam_history_data(user_id))
 
     return Response({
         'success': True,
@@ -715,25 +1143,46 @@ def get_exam_detail(request, exam_id):
 
     GET /api/ai/exam/<exam_id>/
     """
+    from .ai_grading import expand_exam_results
+
+    def serialize(exam):
+        return {
+            'id': exam.id,
+            'difficulty': exam.difficulty,
+            'duration_minutes': exam.duration_minutes,
+            'total_questions': exam.total_questions,
+            'score': exam.score,
+            'correct_count': exam.correct_count,
+            'questions': exam.questions,
+            'student_answers': exam.student_answers if exam.is_completed else exam_autosave.saved_answers(exam),
+            'results': expand_exam_results(exam.questions, exam.results),
+            'is_completed': exam.is_completed,
+            'auto_submitted': exam.auto_submitted,
+            'created_at': exam.created_at.isoformat(),
+            'expires_at': exam.expires_at.isoformat() if exam.expires_at else None,
+            'completed_at': exam.completed_at.isoformat() if exam.completed_at else None,
+        }
+
+    def build():
+        # Only completed exams are immutable enough to cache
+        exam = ExamSession.objects.filter(id=exam_id).first()
+        if exam is None:
+            return {'user_id': None, 'exam': None}
+        return {'user_id': exam.user_id, 'exam': serialize(exam) if exam.is_completed else None}
+
+    cached = caching.get_exam_detail(exam_id, build)
+    if cached['user_id'] == request.user.id and cached['exam'] is not None:
+        return Response({
+            'success': True,
+            'exam': cached['exam']
+        }, status=status.HTTP_200_OK)
+
     try:
         exam = ExamSession.objects.get(id=exam_id, user=request.user)
 
         return Response({
             'success': True,
-            'exam': {
-                'id': exam.id,
-                'difficulty': exam.difficulty,
-                'duration_minutes': exam.duration_minutes,
-                'total_questions': exam.total_questions,
-                'score': exam.score,
-                'correct_count': exam.correct_count,
-                'questions': exam.questions,
-                'student_answers': exam.student_answers,
-                'results': exam.results,
-                'is_completed': exam.is_completed,
-                'created_at': exam.created_at.isoformat(),
-                'completed_at': exam.completed_at.isoformat() if exam.completed_at else None,
-            }
+            'exam': serialize(exam)
         }, status=status.HTTP_200_OK)
     except ExamSession.DoesNotExist:
         return Response({
@@ -742,37 +1191,394 @@ def get_exam_detail(request, exam_id):
         }, status=status.HTTP_404_NOT_FOUND)
 
 
+# ============================================
+# DASHBOARD (BATCHED READS)
+# ============================================
+
+# Resources the dashboard endpoint can return:
+#   name -> (progress cache kind, list builder, key of the list in its standalone response,
+#            whether the standalone endpoint answers anonymous users with an empty list)
+DASHBOARD_RESOURCES = {
+    'submissions': (caching.SUBMISSIONS, submissions_data, 'submissions', False),
+    'assessment_results': (caching.ASSESSMENTS, assessment_results_data, 'results', True),
+    'exam_history': (caching.EXAMS, exam_history_data, 'exams', False),
+}
+
+
+@api_view(['GET'])
+@permission_classes([AllowAny])
+def dashboard_view(request):
+    """
+    Batch the reads the frontend makes on load into one request.
+
+    Each resource comes back with the same body as its standalone endpoint
+    (/auth/check/, /ai/submissions/, /ai/assessment/results/,
+    /ai/exam/history/). The session is resolved once, all progress lists
+    are fetched in one cache round trip, and only cache misses hit the
+    database (one query per list).
+
+    GET /api/ai/dashboard/?include=auth,submissions,assessment_results,exam_history
+    (include defaults to all resources)
+    """
+    names = [name.strip() for name in request.query_params.get('include', '').split(',') if name.strip()]
+    names = names or ['auth', *DASHBOARD_RESOURCES]
+
+    unknown = [name for name in names if name != 'auth' and name not in DASHBOARD_RESOURCES]
+    if unknown:
+        return Response({
+            'success': False,
+            'message': f"Unknown resources: {', '.join(unknown)}",
+        }, status=status.HTTP_400_BAD_REQUEST)
+
+    user = request.user
+    results = {}
+
+    if 'auth' in names:
+        results['auth'] = {
+            'authenticated': user.is_authenticated,
+            'user': caching.get_user_data(user) if user.is_authenticated else None,
+        }
+
+    wanted = [name for name in names if name in DASHBOARD_RESOURCES]
+    if wanted and user.is_authenticated:
+        builders = {}
+        for name in wanted:
+            kind, build, _, _ = DASHBOARD_RESOURCES[name]
+            builders[kind] = functools.partial(build, user.id)
+        lists = caching.get_progress_many(user.id, builders)
+
+        for name in wanted:
+            kind, _, key, _ = DASHBOARD_RESOURCES[name]
+            results[name] = {'success': True, key: lists[kind]}
+    else:
+        for name in wanted:
+            _, _, key, public = DASHBOARD_RESOURCES[name]
+            if public:
+                results[name] = {'success': True, key: []}
+            else:
+                results[name] = {'success': False, 'message': 'Authentication required'}
+
+    return Response({
+        'success': True,
+        'results': results,
+    }, status=status.HTTP_200_OK)
+
+
 # ============================================
 # PROJECT EVALUATION
 # ============================================
 
-@csrf_exempt
-@api_view(['POST'])
-@permission_classes([IsAuthenticated])
-def evaluate_project(request):
+@async_api_view(['POST'], login_required=True, max_upload_bytes=project_upload.MAX_REQUEST_BYTES)
+@idempotent
+async def evaluate_project(request):
     """
-    Evaluate project files using AI.
+    Evaluate project files using AI and save the evaluation.
+    Retries with the same Idempotency-Key header replay the first response.
+
+    Files unchanged since the user's previous evaluation of the same project
+    reuse their stored reviews; if nothing changed, the stored evaluation is
+    returned without calling the LLM.
 
     POST /api/ai/project/evaluate/
     {
+        "project_id": "string",  // Optional, defaults to the slugified project title
         "project_info": {"title": "", "description": "", "tech_stack": [], "steps": []},
-        "files_content": [{"file_name": "", "content": ""}]
+        "files_content": [{"file_name": "", "content": ""}]  // file_name: path within the project
     }
+
+    or multipart/form-data with fields project_id, project_info (JSON string)
+    and file (a zip of the project; only source files are evaluated, see
+    project_upload.py). Skipped members are listed in skipped_files.
     """
-    project_info = request.data.get('project_info')
-    files_content = request.data.get('files_content', [])
+    from .ai_grading import aevaluate_project_files, project_file_hash
+
+    skipped_files = []
+    if request.content_type == 'multipart/form-data':
+        try:
+            project_info = orjson.loads(request.data.get('project_info') or 'null')
+        except ValueError:
+            project_info = None
+        upload = request.FILES.get('file')
+        if not isinstance(project_info, dict) or not project_info or upload is None:
+            return Response({
+                'success': False,
+                'message': 'Project info and a zip file are required',
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            files_content, skipped_files = await sync_to_async(
+                project_upload.extract_project_zip, thread_sensitive=False,
+            )(upload)
+        except project_upload.UploadError as e:
+            return Response({
+                'success': False,
+                'message': str(e),
+            }, status=status.HTTP_400_BAD_REQUEST)
 
-    if not project_info or not files_content:
+        if not files_content:
+            return Response({
+                'success': False,
+                'message': 'No source files found in the archive',
+                'skipped_files': skipped_files,
+            }, status=status.HTTP_400_BAD_REQUEST)
+    else:
+        project_info = request.data.get('project_info')
+        files_content = request.data.get('files_content', [])
+
+        if not project_info or not files_content:
+            return Response({
+                'success': False,
+                'message': 'Project info and files are required',
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+        if not isinstance(project_info, dict) or not isinstance(files_content, list) \
+                or not all(isinstance(f, dict) for f in files_content):
+            return Response({
+                'success': False,
+                'message': 'project_info must be an object and files_content a list of objects',
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+    # Stored reviews are matched per file by path, so paths must be unique
+    paths = [f.get('file_name', '') for f in files_content]
+    if len(set(paths)) != len(paths):
         return Response({
             'success': False,
-            'message': 'Project info and files are required',
+            'message': 'Each file must have a distinct file_name (its path within the project)',
         }, status=status.HTTP_400_BAD_REQUEST)
 
-    from .ai_grading import evaluate_project_files
-    result = evaluate_project_files(project_info, files_content)
+    project_id = str(request.data.get('project_id')
+                     or slugify(str(project_info.get('title', '')), allow_unicode=True))[:100]
+    project_hash = caching.llm_request_hash(project_info)
+    file_hashes = {path: project_file_hash(f) for path, f in zip(paths, files_content)}
+
+    previous = await ProjectSubmission.objects.filter(user=request.user, project_id=project_id).afirst()
+    if previous is not None and previous.project_hash != project_hash:
+        previous = None  # assignment changed: reviews no longer apply
+
+    if previous is not None and previous.file_hashes == file_hashes and previous.evaluation.get('success'):
+        return Response({
+            'success': True,
+            'message': 'Project unchanged since last evaluation',
+            'result': previous.evaluation,
+            'submission_id': previous.id,
+            'reused_files': list(file_hashes),
+            'skipped_files': skipped_files,
+        })
+
+    if await sync_to_async(llm_usage.quota_exceeded)(request):
+        return quota_exceeded_response()
+
+    known_reviews = previous.file_reviews if previous is not None else {}
+    with llm_usage.attribute_to(request):
+        result = await caching.aget_or_call_llm(
+            'project', (project_info, files_content),
+            lambda: aevaluate_project_files(project_info, files_content, known_reviews),
+        )
+    chunk_reviews = result.pop('chunk_reviews', {})
+
+    submission_id = None
+    if result.get('success'):
+        submission, _ = await ProjectSubmission.objects.aupdate_or_create(
+            user=request.user,
+            project_id=project_id,
+            defaults={
+                'project_title': project_info.get('title', ''),
+                'overall_score': result.get('overall_score', 0),
+                'code_quality': result.get('code_quality', 0),
+                'completeness': result.get('completeness', 0),
+                'technical_implementation': result.get('technical_implementation', 0),
+                'evaluation': result,
+                'project_hash': project_hash,
+                'file_hashes': file_hashes,
+                'file_reviews': chunk_reviews,
+            }
+        )
+        submission_id = submission.id
 
     return Response({
         'success': result.get('success', False),
         'message': 'Project evaluated successfully' if result.get('success') else result.get('error', 'Evaluation failed'),
         'result': result,
+        'submission_id': submission_id,
+        'reused_files': [name for name, h in file_hashes.items() if h in known_reviews],
+        'skipped_files': skipped_files,
     })
+
+
+def project_submissions_data(user_id):
+    """Project evaluations list for one user (cached as caching.PROJECTS)"""
+    submissions = ProjectSubmission.objects.filter(user_id=user_id).defer('file_reviews')
+    data = []
+    for sub in submissions:
+        data.append({
+            'id': sub.id,
+            'project_id': sub.project_id,
+            'project_title': sub.project_title,
+            'overall_score': sub.overall_score,
+            'code_quality': sub.code_quality,
+            'completeness': sub.completeness,
+            'technical_implementation': sub.technical_implementation,
+            'files': list(sub.file_hashes),
+            'result': sub.evaluation,
+            'submitted_at': sub.submitted_at.isoformat(),
+            'updated_at': sub.updated_at.isoformat(),
+        })
+    return data
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def get_project_submissions(request):
+    """
+    Get all saved project evaluations for the authenticated user.
+
+    GET /api/ai/project/submissions/
+    """
+    user_id = request.user.id
+    data = caching.get_progress(caching.PROJECTS, user_id, lambda: project_submissions_data(user_id))
+
+    return Response({
+        'success': True,
+        'submissions': data
+    }, status=status.HTTP_200_OK)
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def get_project_submission(request, project_id):
+    """
+    Get the saved evaluation of one project for the authenticated user.
+
+    GET /api/ai/project/submissions/<project_id>/
+    """
+    user_id = request.user.id
+    data = caching.get_progress(caching.PROJECTS, user_id, lambda: project_submissions_data(user_id))
+    submission = next((sub for sub in data if sub['project_id'] == project_id), None)
+
+    if submission is None:
+        return Response({
+            'success': False,
+            'message': 'No evaluation found for this project',
+            'submission': None
+        }, status=status.HTTP_404_NOT_FOUND)
+
+    return Response({
+        'success': True,
+        'submission': submission
+    }, status=status.HTTP_200_OK)
+
+
+# ============================================
+# LLM USAGE
+# ============================================
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def get_llm_usage(request):
+    """
+    Get today's LLM token usage and quota for the authenticated user.
+
+    GET /api/ai/usage/
+    """
+    return Response({
+        'success': True,
+        'usage': llm_usage.usage_summary(request),
+    }, status=status.HTTP_200_OK)
+
+
+@api_view(['GET'])
+@permission_classes([IsAdminUser])
+def llm_usage_dashboard(request):
+    """
+    Staff cost dashboard: daily token usage and estimated cost per feature, model
+    route and model, latency and cost per route over the window, and the heaviest users.
+
+    GET /api/ai/usage/dashboard/?days=7
+    """
+    from datetime import datetime, time as dt_time
+    from django.conf import settings
+    from django.db.models import Count, Sum
+    from django.db.models.functions import TruncDate
+    from .models import LLMUsage
+
+    try:
+        days = min(max(int(request.query_params.get('days', 7)), 1), 90)
+    except ValueError:
+        return Response({
+            'success': False,
+            'message': 'Invalid days'
+        }, status=status.HTTP_400_BAD_REQUEST)
+    start = timezone.make_aware(datetime.combine(timezone.localdate() - timedelta(days=days - 1), dt_time.min))
+    usage = LLMUsage.objects.filter(created_at__gte=start)
+    token_sums = {
+        'calls': Count('id'),
+        'prompt_tokens': Sum('prompt_tokens'),
+        'output_tokens': Sum('output_tokens'),
+        'thinking_tokens': Sum('thinking_tokens'),
+        'cached_tokens': Sum('cached_tokens'),
+        'total_tokens': Sum('total_tokens'),
+    }
+
+    def estimated_cost(row):
+        price = settings.LLM_PRICING.get(row['model'], {})
+        billed_input = row['prompt_tokens'] - row['cached_tokens']
+        return round((
+            billed_input * price.get('input', 0)
+            + row['cached_tokens'] * price.get('cached_input', 0)
+            + (row['output_tokens'] + row['thinking_tokens']) * price.get('output', 0)
+        ) / 1_000_000, 4)
+
+    daily = []
+    for row in usage.annotate(day=TruncDate('created_at')).values('day', 'feature', 'route', 'model').annotate(
+        latency_ms_total=Sum('latency_ms'), **token_sums,
+    ).order_by('-day', 'feature', 'route'):
+        daily.append({
+            'day': row['day'].isoformat(),
+            'feature': row['feature'],
+            'route': row['route'],
+            'model': row['model'],
+            'calls': row['calls'],
+            'prompt_tokens': row['prompt_tokens'],
+            'output_tokens': row['output_tokens'],
+            'thinking_tokens': row['thinking_tokens'],
+            'cached_tokens': row['cached_tokens'],
+            'total_tokens': row['total_tokens'],
+            'avg_latency_ms': round(row['latency_ms_total'] / row['calls']) if row['calls'] else 0,
+            'estimated_cost_usd': estimated_cost(row),
+        })
+
+    routes = []
+    for row in usage.values('route', 'model').annotate(
+        latency_ms_total=Sum('latency_ms'), failures=Count('id', filter=Q(success=False)), **token_sums,
+    ).order_by('route', 'model'):
+        cost = estimated_cost(row)
+        routes.append({
+            'route': row['route'],
+            'model': row['model'],
+            'calls': row['calls'],
+            'failures': row['failures'],
+            'total_tokens': row['total_tokens'],
+            'avg_latency_ms': round(row['latency_ms_total'] / row['calls']) if row['calls'] else 0,
+            'estimated_cost_usd': cost,
+            'estimated_cost_per_call_usd': round(cost / row['calls'], 6) if row['calls'] else 0,
+        })
+
+    top_users = []
+    for row in usage.filter(user__isnull=False).values('user_id', 'user__username').annotate(
+        calls=Count('id'), total_tokens=Sum('total_tokens'),
+    ).order_by('-total_tokens')[:20]:
+        top_users.append({
+            'user_id': row['user_id'],
+            'username': row['user__username'],
+            'calls': row['calls'],
+            'total_tokens': row['total_tokens'],
+        })
+
+    return Response({
+        'success': True,
+        'days': days,
+        'daily': daily,
+        'total_estimated_cost_usd': round(sum(row['estimated_cost_usd'] for row in daily), 4),
+        'routes': routes,
+        'top_users': top_users,
+    }, status=status.HTTP_200_OK)
@@ -1,5 +1,12 @@
 """
 ASGI config for backend project.
+
+Serves the async AI endpoints (grading, chat, exam generation, project
+evaluation) without tying up a thread per in-flight Gemini call:
+
+    uvicorn backend.asgi:application --host 0.0.0.0 --port 8000
+
+or, with several worker processes, gunicorn using gunicorn.conf.py.
 """
 
 import os
@@ -9,3 +16,9 @@ from django.core.asgi import get_asgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'backend.settings')
 
 application = get_asgi_application()
+
+# Build the OrcaAI retrieval index and load the lab catalog before the first request
+from authentication import labs, retrieval  # noqa: E402
+
+retrieval.get_index()
+labs.catalog()
@@ -2,6 +2,8 @@
 Django settings for Smart Learners AI backend project.
 """
 
+import importlib.util
+import os
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -32,6 +34,7 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'corsheaders.middleware.CorsMiddleware',  # Must be at top
+    'authentication.middleware.MetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -69,6 +72,32 @@ DATABASES = {
     }
 }
 
+# Cache. Idempotency locks, login throttling and the LLM token counters rely
+# on atomic add()/incr() and on entries not being evicted early, which Redis
+# and the in-process LocMem cache provide (the file-based cache does not).
+# LocMem (the default) is per process: fine for runserver or a single worker.
+# Deployments with several workers must set REDIS_URL (or any Redis-compatible
+# server); without it gunicorn.conf.py runs a single worker.
+# Requires the `redis` package.
+REDIS_URL = os.environ.get('REDIS_URL', '')
+
+if REDIS_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': REDIS_URL,
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'OPTIONS': {
+                'MAX_ENTRIES': 20000,
+            },
+        }
+    }
+
 # Password validation
 AUTH_PASSWORD_VALIDATORS = [
     {
@@ -82,6 +111,26 @@ AUTH_PASSWORD_VALIDATORS = [
     },
 ]
 
+# Password hashing cost. Tune with benchmarks/bench_login.py; existing hashes
+# are upgraded to the configured cost on the next successful login.
+PASSWORD_HASH_ITERATIONS = int(os.environ.get('PASSWORD_HASH_ITERATIONS', 600000))
+
+PASSWORD_HASHERS = [
+    'authentication.hashers.TunablePBKDF2PasswordHasher',
+    'django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher',
+    'django.contrib.auth.hashers.Argon2PasswordHasher',
+    'django.contrib.auth.hashers.BCryptSHA256PasswordHasher',
+    'django.contrib.auth.hashers.ScryptPasswordHasher',
+]
+
+# Failed login attempts allowed per window (seconds) before /api/auth/login/ returns 429
+LOGIN_THROTTLE = {
+    'ip_failures': 20,
+    'ip_window': 300,
+    'account_failures': 5,
+    'account_window': 900,
+}
+
 # Internationalization
 LANGUAGE_CODE = 'en-us'
 TIME_ZONE = 'UTC'
@@ -119,6 +168,7 @@ CORS_ALLOW_HEADERS = [
     'authorization',
     'content-type',
     'dnt',
+    'idempotency-key',
     'origin',
     'user-agent',
     'x-csrftoken',
@@ -133,8 +183,23 @@ REST_FRAMEWORK = {
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.AllowAny',
     ],
+    'DEFAULT_RENDERER_CLASSES': [
+        'authentication.renderers.ORJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        'authentication.parsers.ORJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ],
 }
 
+# Clients may ask for MessagePack (Accept: application/msgpack) when the
+# optional msgpack package is installed; JSON stays the default.
+if importlib.util.find_spec('msgpack') is not None:
+    REST_FRAMEWORK['DEFAULT_RENDERER_CLASSES'].append('authentication.renderers.MessagePackRenderer')
+    REST_FRAMEWORK['DEFAULT_PARSER_CLASSES'].append('authentication.parsers.MessagePackParser')
+
 # CSRF Settings for API
 CSRF_TRUSTED_ORIGINS = [
     "http://localhost:3000",
@@ -143,9 +208,64 @@ CSRF_TRUSTED_ORIGINS = [
     "http://127.0.0.1:5173",
 ]
 
+# Session storage used by CsrfExemptSessionAuthentication. Select with SESSION_MODE:
+#   cached_db      - (default) read through the cache, database kept for durability
+#   cache          - cache only; no database hit, sessions lost if the cache is cleared
+#   signed_cookies - no server-side storage; session data lives in a signed cookie
+#   db             - Django default; one django_session query per request
+SESSION_MODE = os.environ.get('SESSION_MODE', 'cached_db')
+SESSION_ENGINE = {
+    'cached_db': 'django.contrib.sessions.backends.cached_db',
+    'cache': 'django.contrib.sessions.backends.cache',
+    'signed_cookies': 'django.contrib.sessions.backends.signed_cookies',
+    'db': 'django.contrib.sessions.backends.db',
+}[SESSION_MODE]
+
 # Session cookie settings
 SESSION_COOKIE_SAMESITE = 'Lax'
 SESSION_COOKIE_HTTPONLY = True
 
 # Custom User Model
 AUTH_USER_MODEL = 'authentication.User'
+
+# Exam autosave: buffered answers are written to the database at most this often per session
+EXAM_AUTOSAVE_FLUSH_SECONDS = 15
+
+# Request metrics (see /api/metrics). Worker processes aggregate into one SQLite file.
+METRICS_ENABLED = True
+METRICS_DB_PATH = BASE_DIR / 'metrics.sqlite3'
+METRICS_FLUSH_SECONDS = 5
+METRICS_ALLOWED_IPS = ['127.0.0.1', '::1']
+
+# LLM usage: daily token quota per user / per anonymous IP (0 = unlimited; staff are exempt)
+LLM_DAILY_TOKEN_QUOTA = {
+    'user': int(os.environ.get('LLM_DAILY_TOKEN_QUOTA', 500000)),
+    'anonymous': 50000,
+}
+
+# Estimated price in USD per 1M tokens for the staff cost dashboard (thinking tokens bill as output)
+LLM_PRICING = {
+    'gemini-2.5-flash': {'input': 0.30, 'cached_input': 0.075, 'output': 2.50},
+    'gemini-2.5-flash-lite': {'input': 0.10, 'cached_input': 0.025, 'output': 0.40},
+    'gemini-2.5-pro': {'input': 1.25, 'cached_input': 0.31, 'output': 10.00},
+}
+
+# LLM model routing (authentication/model_router.py): the first rule whose conditions all
+# match picks the model. Conditions: feature, difficulty, tier ('anonymous', 'user', 'staff'),
+# min_prompt_tokens, max_prompt_tokens (a string or a list for the first three).
+# escalate_to redoes a call whose structured output fails validation on a stronger model.
+# Calls matching no rule use ai_grading.MODEL_NAME. Each call's route is in the usage ledger.
+LLM_ROUTES = [
+    # Short chat turns (greetings, quick questions) don't need the larger model
+    {'name': 'chat-short', 'feature': 'chat', 'max_prompt_tokens': 1500, 'model': 'gemini-2.5-flash-lite'},
+    {'name': 'chat-anonymous', 'feature': 'chat', 'tier': 'anonymous', 'model': 'gemini-2.5-flash-lite'},
+    {'name': 'chat', 'feature': 'chat', 'model': 'gemini-2.5-flash'},
+    {'name': 'exam-easy', 'feature': 'exam', 'difficulty': 'easy', 'model': 'gemini-2.5-flash-lite',
+     'escalate_to': 'gemini-2.5-flash'},
+    {'name': 'exam', 'feature': 'exam', 'model': 'gemini-2.5-flash', 'escalate_to': 'gemini-2.5-pro'},
+    # Map step of large project reviews: many small per-file calls
+    {'name': 'project-file', 'feature': 'project_file', 'model': 'gemini-2.5-flash-lite',
+     'escalate_to': 'gemini-2.5-flash'},
+    {'name': 'project', 'feature': 'project', 'model': 'gemini-2.5-flash', 'escalate_to': 'gemini-2.5-pro'},
+    {'name': 'grade', 'feature': 'grade', 'model': 'gemini-2.5-flash', 'escalate_to': 'gemini-2.5-pro'},
+]
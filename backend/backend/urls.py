@@ -4,9 +4,11 @@ URL configuration for Smart Learners AI backend project.
 from django.contrib import admin
 from django.urls import path, include
 from authentication.urls import ai_urlpatterns
+from authentication.views import metrics_view
 
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('api/auth/', include('authentication.urls')),
     path('api/ai/', include(ai_urlpatterns)),
+    path('api/metrics', metrics_view, name='metrics'),
 ]
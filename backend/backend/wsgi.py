@@ -9,3 +9,9 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'backend.settings')
 
 application = get_wsgi_application()
+
+# Build the OrcaAI retrieval index and load the lab catalog before the first request
+from authentication import labs, retrieval  # noqa: E402
+
+retrieval.get_index()
+labs.catalog()
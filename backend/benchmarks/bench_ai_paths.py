@@ -0,0 +1,140 @@
+"""
+Profile the AI paths end to end (prompt building, routing, parsing and
+validation, map-reduce) from recorded LLM responses, with no network.
+
+Runs agrade_submission, achat_with_orca, agenerate_exam_questions and
+aevaluate_project_files, the coroutines the views await, on fixed inputs:
+--runs calls per path on one event loop, at most --concurrency in flight,
+as under the ASGI server. By default the LLM calls are
+replayed from the cassettes (llm_cassette.py); record them once with
+--record, against Gemini (GEMINI_API_KEY) or the fake backend
+(LLM_BACKEND=fake). Replay latency is the recorded one times
+--latency-scale; 0 leaves only the application's own time.
+
+Usage (from backend/):
+    python benchmarks/bench_ai_paths.py --record
+    python benchmarks/bench_ai_paths.py --runs 20 --latency-scale 0
+    python benchmarks/bench_ai_paths.py --runs 200 --concurrency 50
+    python benchmarks/bench_ai_paths.py --latency-scale 0 --profile
+"""
+
+import argparse
+import asyncio
+import cProfile
+import os
+import pstats
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'backend.settings')
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--record', action='store_true', help='call the provider and record the responses')
+    parser.add_argument('--runs', type=int, default=10)
+    parser.add_argument('--concurrency', type=int, default=10, help='calls in flight at once per path')
+    parser.add_argument('--latency-scale', type=float, default=1.0)
+    parser.add_argument('--profile', action='store_true', help='print the top functions by cumulative time')
+    return parser.parse_args()
+
+
+args = parse_args()
+os.environ['LLM_CASSETTE'] = 'record' if args.record else 'replay'
+os.environ['LLM_REPLAY_LATENCY_SCALE'] = str(args.latency_scale)
+
+import django  # noqa: E402
+
+django.setup()
+
+from authentication import ai_grading, labs, llm_cassette, llm_usage  # noqa: E402
+
+# The ledger needs a migrated database and is not what is measured here
+llm_usage.record = lambda *a, **kw: None
+
+CODE = '''import pandas as pd
+from sklearn.datasets import load_iris
+from sklearn.model_selection import train_test_split
+from sklearn.linear_model import LogisticRegression
+from sklearn.tree import DecisionTreeClassifier
+from sklearn.metrics import accuracy_score, classification_report
+
+X, y = load_iris(return_X_y=True, as_frame=True)
+print(X.describe())
+X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.3, random_state=42)
+for model in (LogisticRegression(max_iter=200), DecisionTreeClassifier()):
+    model.fit(X_train, y_train)
+    print(type(model).__name__, accuracy_score(y_test, model.predict(X_test)))
+    print(classification_report(y_test, model.predict(X_test)))
+'''
+
+PROJECT = {
+    'title': 'Customer Churn Prediction',
+    'description': 'Predict which customers will churn from usage and billing data.',
+    'tech_stack': ['Python', 'pandas', 'scikit-learn'],
+    'steps': ['Load and clean the data', 'Engineer features', 'Train and tune a model', 'Report metrics'],
+}
+# Large enough for the map-reduce path (several per-file reviews plus a summary)
+PROJECT_FILES = [
+    {'file_name': name, 'content': (CODE + f'\n# {name}\n') * 20}
+    for name in ('data.py', 'features.py', 'train.py')
+]
+
+
+def paths():
+    lab = labs.get_lab('lab_1')
+    return {
+        'grade': lambda: ai_grading.agrade_submission(lab.info, CODE, header=lab.prompt_header),
+        'chat': lambda: ai_grading.achat_with_orca([], 'How does retrieval augmented generation reduce hallucinations?'),
+        'exam': lambda: ai_grading.agenerate_exam_questions('medium', 10),
+        'project': lambda: ai_grading.aevaluate_project_files(PROJECT, PROJECT_FILES),
+    }
+
+
+async def run_path(name, call, runs, concurrency) -> tuple:
+    """
+    Returns:
+        Tuple of (per-call latencies in ms, successful calls, wall time in s)
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+    timings = []
+
+    async def one():
+        async with semaphore:
+            start = time.perf_counter()
+            result = await call()
+            timings.append((time.perf_counter() - start) * 1000)
+            if not result.get('success'):
+                print(f"  {name}: {result.get('error') or result.get('response')}")
+            return bool(result.get('success'))
+
+    start = time.perf_counter()
+    ok = sum(await asyncio.gather(*(one() for _ in range(runs))))
+    return timings, ok, time.perf_counter() - start
+
+
+async def main():
+    # Recording stores every response of a request, so record one call each
+    runs, concurrency = (1, 1) if args.record else (args.runs, args.concurrency)
+    profiler = cProfile.Profile() if args.profile else None
+    print(f"mode {llm_cassette.MODE}, cassettes in {llm_cassette.CASSETTE_DIR}"
+          + ('' if args.record else f", latency x{args.latency_scale:g}")
+          + f", {runs} calls per path, concurrency {concurrency}")
+    print(f"{'path':<9}{'ok':>4}{'mean ms':>10}{'p50 ms':>9}{'max ms':>9}{'calls/s':>9}")
+    for name, call in paths().items():
+        if profiler:
+            profiler.enable()
+        timings, ok, wall = await run_path(name, call, runs, concurrency)
+        if profiler:
+            profiler.disable()
+        print(f"{name:<9}{ok:>4}{statistics.mean(timings):>10.1f}{statistics.median(timings):>9.1f}"
+              f"{max(timings):>9.1f}{runs / wall:>9.1f}")
+
+    if profiler:
+        pstats.Stats(profiler).sort_stats('cumulative').print_stats(25)
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
@@ -0,0 +1,90 @@
+"""
+Measure /api/auth/login/ latency for several password hash costs.
+
+For each PASSWORD_HASH_ITERATIONS value, runs successful username logins,
+successful email logins and failed logins through the full middleware
+stack against a throwaway test database, and reports p50/p95/p99.
+Throttling is disabled for the run.
+
+Usage (from backend/):
+    python benchmarks/bench_login.py
+    python benchmarks/bench_login.py --iterations 100000 300000 600000 --requests 200
+"""
+
+import argparse
+import logging
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'backend.settings')
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.db import connection  # noqa: E402
+from django.test import Client  # noqa: E402
+from django.test.utils import override_settings, setup_test_environment  # noqa: E402
+
+NO_THROTTLE = {'ip_failures': 10 ** 9, 'ip_window': 1, 'account_failures': 10 ** 9, 'account_window': 1}
+
+# Keep failure counters out of the shared cache
+LOCAL_CACHE = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+def measure(client, payload, num_requests, expected_status):
+    samples = []
+    for _ in range(num_requests):
+        start = time.perf_counter()
+        response = client.post('/api/auth/login/', payload, content_type='application/json')
+        samples.append((time.perf_counter() - start) * 1000)
+        assert response.status_code == expected_status, response.status_code
+    return samples
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--iterations', type=int, nargs='+', default=[100000, 300000, 600000])
+    parser.add_argument('--requests', type=int, default=100)
+    args = parser.parse_args()
+
+    logging.getLogger('django.request').setLevel(logging.ERROR)  # 401s are expected
+    setup_test_environment()
+    old_name = connection.creation.create_test_db(verbosity=0)
+    try:
+        from authentication.models import User
+
+        print(f"POST /api/auth/login/ x {args.requests} per case (ms)")
+        print(f"{'iterations':>10}  {'case':<16}{'p50':>8}{'p95':>8}{'p99':>8}{'mean':>8}")
+        for iterations in args.iterations:
+            with override_settings(PASSWORD_HASH_ITERATIONS=iterations, LOGIN_THROTTLE=NO_THROTTLE,
+                                   CACHES=LOCAL_CACHE):
+                User.objects.filter(username='bench').delete()
+                User.objects.create_user('bench', 'bench@example.com', 'bench-pass')
+                client = Client()
+
+                cases = [
+                    ('username', {'username': 'bench', 'password': 'bench-pass'}, 200),
+                    ('email', {'username': 'bench@example.com', 'password': 'bench-pass'}, 200),
+                    ('wrong password', {'username': 'bench@example.com', 'password': 'nope'}, 401),
+                    ('unknown user', {'username': 'nobody', 'password': 'nope'}, 401),
+                ]
+                for name, payload, expected in cases:
+                    samples = measure(client, payload, args.requests, expected)
+                    print(f"{iterations:>10}  {name:<16}"
+                          f"{percentile(samples, 50):>8.1f}{percentile(samples, 95):>8.1f}"
+                          f"{percentile(samples, 99):>8.1f}{statistics.mean(samples):>8.1f}")
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+
+
+if __name__ == '__main__':
+    main()
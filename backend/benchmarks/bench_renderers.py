@@ -0,0 +1,189 @@
+"""
+Compare response serialization cost on the heaviest read endpoints.
+
+Fills a throwaway test database with one user's lab submissions (nested
+grading_result plus stored code) and a completed exam, then for
+GET /api/ai/submissions/ and GET /api/ai/exam/<id>/:
+
+  * times DRF's JSONRenderer, ORJSONRenderer and MessagePackRenderer on the
+    exact response payload (time per render and body size), and
+  * times full requests through the middleware stack for
+    Accept: application/json and Accept: application/msgpack.
+
+Usage (from backend/):
+    python benchmarks/bench_renderers.py
+    python benchmarks/bench_renderers.py --submissions 200 --questions 20 --renders 500
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'backend.settings')
+
+import django  # noqa: E402
+
+django.setup()
+
+import orjson  # noqa: E402
+from django.db import connection  # noqa: E402
+from django.test import Client  # noqa: E402
+from django.test.utils import override_settings, setup_test_environment  # noqa: E402
+from django.utils import timezone  # noqa: E402
+from rest_framework.renderers import JSONRenderer  # noqa: E402
+
+from authentication.renderers import MessagePackRenderer, ORJSONRenderer, msgpack  # noqa: E402
+
+LOCAL_CACHE = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+
+SAMPLE_CODE = '''import numpy as np
+import pandas as pd
+from sklearn.model_selection import train_test_split
+from sklearn.linear_model import LogisticRegression
+
+df = pd.read_csv("data.csv")
+X = df.drop(columns=["label"]).values
+y = df["label"].values
+X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2)
+model = LogisticRegression(max_iter=1000).fit(X_train, y_train)
+print("accuracy", model.score(X_test, y_test))
+'''
+
+
+def grading_result(rng):
+    return {
+        'success': True,
+        'is_relevant': True,
+        'relevance_issue': None,
+        'overall_score': rng.randint(50, 100),
+        'code_quality': rng.randint(50, 100),
+        'accuracy': rng.randint(50, 100),
+        'efficiency': rng.randint(50, 100),
+        'requirements_analysis': [
+            {'requirement': f'Requirement {i}: load, split and fit the model',
+             'status': rng.choice(['met', 'partial', 'not_met']),
+             'explanation': 'The notebook loads the dataset, splits it and fits a classifier. ' * 2}
+            for i in range(1, 7)
+        ],
+        'strengths': ['Clear structure', 'Good use of vectorized NumPy operations', 'Reproducible split'],
+        'areas_for_improvement': ['Add comments explaining each step', 'Evaluate with cross-validation'],
+        'detailed_feedback': '- Solid submission overall.\n- Consider scaling features first.\n' * 5,
+        'code_suggestions': ['Use a Pipeline with StandardScaler', 'Set random_state for reproducibility'],
+        'learning_resources': ['scikit-learn Pipelines', 'Cross-validation: evaluating estimator performance'],
+    }
+
+
+def fill(user, num_submissions, num_questions):
+    from authentication.models import ExamSession, LabSubmission
+
+    rng = random.Random(1)
+    LabSubmission.objects.bulk_create([
+        LabSubmission(
+            user=user,
+            lab_id=f'lab-{i}',
+            lab_title=f'Lab {i}: Logistic Regression',
+            lab_category='Machine Learning',
+            overall_score=rng.randint(50, 100),
+            code_quality=rng.randint(50, 100),
+            accuracy=rng.randint(50, 100),
+            efficiency=rng.randint(50, 100),
+            grading_result=grading_result(rng),
+            code_content=SAMPLE_CODE * 4,
+            file_name=f'lab_{i}.ipynb',
+        )
+        for i in range(num_submissions)
+    ])
+
+    questions = [
+        {
+            'id': i + 1,
+            'question': f'Question {i + 1}: which statement about gradient descent is correct?',
+            'options': [f'Option {c}: a plausible but detailed answer choice' for c in 'ABCD'],
+            'correct_answer': rng.randint(0, 3),
+            'explanation': 'The learning rate scales each step along the negative gradient. ' * 2,
+            'topic': f'Module {i % 5 + 1}',
+        }
+        for i in range(num_questions)
+    ]
+    exam = ExamSession.objects.create(user=user, difficulty='hard', duration_minutes=60,
+                                      total_questions=num_questions, questions=questions,
+                                      expires_at=timezone.now())
+    exam.complete({str(q['id']): rng.randint(0, 3) for q in questions})
+    return exam
+
+
+def time_render(renderer, data, renders):
+    body = renderer.render(data, renderer.media_type, {})
+    start = time.perf_counter()
+    for _ in range(renders):
+        renderer.render(data, renderer.media_type, {})
+    return (time.perf_counter() - start) / renders * 1000, len(body)
+
+
+def time_requests(client, path, accept, num_requests):
+    client.get(path, HTTP_ACCEPT=accept)
+    start = time.perf_counter()
+    for _ in range(num_requests):
+        response = client.get(path, HTTP_ACCEPT=accept)
+    elapsed = time.perf_counter() - start
+    assert response.status_code == 200, response.status_code
+    assert response['Content-Type'].startswith(accept), response['Content-Type']
+    return elapsed / num_requests * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--submissions', type=int, default=100)
+    parser.add_argument('--questions', type=int, default=20)
+    parser.add_argument('--renders', type=int, default=300)
+    parser.add_argument('--requests', type=int, default=200)
+    args = parser.parse_args()
+
+    renderers = [('drf json', JSONRenderer()), ('orjson', ORJSONRenderer())]
+    accepts = ['application/json']
+    if msgpack is not None:
+        renderers.append(('msgpack', MessagePackRenderer()))
+        accepts.append('application/msgpack')
+    else:
+        print('msgpack not installed; skipping MessagePack rows')
+
+    setup_test_environment()
+    old_name = connection.creation.create_test_db(verbosity=0)
+    try:
+        with override_settings(CACHES=LOCAL_CACHE):
+            from authentication.models import User
+            user = User.objects.create_user('bench', 'bench@example.com', 'bench-pass')
+            exam = fill(user, args.submissions, args.questions)
+
+            client = Client()
+            client.force_login(user)
+            paths = {
+                f'submissions ({args.submissions})': '/api/ai/submissions/',
+                f'exam detail ({args.questions} q)': f'/api/ai/exam/{exam.id}/',
+            }
+
+            print(f"Render only, mean of {args.renders}")
+            print(f"{'endpoint':<24}{'renderer':<10}{'ms':>9}{'bytes':>10}")
+            for label, path in paths.items():
+                data = orjson.loads(client.get(path, HTTP_ACCEPT='application/json').content)
+                baseline = None
+                for name, renderer in renderers:
+                    ms, size = time_render(renderer, data, args.renders)
+                    baseline = baseline or ms
+                    print(f"{label:<24}{name:<10}{ms:>9.3f}{size:>10}  ({baseline / ms:.1f}x)")
+
+            print(f"\nFull GET through the middleware stack, mean of {args.requests}")
+            print(f"{'endpoint':<24}{'accept':<22}{'ms/req':>9}")
+            for label, path in paths.items():
+                for accept in accepts:
+                    ms = time_requests(client, path, accept, args.requests)
+                    print(f"{label:<24}{accept:<22}{ms:>9.3f}")
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+
+
+if __name__ == '__main__':
+    main()
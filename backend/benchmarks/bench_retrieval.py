@@ -0,0 +1,77 @@
+"""
+Measure the OrcaAI retrieval index: build time, incremental rebuild time,
+memory of the CSR arrays, query latency (mean, p50, p99) and prompt size
+with the top-k chunks versus pasting the whole course content.
+
+Usage (from backend/):
+    python benchmarks/bench_retrieval.py
+    python benchmarks/bench_retrieval.py --queries 5000 --k 5
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'backend.settings')
+
+import django  # noqa: E402
+
+django.setup()
+
+from authentication import ai_grading, retrieval  # noqa: E402
+
+QUESTIONS = [
+    "How does retrieval augmented generation reduce hallucinations?",
+    "What is chain of thought prompting?",
+    "Explain embeddings and tokens",
+    "How do I handle an imbalanced dataset for churn prediction?",
+    "Which metric should I use for the weather forecasting lab?",
+    "How do I fine-tune a small language model with LoRA?",
+    "What are AI agents and tools?",
+    "hi",
+]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--queries', type=int, default=2000)
+    parser.add_argument('--k', type=int, default=retrieval.RETRIEVAL_TOP_K)
+    args = parser.parse_args()
+
+    corpus = retrieval.load_corpus()
+    start = time.perf_counter()
+    index = retrieval.BM25Index.from_chunks(corpus)
+    full_ms = (time.perf_counter() - start) * 1000
+
+    # One chunk edited: only that chunk is re-tokenized
+    edited = [dict(chunk) for chunk in corpus]
+    edited[0]['text'] += ' (updated)'
+    start = time.perf_counter()
+    retrieval.BM25Index.from_chunks(edited, previous=index)
+    incremental_ms = (time.perf_counter() - start) * 1000
+
+    size = index.indptr.nbytes + index.chunk_ids.nbytes + index.weights.nbytes
+    print(f"chunks {len(index.chunks)}  terms {len(index.vocab)}  postings {len(index.chunk_ids)}  arrays {size / 1024:.1f} KB")
+    print(f"full build {full_ms:.1f} ms  incremental rebuild {incremental_ms:.1f} ms")
+
+    timings = []
+    for i in range(args.queries):
+        question = QUESTIONS[i % len(QUESTIONS)]
+        start = time.perf_counter()
+        index.search(question, args.k)
+        timings.append(time.perf_counter() - start)
+    timings.sort()
+    mean = sum(timings) / len(timings)
+    print(f"search (k={args.k}) mean {mean * 1e6:.0f} us  "
+          f"p50 {timings[len(timings) // 2] * 1e6:.0f} us  p99 {timings[int(len(timings) * 0.99)] * 1e6:.0f} us")
+
+    everything = sum(len(c['title']) + len(c['text']) for c in corpus) + len(ai_grading.CURRICULUM_TOPICS)
+    injected = [len(retrieval.context_for(q, args.k)) for q in QUESTIONS]
+    print(f"prompt context: whole course {everything} chars, "
+          f"top-{args.k} chunks {sum(injected) / len(injected):.0f} chars on average (max {max(injected)})")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,76 @@
+"""
+Benchmark authenticated GET throughput under each session mode.
+
+Runs in-process through the full middleware stack with Django's test
+client against a throwaway test database, so it needs no running server.
+
+Usage (from backend/):
+    python benchmarks/bench_sessions.py
+    python benchmarks/bench_sessions.py --requests 5000 --path /api/ai/exam/history/
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'backend.settings')
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.db import connection  # noqa: E402
+from django.test import Client  # noqa: E402
+from django.test.utils import override_settings, setup_test_environment  # noqa: E402
+
+SESSION_ENGINES = {
+    'db': 'django.contrib.sessions.backends.db',
+    'cached_db': 'django.contrib.sessions.backends.cached_db',
+    'cache': 'django.contrib.sessions.backends.cache',
+    'signed_cookies': 'django.contrib.sessions.backends.signed_cookies',
+}
+
+
+def run(mode, path, num_requests, user):
+    with override_settings(SESSION_ENGINE=SESSION_ENGINES[mode]):
+        client = Client()
+        client.force_login(user)
+
+        # Warm up
+        for _ in range(50):
+            client.get(path)
+
+        start = time.perf_counter()
+        for _ in range(num_requests):
+            response = client.get(path)
+        elapsed = time.perf_counter() - start
+
+        assert response.status_code == 200, response.status_code
+        return num_requests / elapsed, elapsed / num_requests * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--requests', type=int, default=2000)
+    parser.add_argument('--path', default='/api/auth/check/')
+    args = parser.parse_args()
+
+    setup_test_environment()
+    old_name = connection.creation.create_test_db(verbosity=0)
+    try:
+        from authentication.models import User
+        user = User.objects.create_user('bench', 'bench@example.com', 'bench-pass')
+
+        print(f"GET {args.path} x {args.requests} (authenticated)")
+        print(f"{'mode':<16}{'req/s':>10}{'ms/req':>10}")
+        for mode in SESSION_ENGINES:
+            rps, ms = run(mode, args.path, args.requests, user)
+            print(f"{mode:<16}{rps:>10.0f}{ms:>10.3f}")
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,116 @@
+"""
+Measure signup uniqueness checks and signup latency with a large users table.
+
+Fills a throwaway test database with --users rows (default 1,000,000), then
+compares the old `__iexact` lookups with the Lower() comparisons
+(models.filter_lower) served by the Lower() functional unique indexes, and times full /api/auth/signup/
+requests. Password hashing is set to a minimal cost so the numbers reflect
+the database work.
+
+Usage (from backend/):
+    python benchmarks/bench_signup.py
+    python benchmarks/bench_signup.py --users 200000 --requests 200
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'backend.settings')
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.contrib.auth.hashers import make_password  # noqa: E402
+from django.db import connection, transaction  # noqa: E402
+from django.test import Client  # noqa: E402
+from django.test.utils import override_settings, setup_test_environment  # noqa: E402
+
+LOCAL_CACHE = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+
+
+def fill_users(count, chunk=20000):
+    from authentication.models import User
+
+    password = make_password('bench-pass')
+    start = time.perf_counter()
+    for offset in range(0, count, chunk):
+        with transaction.atomic():
+            User.objects.bulk_create([
+                User(username=f'Learner{i}', email=f'learner{i}@example.com', password=password)
+                for i in range(offset, min(offset + chunk, count))
+            ])
+    print(f"Inserted {count} users in {time.perf_counter() - start:.1f}s")
+
+
+def time_query(queryset_factory, num_requests):
+    samples = []
+    for i in range(num_requests):
+        start = time.perf_counter()
+        queryset_factory(i).exists()
+        samples.append((time.perf_counter() - start) * 1000)
+    return samples
+
+
+def report(name, samples):
+    ordered = sorted(samples)
+    p99 = ordered[min(len(ordered) - 1, int(0.99 * (len(ordered) - 1)))]
+    print(f"{name:<28}{statistics.median(samples):>10.3f}{p99:>10.3f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--users', type=int, default=1_000_000)
+    parser.add_argument('--requests', type=int, default=100)
+    args = parser.parse_args()
+
+    setup_test_environment()
+    old_name = connection.creation.create_test_db(verbosity=0)
+    try:
+        from authentication.models import User, filter_lower
+        fill_users(args.users)
+
+        # Probe existing rows spread across the table, with different casing
+        probe = lambda i: (i * 7919) % args.users  # noqa: E731
+        print(f"\nUniqueness check (ms), {args.users} users")
+        print(f"{'lookup':<28}{'p50':>10}{'p99':>10}")
+        report('username__iexact', time_query(
+            lambda i: User.objects.filter(username__iexact=f'LEARNER{probe(i)}'), args.requests))
+        report('filter_lower(username)', time_query(
+            lambda i: filter_lower(User.objects, 'username', [f'learner{probe(i)}']), args.requests))
+        report('email__iexact', time_query(
+            lambda i: User.objects.filter(email__iexact=f'LEARNER{probe(i)}@example.com'), args.requests))
+        report('filter_lower(email)', time_query(
+            lambda i: filter_lower(User.objects, 'email', [f'learner{probe(i)}@example.com']), args.requests))
+
+        print("\nQuery plans")
+        print('  iexact:', User.objects.filter(email__iexact='x@example.com').explain())
+        print('  lower: ', filter_lower(User.objects, 'email', ['x@example.com']).explain())
+
+        with override_settings(PASSWORD_HASH_ITERATIONS=1, CACHES=LOCAL_CACHE):
+            samples = []
+            for i in range(args.requests):
+                client = Client()
+                payload = {
+                    'username': f'newcomer{i}',
+                    'email': f'newcomer{i}@example.com',
+                    'password': 'bench-pass',
+                    'confirm_password': 'bench-pass',
+                }
+                start = time.perf_counter()
+                response = client.post('/api/auth/signup/', payload, content_type='application/json')
+                samples.append((time.perf_counter() - start) * 1000)
+                assert response.status_code == 201, response.content
+            print("\nPOST /api/auth/signup/ (ms)")
+            print(f"{'':<28}{'p50':>10}{'p99':>10}")
+            report('signup', samples)
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,81 @@
+"""
+Compare parsing a JSON response the old way (json.loads, then a greedy
+regex over the whole text, then ad-hoc .get() validation) with
+structured_output.parse() (orjson, raw_decode from the first '{', typed
+validation) on exam outputs of growing size, bare and wrapped in prose.
+
+Usage (from backend/):
+    python benchmarks/bench_structured_output.py
+    python benchmarks/bench_structured_output.py --runs 200
+"""
+
+import argparse
+import json
+import os
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'backend.settings')
+
+import django  # noqa: E402
+
+django.setup()
+
+from authentication import ai_grading, structured_output  # noqa: E402
+
+
+def exam_text(count):
+    return json.dumps({'questions': [
+        {
+            'question': f'Question {i} about retrieval augmented generation? ' * 3,
+            'options': ['First option', 'Second option', 'Third option', 'Fourth option'],
+            'correct_answer': i % 4,
+            'explanation': 'The correct answer follows from the definition. ' * 4,
+            'topic': f'Module {i % 5 + 1}',
+        }
+        for i in range(count)
+    ]})
+
+
+def old_parse(text, count):
+    try:
+        result = json.loads(text)
+    except json.JSONDecodeError:
+        match = re.search(r'\{[\s\S]*\}', text)
+        result = json.loads(match.group())
+    return [{
+        'id': i + 1,
+        'question': q.get('question', ''),
+        'options': q.get('options', [])[:4],
+        'correct_answer': min(max(int(q.get('correct_answer', 0)), 0), 3),
+        'explanation': q.get('explanation', ''),
+        'topic': q.get('topic', 'General'),
+    } for i, q in enumerate(result.get('questions', [])[:count])]
+
+
+def timed(fn, runs):
+    start = time.perf_counter()
+    for _ in range(runs):
+        fn()
+    return (time.perf_counter() - start) / runs * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--runs', type=int, default=100)
+    args = parser.parse_args()
+
+    print(f"{'questions':>9}{'KB':>7}{'wrapped':>9}{'old us':>10}{'new us':>10}")
+    for count in (10, 50, 200):
+        spec = ai_grading.exam_output(count)
+        bare = exam_text(count)
+        for wrapped, text in ((False, bare), (True, f"Here is the exam:\n```json\n{bare}\n```\nGood luck!")):
+            old_us = timed(lambda: old_parse(text, count), args.runs)
+            new_us = timed(lambda: structured_output.parse(text, spec), args.runs)
+            print(f"{count:>9}{len(text) / 1024:>7.0f}{str(wrapped):>9}{old_us:>10.0f}{new_us:>10.0f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,296 @@
+"""
+HTTP load test for the Smart Learners AI API.
+
+Drives a weighted mix of login, auth check, grading, chat, exam
+generate/submit and history calls from concurrent virtual users, each with
+its own session cookie. Reports throughput, error rate and p50/p95/p99
+latency per endpoint, optionally saves the run as JSON and compares it
+against a stored baseline.
+
+Start the server with the fake LLM backend so results measure the API,
+not Gemini (and lift the token quota for long runs):
+
+    LLM_BACKEND=fake LLM_FAKE_LATENCY_MS=1500 LLM_DAILY_TOKEN_QUOTA=0 \\
+        python manage.py runserver --noreload 8000
+
+Then, from backend/:
+
+    python benchmarks/loadtest.py --users 20 --duration 60
+    python benchmarks/loadtest.py --save benchmarks/results/my_run.json
+    python benchmarks/loadtest.py --baseline benchmarks/results/baseline_runserver.json
+
+Only the Python standard library is used, so it runs from any machine.
+"""
+
+import argparse
+import http.cookiejar
+import json
+import platform
+import random
+import statistics
+import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+import uuid
+
+# Relative weights of each operation in the default mix
+DEFAULT_MIX = {
+    'check': 25,
+    'chat': 20,
+    'exam_history': 10,
+    'submissions': 10,
+    'assessment_results': 5,
+    'grade': 15,
+    'exam': 5,  # generate + submit
+    'login': 10,
+}
+
+SAMPLE_CODE = '''import numpy as np
+from sklearn.linear_model import LinearRegression
+
+X = np.random.rand(100, 3)
+y = X @ np.array([1.5, -2.0, 0.7]) + 0.1
+model = LinearRegression().fit(X, y)
+print(model.score(X, y))
+'''
+
+
+class Stats:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.samples = {}  # endpoint -> list of latency ms
+        self.errors = {}  # endpoint -> count
+
+    def add(self, endpoint, ms, ok):
+        with self.lock:
+            self.samples.setdefault(endpoint, []).append(ms)
+            if not ok:
+                self.errors[endpoint] = self.errors.get(endpoint, 0) + 1
+
+
+class VirtualUser:
+    def __init__(self, base_url, stats, name, password):
+        self.base_url = base_url.rstrip('/')
+        self.stats = stats
+        self.username = name
+        self.password = password
+        self.opener = urllib.request.build_opener(
+            urllib.request.HTTPCookieProcessor(http.cookiejar.CookieJar())
+        )
+
+    def call(self, endpoint, method, path, payload=None):
+        data = json.dumps(payload).encode() if payload is not None else None
+        request = urllib.request.Request(
+            self.base_url + path, data=data, method=method,
+            headers={'Content-Type': 'application/json'} if data else {},
+        )
+        start = time.perf_counter()
+        status, body = 0, None
+        try:
+            with self.opener.open(request, timeout=120) as response:
+                status, body = response.status, response.read()
+        except urllib.error.HTTPError as e:
+            status, body = e.code, e.read()
+        except (urllib.error.URLError, OSError):
+            pass
+        ms = (time.perf_counter() - start) * 1000
+        self.stats.add(endpoint, ms, 200 <= status < 300)
+        try:
+            return json.loads(body) if body else None
+        except ValueError:
+            return None
+
+    def signup(self):
+        return self.call('signup', 'POST', '/api/auth/signup/', {
+            'username': self.username,
+            'email': f'{self.username}@loadtest.local',
+            'password': self.password,
+            'confirm_password': self.password,
+        })
+
+    # Operations ---------------------------------------------------------
+
+    def op_login(self):
+        self.call('login', 'POST', '/api/auth/login/', {'username': self.username, 'password': self.password})
+
+    def op_check(self):
+        self.call('check', 'GET', '/api/auth/check/')
+
+    def op_submissions(self):
+        self.call('submissions', 'GET', '/api/ai/submissions/')
+
+    def op_assessment_results(self):
+        self.call('assessment_results', 'GET', '/api/ai/assessment/results/')
+
+    def op_exam_history(self):
+        self.call('exam_history', 'GET', '/api/ai/exam/history/')
+
+    def op_grade(self):
+        # Unique code per call so the server-side result cache doesn't short-circuit
+        code = SAMPLE_CODE + f'\n# run {uuid.uuid4().hex}\n'
+        self.call('grade', 'POST', '/api/ai/grade/', {
+            'lab_id': f'lab_{random.randint(1, 11)}',
+            'code_content': code,
+            'file_name': 'solution.py',
+        })
+
+    def op_chat(self):
+        self.call('chat', 'POST', '/api/ai/chat/', {
+            'message': random.choice([
+                'What is an embedding?',
+                'Explain LoRA in simple terms',
+                'How does RAG reduce hallucinations?',
+                'hi',
+            ]),
+            'history': [],
+        })
+
+    def op_exam(self):
+        exam = self.call('exam_generate', 'POST', '/api/ai/exam/generate/', {
+            'difficulty': random.choice(['easy', 'medium', 'hard']),
+            'duration_minutes': 30,
+        })
+        if not exam or not exam.get('exam_id'):
+            return
+        answers = {str(q['id']): random.randint(0, 3) for q in exam.get('questions', [])}
+        self.call('exam_submit', 'POST', '/api/ai/exam/submit/', {'exam_id': exam['exam_id'], 'answers': answers})
+
+
+def run_user(user, mix, deadline):
+    ops = list(mix)
+    weights = [mix[op] for op in ops]
+    while time.monotonic() < deadline:
+        getattr(user, f'op_{random.choices(ops, weights)[0]}')()
+
+
+def percentile(ordered, pct):
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+def summarize(stats, elapsed):
+    endpoints = {}
+    for name, samples in sorted(stats.samples.items()):
+        ordered = sorted(samples)
+        endpoints[name] = {
+            'count': len(samples),
+            'errors': stats.errors.get(name, 0),
+            'error_rate': round(stats.errors.get(name, 0) / len(samples), 4),
+            'rps': round(len(samples) / elapsed, 2),
+            'mean_ms': round(statistics.mean(samples), 1),
+            'p50_ms': round(percentile(ordered, 50), 1),
+            'p95_ms': round(percentile(ordered, 95), 1),
+            'p99_ms': round(percentile(ordered, 99), 1),
+        }
+    total = sum(e['count'] for e in endpoints.values())
+    errors = sum(e['errors'] for e in endpoints.values())
+    return endpoints, {
+        'count': total,
+        'errors': errors,
+        'error_rate': round(errors / total, 4) if total else 0,
+        'rps': round(total / elapsed, 2),
+    }
+
+
+def print_report(endpoints, total):
+    print(f"\n{'endpoint':<20}{'count':>8}{'err%':>8}{'rps':>9}{'p50':>9}{'p95':>9}{'p99':>9}")
+    for name, e in endpoints.items():
+        print(f"{name:<20}{e['count']:>8}{e['error_rate'] * 100:>7.1f}%{e['rps']:>9.2f}"
+              f"{e['p50_ms']:>9.1f}{e['p95_ms']:>9.1f}{e['p99_ms']:>9.1f}")
+    print(f"{'TOTAL':<20}{total['count']:>8}{total['error_rate'] * 100:>7.1f}%{total['rps']:>9.2f}")
+
+
+def compare(result, baseline, tolerance):
+    """Print per-endpoint deltas; return the list of regressions"""
+    regressions = []
+    print(f"\nCompared with baseline ({baseline['meta'].get('label', '')}), tolerance {tolerance:.0%}")
+    print(f"{'endpoint':<20}{'p95 base':>10}{'p95 now':>10}{'delta':>9}{'err% base':>11}{'err% now':>10}")
+    for name, now in result['endpoints'].items():
+        base = baseline['endpoints'].get(name)
+        if not base:
+            continue
+        delta = (now['p95_ms'] - base['p95_ms']) / base['p95_ms'] if base['p95_ms'] else 0
+        flag = ''
+        if delta > tolerance or now['error_rate'] > base['error_rate'] + 0.01:
+            flag = '  REGRESSION'
+            regressions.append(name)
+        print(f"{name:<20}{base['p95_ms']:>10.1f}{now['p95_ms']:>10.1f}{delta:>+8.0%}"
+              f"{base['error_rate'] * 100:>10.1f}%{now['error_rate'] * 100:>9.1f}%{flag}")
+    if result['total']['rps'] < baseline['total']['rps'] * (1 - tolerance):
+        print(f"Throughput dropped: {baseline['total']['rps']} -> {result['total']['rps']} req/s  REGRESSION")
+        regressions.append('throughput')
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--url', default='http://127.0.0.1:8000')
+    parser.add_argument('--users', type=int, default=10, help='Concurrent virtual users')
+    parser.add_argument('--duration', type=int, default=30, help='Seconds to run')
+    parser.add_argument('--mix', help='JSON object of operation weights, e.g. \'{"check": 1, "chat": 1}\'')
+    parser.add_argument('--label', default='', help='Free-form label stored with the results')
+    parser.add_argument('--save', help='Write results JSON to this path')
+    parser.add_argument('--baseline', help='Compare against a results JSON file')
+    parser.add_argument('--tolerance', type=float, default=0.2, help='Allowed p95/throughput regression')
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+
+    random.seed(args.seed)
+    mix = json.loads(args.mix) if args.mix else DEFAULT_MIX
+    unknown = [op for op in mix if not hasattr(VirtualUser, f'op_{op}')]
+    if unknown:
+        parser.error(f"Unknown operations in --mix: {', '.join(unknown)}")
+
+    stats = Stats()
+    run_id = uuid.uuid4().hex[:8]
+    users = [VirtualUser(args.url, stats, f'lt_{run_id}_{i}', 'loadtest-pass') for i in range(args.users)]
+
+    print(f"Signing up {args.users} virtual users against {args.url} ...")
+    for user in users:
+        result = user.signup()
+        if not result or not result.get('success'):
+            sys.exit(f"Signup failed for {user.username}: {result}")
+    stats.samples.pop('signup', None)
+
+    print(f"Running mix {mix} for {args.duration}s ...")
+    start = time.monotonic()
+    deadline = start + args.duration
+    threads = [threading.Thread(target=run_user, args=(user, mix, deadline)) for user in users]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.monotonic() - start
+
+    endpoints, total = summarize(stats, elapsed)
+    print_report(endpoints, total)
+
+    result = {
+        'meta': {
+            'label': args.label,
+            'url': args.url,
+            'users': args.users,
+            'duration_s': round(elapsed, 1),
+            'mix': mix,
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        },
+        'endpoints': endpoints,
+        'total': total,
+    }
+    if args.save:
+        with open(args.save, 'w') as f:
+            json.dump(result, f, indent=2)
+        print(f"\nSaved results to {args.save}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        if compare(result, baseline, args.tolerance):
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
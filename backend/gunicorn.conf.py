@@ -0,0 +1,33 @@
+"""
+Gunicorn config running the ASGI app on uvicorn workers.
+
+Usage (from backend/):
+    gunicorn backend.asgi:application -c gunicorn.conf.py
+
+Each worker is one event loop and holds many concurrent LLM calls, so a
+small number of workers per host is enough. More than one worker needs
+REDIS_URL: the default LocMem cache is per process, so locks, throttling
+and token counters would not be shared between workers. Without REDIS_URL
+the default is therefore a single worker.
+"""
+
+import multiprocessing
+import os
+
+bind = os.environ.get('GUNICORN_BIND', '0.0.0.0:8000')
+default_workers = min(4, multiprocessing.cpu_count()) if os.environ.get('REDIS_URL') else 1
+workers = int(os.environ.get('GUNICORN_WORKERS', default_workers))
+worker_class = 'uvicorn.workers.UvicornWorker'
+
+if workers > 1 and not os.environ.get('REDIS_URL'):
+    raise SystemExit(
+        f'{workers} workers need a shared cache: set REDIS_URL, or GUNICORN_WORKERS=1'
+    )
+
+# Gemini calls can take tens of seconds on long notebooks
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', 120))
+graceful_timeout = 30
+keepalive = 5
+
+accesslog = '-'
+errorlog = '-'